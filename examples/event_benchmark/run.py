@@ -0,0 +1,73 @@
+"""
+Microbenchmark of event engine dispatch throughput and latency.
+
+Each event carries the time it was put into engine, and the latency
+from put to handler called is recorded for every event.
+"""
+
+from threading import Event as Signal
+from time import perf_counter
+
+import numpy as np
+
+from vnpy.event import Event, EventEngine, BatchEventEngine
+from vnpy.trader.event import EVENT_TICK
+
+
+EVENT_COUNT = 500_000
+SYMBOL_COUNT = 200
+
+
+def run_benchmark(engine_class: type):
+    """
+    Put events of all symbols into engine and measure dispatch performance.
+    """
+    engine = engine_class()
+
+    latencies = np.zeros(EVENT_COUNT)
+    finished = Signal()
+    count = 0
+
+    def process_tick_event(event: Event):
+        """"""
+        nonlocal count
+        latencies[count] = perf_counter() - event.data
+        count += 1
+
+        if count == EVENT_COUNT:
+            finished.set()
+
+    def process_symbol_event(event: Event):
+        """"""
+        pass
+
+    def process_general_event(event: Event):
+        """"""
+        pass
+
+    engine.register(EVENT_TICK, process_tick_event)
+    for i in range(SYMBOL_COUNT):
+        engine.register(f"{EVENT_TICK}SYMBOL{i}", process_symbol_event)
+    engine.register_general(process_general_event)
+
+    types = [EVENT_TICK] * EVENT_COUNT
+
+    engine.start()
+
+    start = perf_counter()
+    for type in types:
+        engine.put(Event(type, perf_counter()))
+    finished.wait()
+    cost = perf_counter() - start
+
+    engine.stop()
+
+    print(f"{engine_class.__name__}")
+    print(f"  events per second: {EVENT_COUNT / cost:,.0f}")
+    print(f"  p50 latency: {np.percentile(latencies, 50) * 1_000_000:,.1f} us")
+    print(f"  p99 latency: {np.percentile(latencies, 99) * 1_000_000:,.1f} us")
+
+
+if __name__ == "__main__":
+    run_benchmark(EventEngine)
+    run_benchmark(BatchEventEngine)
@@ -0,0 +1,130 @@
+"""
+Benchmark of websocket data decoding throughput.
+
+Messages are replayed from captured files with one message per line.
+Text messages are saved as they are, and binary (compressed) messages
+are saved in base64. Synthetic depth messages are used if no file given.
+
+    python run.py --compression gzip huobi_market.txt
+"""
+
+import argparse
+import base64
+import json
+import zlib
+from time import perf_counter
+from typing import Callable, List
+
+from vnpy.api.websocket import JsonDecoder, ZlibJsonDecoder, WBITS_DEFLATE, WBITS_GZIP
+from vnpy.api.websocket.decoder import JSON_LIBRARY
+
+
+WBITS = {
+    "deflate": WBITS_DEFLATE,
+    "gzip": WBITS_GZIP,
+}
+
+REPEAT = 5
+
+
+def load_messages(paths: List[str], compression: str) -> list:
+    """
+    Load captured messages, binary messages are decoded from base64.
+    """
+    messages = []
+
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                if compression:
+                    messages.append(base64.b64decode(line))
+                else:
+                    messages.append(line)
+
+    return messages
+
+
+def create_messages(count: int, compression: str) -> list:
+    """
+    Create synthetic depth messages similar to exchange market data.
+    """
+    messages = []
+
+    for i in range(count):
+        data = {
+            "table": "spot/depth5",
+            "data": [{
+                "instrument_id": "BTC-USDT",
+                "asks": [[f"{10000 + n * 0.1 + i % 10:.1f}", "1.5", "0", 2] for n in range(5)],
+                "bids": [[f"{9999 - n * 0.1 - i % 10:.1f}", "2.5", "0", 3] for n in range(5)],
+                "timestamp": "2019-10-01T00:00:00.000Z",
+            }]
+        }
+        text = json.dumps(data)
+
+        if compression:
+            compressor = zlib.compressobj(wbits=WBITS[compression])
+            messages.append(compressor.compress(text.encode()) + compressor.flush())
+        else:
+            messages.append(text)
+
+    return messages
+
+
+def run_benchmark(name: str, decode: Callable, messages: list):
+    """
+    Decode all messages several times and print throughput.
+    """
+    best = None
+
+    for _ in range(REPEAT):
+        start = perf_counter()
+        for message in messages:
+            decode(message)
+        cost = perf_counter() - start
+
+        if best is None or cost < best:
+            best = cost
+
+    print(f"{name}")
+    print(f"  messages per second: {len(messages) / best:,.0f}")
+    print(f"  latency per message: {best / len(messages) * 1_000_000:,.2f} us")
+
+
+def main():
+    """"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", help="captured message files")
+    parser.add_argument("--compression", choices=list(WBITS), default="")
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.paths:
+        messages = load_messages(args.paths, args.compression)
+    else:
+        messages = create_messages(args.count, args.compression)
+
+    if args.compression:
+        wbits = WBITS[args.compression]
+
+        def decode_stdlib(data: bytes):
+            """Decoding used by gateways before"""
+            return json.loads(zlib.decompress(data, wbits))
+
+        run_benchmark("stdlib json + zlib.decompress", decode_stdlib, messages)
+        run_benchmark(
+            f"ZlibJsonDecoder ({JSON_LIBRARY})",
+            ZlibJsonDecoder(wbits),
+            messages
+        )
+    else:
+        run_benchmark("stdlib json", json.loads, messages)
+        run_benchmark(f"JsonDecoder ({JSON_LIBRARY})", JsonDecoder(), messages)
+
+
+if __name__ == "__main__":
+    main()
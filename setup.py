@@ -61,6 +61,7 @@ def get_install_requires():
         "PyQt5",
         "qdarkstyle",
         "requests",
+        "aiohttp",
         "websocket-client",
         "peewee",
         "pymysql",
@@ -76,6 +77,7 @@ def get_install_requires():
         "ibapi",
         "deap",
         "pyzmq",
+        "msgpack>=1.0",
         "QScintilla"
     ]
     if not is_psycopg2_exists():
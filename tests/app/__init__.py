@@ -1 +1,4 @@
 from .test_csv_loader import *
+from .test_backtesting import *
+from .test_rpc_service import *
+from .test_data_recorder import *
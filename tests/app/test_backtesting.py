@@ -0,0 +1,206 @@
+"""
+Test if columnar replay and optimization of backtesting engine work fine
+"""
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+
+from vnpy.app.cta_strategy import backtesting
+from vnpy.app.cta_strategy.backtesting import BacktestingEngine, OptimizationSetting
+from vnpy.app.cta_strategy.strategies.double_ma_strategy import DoubleMaStrategy
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import BAR_DTYPE, BAR_FIELDS
+
+
+START = datetime(2019, 1, 1)
+END = datetime(2019, 4, 1)
+
+
+def create_bar_array(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+
+    bars = np.zeros(count, dtype=BAR_DTYPE)
+    bars["datetime"] = np.datetime64(START) + np.arange(count).astype("timedelta64[h]")
+    bars["close_price"] = np.round(1000 + np.cumsum(rng.normal(0, 5, count)))
+    bars["open_price"] = bars["close_price"] + np.round(rng.normal(0, 2, count))
+    bars["high_price"] = np.maximum(bars["open_price"], bars["close_price"]) + 1
+    bars["low_price"] = np.minimum(bars["open_price"], bars["close_price"]) - 1
+    bars["volume"] = rng.randint(1, 1000, count)
+    return bars
+
+
+def to_bars(array: np.ndarray) -> list:
+    bars = []
+    for values in zip(*[array[name].tolist() for name in BAR_FIELDS]):
+        bar = BarData(
+            symbol="IF88",
+            exchange=Exchange.CFFEX,
+            interval=Interval.HOUR,
+            gateway_name="DB",
+            **dict(zip(BAR_FIELDS, values))
+        )
+        bars.append(bar)
+    return bars
+
+
+def create_engine(columnar: bool = False) -> BacktestingEngine:
+    engine = BacktestingEngine()
+    engine.output = lambda msg: None
+
+    engine.set_parameters(
+        vt_symbol="IF88.CFFEX",
+        interval=Interval.HOUR,
+        start=START,
+        end=END,
+        rate=0.3 / 10000,
+        slippage=0.2,
+        size=300,
+        pricetick=0.2,
+        capital=1_000_000,
+        columnar=columnar
+    )
+    return engine
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(generation: int):
+    """
+    Save checkpoint and then interrupt ga optimization after generation.
+    """
+    original = backtesting.save_checkpoint
+
+    def save_checkpoint(path: str, checkpoint: dict):
+        original(path, checkpoint)
+        if checkpoint["generation"] == generation:
+            raise Interrupted()
+
+    return mock.patch.object(backtesting, "save_checkpoint", save_checkpoint)
+
+
+def run_backtesting(engine: BacktestingEngine, setting: dict) -> dict:
+    engine.add_strategy(DoubleMaStrategy, setting)
+    engine.run_backtesting()
+    engine.calculate_result()
+    return engine.calculate_statistics(output=False)
+
+
+class TestBacktesting(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.array = create_bar_array(24 * 90)
+        self.setting = {"fast_window": 5, "slow_window": 20}
+
+    def test_columnar_replay(self):
+        """
+        Columnar replay gives the same result as replay of bar objects.
+        """
+        engine = create_engine()
+        engine.history_data = to_bars(self.array)
+        expected = run_backtesting(engine, self.setting)
+
+        columnar_engine = create_engine(columnar=True)
+        columnar_engine.history_array = self.array
+        statistics = run_backtesting(columnar_engine, self.setting)
+
+        self.assertTrue(engine.trades)
+        self.assertEqual(statistics, expected)
+
+        trades = [trade.__dict__ for trade in columnar_engine.get_all_trades()]
+        expected_trades = [trade.__dict__ for trade in engine.get_all_trades()]
+        self.assertEqual(trades, expected_trades)
+
+        # Replayed bars are the same as bar objects
+        self.assertEqual(list(columnar_engine.generate_history()), engine.history_data)
+
+    def test_optimization(self):
+        """
+        Optimization workers attach to history file saved by main process.
+        """
+        optimization_setting = OptimizationSetting()
+        optimization_setting.set_target("total_net_pnl")
+        optimization_setting.add_parameter("fast_window", 4, 8, 2)
+        optimization_setting.add_parameter("slow_window", 20, 30, 10)
+
+        expected = []
+        for setting in optimization_setting.generate_setting():
+            engine = create_engine(columnar=True)
+            engine.history_array = self.array
+            statistics = run_backtesting(engine, setting)
+            expected.append((str(setting), statistics["total_net_pnl"], statistics))
+        expected.sort(reverse=True, key=lambda result: result[1])
+
+        engine = create_engine(columnar=True)
+        engine.add_strategy(DoubleMaStrategy, {})
+
+        # Worker processes are forked with database loading disabled
+        with mock.patch.object(engine, "load_history_array", return_value=self.array), \
+                mock.patch.object(BacktestingEngine, "load_data", side_effect=RuntimeError):
+            results = engine.run_optimization(optimization_setting, output=False)
+
+        self.assertEqual(results, expected)
+
+    def run_ga_optimization(self, population_size: int = 8, checkpoint_path: str = ""):
+        optimization_setting = OptimizationSetting()
+        optimization_setting.set_target("total_net_pnl")
+        optimization_setting.add_parameter("fast_window", 2, 10, 1)
+        optimization_setting.add_parameter("slow_window", 15, 40, 5)
+
+        engine = create_engine(columnar=True)
+        engine.add_strategy(DoubleMaStrategy, {})
+        engine.output = mock.Mock()
+
+        with mock.patch.object(engine, "load_history_array", return_value=self.array):
+            results = engine.run_ga_optimization(
+                optimization_setting,
+                population_size=population_size,
+                ngen_size=4,
+                output=False,
+                checkpoint_path=checkpoint_path
+            )
+
+        return results, engine.output
+
+    def test_ga_checkpoint(self):
+        """
+        Interrupted ga optimization is resumed from checkpoint with the
+        same hall of fame, and checkpoint of another run is ignored.
+        """
+        random.seed(1)
+        expected, _ = self.run_ga_optimization()
+        self.assertTrue(expected)
+
+        with tempfile.TemporaryDirectory() as dirname:
+            path = os.path.join(dirname, "checkpoint.pkl")
+
+            random.seed(1)
+            with interrupt_after(2), self.assertRaises(Interrupted):
+                self.run_ga_optimization(checkpoint_path=path)
+            self.assertTrue(os.path.exists(path))
+
+            random.seed(2)
+            results, output = self.run_ga_optimization(checkpoint_path=path)
+            self.assertEqual(results, expected)
+            output.assert_any_call("从第3代恢复遗传算法优化")
+            self.assertFalse(os.path.exists(path))
+
+            # Checkpoint saved with different population size
+            with interrupt_after(1), self.assertRaises(Interrupted):
+                self.run_ga_optimization(population_size=6, checkpoint_path=path)
+
+            random.seed(1)
+            results, output = self.run_ga_optimization(checkpoint_path=path)
+            self.assertEqual(results, expected)
+            output.assert_any_call("检查点文件与本次优化设置不一致，忽略检查点")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Test if data recorder saves data in batches without losing any
+"""
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from vnpy.app.data_recorder import engine
+from vnpy.app.data_recorder.engine import RecorderEngine
+from vnpy.event import EventEngine
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+
+
+START = datetime(2019, 1, 1, 9)
+
+
+def create_tick(i: int) -> TickData:
+    return TickData(
+        symbol="rb2001",
+        exchange=Exchange.SHFE,
+        datetime=START + timedelta(seconds=i),
+        gateway_name="CTP",
+        last_price=3000 + i
+    )
+
+
+def create_bar(i: int) -> BarData:
+    return BarData(
+        symbol="rb2001",
+        exchange=Exchange.SHFE,
+        datetime=START + timedelta(minutes=i),
+        interval=Interval.MINUTE,
+        gateway_name="CTP",
+        close_price=3000 + i
+    )
+
+
+def get_saved(save_func: mock.Mock) -> list:
+    saved = []
+    for call in save_func.call_args_list:
+        saved.extend(call[0][0])
+    return saved
+
+
+class TestDataRecorder(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.database_manager = mock.Mock()
+
+        patchers = [
+            mock.patch.object(engine, "database_manager", self.database_manager),
+            mock.patch.object(engine, "load_json", return_value={}),
+            mock.patch.object(engine, "save_json"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def create_engine(self, batch_size: int, flush_interval: float) -> RecorderEngine:
+        patchers = [
+            mock.patch.object(RecorderEngine, "batch_size", batch_size),
+            mock.patch.object(RecorderEngine, "flush_interval", flush_interval),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        recorder = RecorderEngine(None, EventEngine())
+        self.addCleanup(recorder.close)
+        return recorder
+
+    def wait_saved(self, recorder: RecorderEngine, count: int):
+        for _ in range(50):
+            if recorder.tick_count + recorder.bar_count >= count:
+                break
+            time.sleep(0.1)
+
+    def test_batch_size(self):
+        """
+        Data is saved once reaching batch size, without waiting for timer.
+        """
+        recorder = self.create_engine(batch_size=10, flush_interval=60)
+
+        ticks = [create_tick(i) for i in range(25)]
+        for tick in ticks:
+            recorder.record_tick(tick)
+        self.wait_saved(recorder, 20)
+
+        save_tick_data = self.database_manager.save_tick_data
+        self.assertEqual([len(call[0][0]) for call in save_tick_data.call_args_list], [10, 10])
+
+        stats = recorder.get_stats()
+        self.assertEqual(stats["received_count"], 25)
+        self.assertEqual(stats["tick_count"], 20)
+        self.assertEqual(stats["write_count"], 2)
+
+        # Data less than batch size is saved when closed
+        recorder.close()
+        self.assertEqual(get_saved(save_tick_data), ticks)
+        self.assertEqual(recorder.get_stats()["write_count"], 3)
+
+    def test_flush_interval(self):
+        """
+        Data less than batch size is saved after flush interval.
+        """
+        recorder = self.create_engine(batch_size=1000, flush_interval=0.2)
+
+        ticks = [create_tick(i) for i in range(3)]
+        bars = [create_bar(i) for i in range(2)]
+        for tick in ticks:
+            recorder.record_tick(tick)
+        for bar in bars:
+            recorder.record_bar(bar)
+        self.wait_saved(recorder, 5)
+
+        self.assertEqual(get_saved(self.database_manager.save_tick_data), ticks)
+        self.assertEqual(get_saved(self.database_manager.save_bar_data), bars)
+
+        stats = recorder.get_stats()
+        self.assertEqual(stats["backlog"], 0)
+        self.assertEqual(stats["tick_count"], 3)
+        self.assertEqual(stats["bar_count"], 2)
+        self.assertGreaterEqual(stats["write_count"], 1)
+        self.assertTrue(recorder.thread.is_alive())
+
+    def test_close(self):
+        """
+        Data left in queue is all saved before thread exits.
+        """
+        recorder = self.create_engine(batch_size=1000, flush_interval=60)
+
+        ticks = [create_tick(i) for i in range(50)]
+        bars = [create_bar(i) for i in range(50)]
+        for tick, bar in zip(ticks, bars):
+            recorder.record_tick(tick)
+            recorder.record_bar(bar)
+
+        recorder.close()
+        self.assertFalse(recorder.thread.is_alive())
+
+        self.assertEqual(get_saved(self.database_manager.save_tick_data), ticks)
+        self.assertEqual(get_saved(self.database_manager.save_bar_data), bars)
+
+        stats = recorder.get_stats()
+        self.assertEqual(stats["backlog"], 0)
+        self.assertEqual(stats["received_count"], 100)
+        self.assertEqual(stats["write_count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Test if rpc gateway syncs contracts with snapshot of rpc service
+"""
+import tempfile
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from threading import Thread
+from unittest import mock
+
+from vnpy.app.rpc_service.engine import RpcEngine
+from vnpy.event import Event, EventEngine
+from vnpy.gateway.rpc import rpc_gateway
+from vnpy.gateway.rpc.rpc_gateway import RpcGateway
+from vnpy.rpc import RemoteException
+from vnpy.trader.constant import Exchange, Product
+from vnpy.trader.event import EVENT_CONTRACT
+from vnpy.trader.object import ContractData
+
+
+def create_contract(symbol: str) -> ContractData:
+    return ContractData(
+        symbol=symbol,
+        exchange=Exchange.SHFE,
+        name=symbol,
+        product=Product.FUTURES,
+        size=10,
+        pricetick=1,
+        gateway_name="CTP"
+    )
+
+
+class TestMainEngine:
+
+    def __init__(self, count: int):
+        self.contracts = {}
+        for i in range(count):
+            self.add_contract(f"rb{i:04d}")
+
+    def add_contract(self, symbol: str):
+        contract = create_contract(symbol)
+        self.contracts[contract.vt_symbol] = contract
+
+    def get_all_contracts(self):
+        return list(self.contracts.values())
+
+    def get_all_accounts(self):
+        return []
+
+    def get_all_positions(self):
+        return []
+
+    def get_all_orders(self):
+        return []
+
+    def get_all_trades(self):
+        return []
+
+    def __getattr__(self, name: str):
+        # Functions only registered by rpc server
+        return lambda *args, **kwargs: None
+
+
+class TestClient:
+    """
+    Client calling snapshot function of rpc engine directly.
+    """
+
+    def __init__(self, engine: RpcEngine):
+        self.engine = engine
+        self.failed_starts = set()
+        self.calls = []
+
+    def get_snapshot(self, *args, timeout: int = 0):
+        self.calls.append(("get_snapshot", args))
+        return self.engine.get_snapshot(*args)
+
+    def submit(self, name: str, *args, timeout: int = 0):
+        self.calls.append(("submit", args))
+
+        future = Future()
+        if args[1] in self.failed_starts:
+            future.set_exception(RemoteException("Timeout reached for request"))
+        else:
+            future.set_result(self.engine.get_snapshot(*args))
+        return future
+
+
+class TestRpcService(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.main_engine = TestMainEngine(12)
+        self.event_engine = EventEngine()
+        self.engine = RpcEngine(self.main_engine, self.event_engine)
+
+        self.dirname = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(
+            rpc_gateway,
+            "get_file_path",
+            lambda filename: Path(self.dirname.name).joinpath(filename)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dirname.cleanup)
+
+        # Default argument is bound when defined, so it is patched directly
+        chunk_patcher = mock.patch.object(RpcEngine.get_snapshot, "__defaults__", ("", 0, 5))
+        chunk_patcher.start()
+        self.addCleanup(chunk_patcher.stop)
+
+    def create_gateway(self) -> RpcGateway:
+        with mock.patch.object(rpc_gateway, "RpcClient", lambda serializer: TestClient(self.engine)):
+            gateway = RpcGateway(self.event_engine)
+        gateway.req_address = "tcp://127.0.0.1:2014"
+        gateway.contracts = []
+        gateway.on_contract = gateway.contracts.append
+        gateway.write_log = lambda msg: None
+        return gateway
+
+    def test_snapshot(self):
+        snapshot = self.engine.get_snapshot("", 0, 5)
+        version = snapshot["contract_version"]
+
+        self.assertEqual(snapshot["contract_count"], 12)
+        self.assertEqual(snapshot["chunk_size"], 5)
+        self.assertEqual(len(snapshot["contracts"]), 5)
+        self.assertIn("accounts", snapshot)
+
+        chunk = self.engine.get_snapshot("", 10, 5)
+        self.assertEqual(len(chunk["contracts"]), 2)
+        self.assertNotIn("accounts", chunk)
+
+        # Contracts are not included if client cache is the latest
+        snapshot = self.engine.get_snapshot(version, 0, 5)
+        self.assertEqual(snapshot["contracts"], [])
+
+        # Version is updated after contract event
+        self.main_engine.add_contract("rb9999")
+        self.assertEqual(self.engine.get_snapshot(version, 0, 5)["contract_version"], version)
+
+        self.engine.process_contract_event(Event(EVENT_CONTRACT, None))
+        snapshot = self.engine.get_snapshot(version, 0, 5)
+        self.assertNotEqual(snapshot["contract_version"], version)
+        self.assertEqual(snapshot["contract_count"], 13)
+
+    def test_concurrent_update(self):
+        """
+        Contract changed while snapshot is requested is never missed.
+        """
+        def update():
+            for i in range(200):
+                self.main_engine.add_contract(f"ag{i:04d}")
+                self.engine.process_contract_event(Event(EVENT_CONTRACT, None))
+
+        thread = Thread(target=update)
+        thread.start()
+        while thread.is_alive():
+            snapshot = self.engine.get_snapshot("", 0, 5)
+            self.assertEqual(snapshot["contract_version"], self.engine.contract_version)
+        thread.join()
+
+        snapshot = self.engine.get_snapshot("", 0, 5)
+        self.assertEqual(snapshot["contract_count"], len(self.main_engine.contracts))
+
+    def test_query_all(self):
+        gateway = self.create_gateway()
+        gateway.query_all()
+
+        vt_symbols = [contract.vt_symbol for contract in gateway.contracts]
+        self.assertEqual(vt_symbols, sorted(self.main_engine.contracts))
+        self.assertEqual(gateway.symbol_gateway_map["rb0000.SHFE"], "CTP")
+
+        # Contracts are loaded from cache when not changed
+        gateway = self.create_gateway()
+        gateway.query_all()
+        self.assertEqual(len(gateway.contracts), 12)
+        self.assertEqual(gateway.client.calls, [("get_snapshot", (self.engine.contract_version, 0))])
+
+        # Contracts are downloaded again after changed
+        self.main_engine.add_contract("rb9999")
+        self.engine.process_contract_event(Event(EVENT_CONTRACT, None))
+
+        gateway = self.create_gateway()
+        gateway.query_all()
+        self.assertEqual(len(gateway.contracts), 13)
+
+    def test_chunk_timeout(self):
+        """
+        Chunk failed in pipelined requests is requested again alone.
+        """
+        gateway = self.create_gateway()
+        gateway.client.failed_starts.add(5)
+        gateway.query_all()
+
+        vt_symbols = [contract.vt_symbol for contract in gateway.contracts]
+        self.assertEqual(vt_symbols, sorted(self.main_engine.contracts))
+        self.assertIn(("get_snapshot", ("", 5, 5)), gateway.client.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,11 @@ import unittest
 
 import app
 # import your test modules
+import test_event_engine
 import test_import_all
+import test_rest_client
+import test_rpc
+import test_websocket_client
 import trader
 
 # initialize the test suite
@@ -12,6 +16,10 @@ suite = unittest.TestSuite()
 
 # add tests to the test suite
 suite.addTests(loader.loadTestsFromModule(test_import_all))
+suite.addTests(loader.loadTestsFromModule(test_event_engine))
+suite.addTests(loader.loadTestsFromModule(test_rest_client))
+suite.addTests(loader.loadTestsFromModule(test_rpc))
+suite.addTests(loader.loadTestsFromModule(test_websocket_client))
 suite.addTests(loader.loadTestsFromModule(trader))
 suite.addTests(loader.loadTestsFromModule(app))
 
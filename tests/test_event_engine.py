@@ -0,0 +1,214 @@
+"""
+Test if event engine works fine
+"""
+import unittest
+from threading import Event as Signal
+from types import SimpleNamespace
+
+from vnpy.event import (
+    Event,
+    EventEngine,
+    BatchEventEngine,
+    ShardedEventEngine,
+    EVENT_TIMER,
+    EVENT_MONITOR
+)
+
+
+EVENT_TEST = "eTest"
+
+
+def create_event(vt_symbol: str, value: int):
+    return Event(EVENT_TEST, SimpleNamespace(vt_symbol=vt_symbol, value=value))
+
+
+class TestEventEngine(unittest.TestCase):
+
+    engine_class = EventEngine
+
+    def setUp(self) -> None:
+        self.engine = self.engine_class()
+        self.received = []
+        self.finished = Signal()
+
+    def tearDown(self) -> None:
+        if self.engine._active:
+            self.engine.stop()
+
+    def process_event(self, event: Event):
+        self.received.append((event.data.vt_symbol, event.data.value))
+        if event.data.value == -1:
+            self.finished.set()
+
+    def wait_received(self, count: int):
+        for _ in range(50):
+            if len(self.received) >= count:
+                break
+            self.finished.wait(0.1)
+
+    def test_register(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.assertEqual(len(self.engine._handlers[EVENT_TEST]), 1)
+
+        self.engine.unregister(EVENT_TEST, self.process_event)
+        self.assertNotIn(EVENT_TEST, self.engine._handlers)
+
+        self.engine.register_general(self.process_event)
+        self.engine.unregister_general(self.process_event)
+        self.assertFalse(self.engine._general_handlers)
+
+    def test_process(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.start()
+
+        for i in range(100):
+            self.engine.put(create_event("A", i))
+        self.engine.put(create_event("A", -1))
+
+        self.assertTrue(self.finished.wait(5))
+        self.assertEqual([value for _, value in self.received], list(range(100)) + [-1])
+
+    def test_conflation(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.set_conflation(EVENT_TEST)
+
+        # Engine is not started yet, so all events are pending in queue.
+        for i in range(10):
+            self.engine.put(create_event("A", i))
+            self.engine.put(create_event("B", i))
+        self.engine.put(create_event("C", -1))
+
+        self.engine.start()
+        self.assertTrue(self.finished.wait(5))
+
+        self.assertEqual(self.received, [("A", 9), ("B", 9), ("C", -1)])
+        self.assertEqual(self.engine.get_conflated_counts(), {EVENT_TEST: 18})
+
+    def test_fanout(self):
+        keyed = []
+
+        def process_keyed_event(event: Event):
+            keyed.append(event.data.value)
+
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.register(EVENT_TEST + "B", process_keyed_event)
+        self.engine.set_fanout(EVENT_TEST, lambda event: event.data.vt_symbol)
+        self.engine.start()
+
+        for i in range(10):
+            self.engine.put(create_event("A", i))
+            self.engine.put(create_event("B", i))
+        self.engine.put(create_event("B", -1))
+
+        self.assertTrue(self.finished.wait(5))
+        self.assertEqual(keyed, list(range(10)) + [-1])
+
+    def test_fanout_empty_key(self):
+        """
+        Events without key are only distributed to type handlers.
+        """
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.register(EVENT_TEST + "A", self.process_event)
+        self.engine.set_fanout(EVENT_TEST, lambda event: event.data.vt_symbol)
+        self.engine.start()
+
+        self.engine.put(create_event(None, 1))
+        self.engine.put(create_event("", 2))
+        self.engine.put(create_event("A", 3))
+        self.wait_received(4)
+
+        # Events of different keys may be processed by different shards
+        self.assertCountEqual(self.received, [(None, 1), ("", 2), ("A", 3), ("A", 3)])
+
+    def test_monitor_fanout_empty_key(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.set_fanout(EVENT_TEST, lambda event: event.data.vt_symbol)
+        self.engine.enable_monitor()
+        self.engine.start()
+
+        self.engine.put(create_event(None, 1))
+        self.engine.put(create_event("A", 2))
+        self.wait_received(2)
+
+        self.assertCountEqual(self.received, [(None, 1), ("A", 2)])
+
+    def test_monitor(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.enable_monitor()
+
+        for i in range(10):
+            self.engine.put(create_event("A", i))
+        self.engine.put(create_event("A", -1))
+
+        self.engine.start()
+        self.assertTrue(self.finished.wait(5))
+
+        snapshot = self.engine.get_monitor_snapshot()
+        self.assertEqual(snapshot["queue_wait"][EVENT_TEST]["count"], 11)
+
+        handler_stats = snapshot["handlers"][EVENT_TEST]
+        name = "TestEventEngine.process_event"
+        self.assertEqual(handler_stats[name]["count"], 11)
+        self.assertLessEqual(handler_stats[name]["p50"], handler_stats[name]["max"])
+
+    def test_monitor_snapshot_event(self):
+        snapshots = []
+        received = Signal()
+
+        def process_monitor_event(event: Event):
+            snapshots.append(event.data)
+            received.set()
+
+        self.engine.register(EVENT_MONITOR, process_monitor_event)
+        self.engine.enable_monitor(snapshot_interval=1)
+        self.engine.put(Event(EVENT_TIMER))
+
+        self.engine.start()
+        self.assertTrue(received.wait(5))
+        self.assertIn(EVENT_TIMER, snapshots[0]["queue_wait"])
+
+
+class TestBatchEventEngine(TestEventEngine):
+
+    engine_class = BatchEventEngine
+
+
+class TestShardedEventEngine(TestEventEngine):
+
+    engine_class = ShardedEventEngine
+
+    def test_process_by_key(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.start()
+
+        for i in range(100):
+            for vt_symbol in ["A", "B", "C", "D"]:
+                self.engine.put(create_event(vt_symbol, i))
+
+        count = 0
+        while len(self.received) < 400 and count < 50:
+            self.finished.wait(0.1)
+            count += 1
+
+        for vt_symbol in ["A", "B", "C", "D"]:
+            values = [value for key, value in self.received if key == vt_symbol]
+            self.assertEqual(values, list(range(100)))
+
+    def test_conflation(self):
+        self.engine.register(EVENT_TEST, self.process_event)
+        self.engine.set_conflation(EVENT_TEST)
+
+        for i in range(10):
+            self.engine.put(create_event("A", i))
+        self.engine.put(create_event("A", -1))
+
+        self.engine.start()
+        self.assertTrue(self.finished.wait(5))
+
+        self.assertEqual(self.received, [("A", -1)])
+        self.assertEqual(self.engine.get_conflated_counts(), {EVENT_TEST: 10})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,380 @@
+"""
+Test if rest clients work fine with a local http server
+"""
+import asyncio
+import time
+import unittest
+from threading import Event as Signal, Thread
+from urllib.parse import urlsplit
+
+import requests
+from aiohttp import web
+
+from vnpy.api.rest import (
+    AsyncConnectionError,
+    AsyncRestClient,
+    RateLimiter,
+    RateLimitError,
+    Request,
+    RequestPriority,
+    RestClient
+)
+from vnpy.api.rest.rate_limiter import get_request_key
+
+
+async def handle_echo(request: web.Request):
+    delay = float(request.query.get("delay", 0))
+    if delay:
+        await asyncio.sleep(delay)
+
+    status = int(request.query.get("status", 200))
+    data = {
+        "query": dict(request.query),
+        "query_string": request.query_string,
+        "body": await request.text()
+    }
+    return web.json_response(data, status=status)
+
+
+class TestServer:
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.runner = None
+        self.url_base = ""
+
+    def start(self):
+        Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.setup(), self.loop).result()
+
+    async def setup(self):
+        app = web.Application()
+        app.router.add_route("*", "/echo", handle_echo)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = self.runner.addresses[0][1]
+        self.url_base = f"http://127.0.0.1:{port}"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class TestRestClient(unittest.TestCase):
+
+    client_class = RestClient
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = TestServer()
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.client = self.client_class()
+        self.client.init(self.server.url_base)
+        self.client.start()
+
+        self.results = []
+        self.failed = []
+
+    def tearDown(self) -> None:
+        self.client.stop()
+        self.client.join()
+
+    def on_result(self, data: dict, request):
+        self.results.append((request.extra, data))
+
+    def on_failed(self, status_code: int, request):
+        self.failed.append((request.extra, status_code))
+
+    def test_add_request(self):
+        for i in range(20):
+            self.client.add_request(
+                "POST",
+                "/echo",
+                self.on_result,
+                params={"n": i, "skip": None},
+                data="body",
+                extra=i
+            )
+        self.client.join()
+
+        self.assertEqual(sorted(extra for extra, _ in self.results), list(range(20)))
+        for extra, data in self.results:
+            self.assertEqual(data["query"], {"n": str(extra)})
+            self.assertEqual(data["body"], "body")
+
+    def test_on_failed(self):
+        self.client.add_request(
+            "GET",
+            "/echo",
+            self.on_result,
+            params={"status": 400},
+            on_failed=self.on_failed,
+            extra="failed"
+        )
+        self.client.join()
+
+        self.assertEqual(self.failed, [("failed", 400)])
+        self.assertFalse(self.results)
+
+    def test_request(self):
+        response = self.client.request("GET", "/echo", params={"n": 1})
+        self.assertEqual(response.json()["query"], {"n": "1"})
+
+    def test_request_rate_limit(self):
+        self.client.set_rate_limit(rate=20)
+        self.client.rate_limiter.bucket.tokens = 0
+
+        start = time.monotonic()
+        response = self.client.request("GET", "/echo", params={"n": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        self.assertEqual(self.client.get_rate_limit_stats()["LOW"]["dispatched"], 1)
+
+    def test_list_params(self):
+        params = {"symbol": ["BTC", "ETH"], "n": 1, "skip": None}
+        self.client.add_request("GET", "/echo", self.on_result, params=params)
+        self.client.join()
+
+        # Same query string as requests
+        prepared = requests.Request("GET", self.server.url_base, params=params).prepare()
+        query_string = urlsplit(prepared.url).query
+        self.assertEqual(query_string, "symbol=BTC&symbol=ETH&n=1")
+        self.assertEqual(self.results[0][1]["query_string"], query_string)
+
+    def test_rate_limit(self):
+        errors = []
+
+        def on_error(exception_type: type, exception_value: Exception, tb, request):
+            errors.append(exception_type)
+
+        self.client.stop()
+        self.client.set_rate_limit(rate=20, max_queue_size=3)
+        self.client.rate_limiter.bucket.tokens = 0
+        self.client.start()
+
+        for i in range(10):
+            self.client.add_request(
+                "POST", "/echo", self.on_result, on_error=on_error, extra=i
+            )
+        self.client.add_request("GET", "/echo", self.on_result, params={"n": 1})
+        self.client.add_request("GET", "/echo", self.on_result, params={"n": 1})
+        self.client.join()
+
+        self.assertEqual(sorted(extra for extra, _ in self.results if extra is not None), [0, 1, 2])
+        self.assertEqual(len(self.results), 4)
+        self.assertEqual(errors, [RateLimitError] * 7)
+
+        stats = self.client.get_rate_limit_stats()
+        self.assertEqual(stats["NORMAL"]["rejected"], 7)
+        self.assertEqual(stats["LOW"]["coalesced"], 1)
+
+    def test_endpoint_without_rate_limit(self):
+        with self.assertRaises(RuntimeError):
+            self.client.set_endpoint("/echo", cost=5)
+
+        self.client.set_rate_limit(rate=20)
+        self.client.set_endpoint("/echo", cost=5)
+
+
+class TestAsyncRestClient(TestRestClient):
+
+    client_class = AsyncRestClient
+
+    def test_concurrency(self):
+        start = time.monotonic()
+
+        for i in range(50):
+            self.client.add_request(
+                "GET",
+                "/echo",
+                self.on_result,
+                params={"delay": 0.2},
+                extra=i
+            )
+        self.client.join()
+
+        self.assertEqual(len(self.results), 50)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_add_before_start(self):
+        client = AsyncRestClient()
+        client.init(self.server.url_base)
+        client.add_request("GET", "/echo", self.on_result, extra="waiting")
+
+        client.start()
+        client.join()
+        client.stop()
+        client.join()
+
+        self.assertEqual(self.results[0][0], "waiting")
+
+    def test_stop_in_callback(self):
+        """
+        Client stopped in callback shuts down without waiting for itself.
+        """
+        stopped = Signal()
+
+        def on_result(data: dict, request):
+            self.client.stop()
+            self.client.join()
+            stopped.set()
+
+        thread = self.client._thread
+        self.client.add_request("GET", "/echo", on_result)
+
+        self.assertTrue(stopped.wait(5))
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(self.client._active)
+
+    def test_connection_error(self):
+        errors = []
+
+        def on_error(exception_type: type, exception_value: Exception, tb, request):
+            errors.append(exception_type)
+
+        # Nothing listening on the port of closed server
+        server = TestServer()
+        server.start()
+        url_base = server.url_base
+        server.stop()
+
+        client = AsyncRestClient()
+        client.init(url_base)
+        client.start()
+        client.add_request("GET", "/echo", self.on_result, on_error=on_error)
+        client.join()
+        client.stop()
+        client.join()
+
+        self.assertEqual(errors, [AsyncConnectionError])
+        self.assertTrue(issubclass(errors[0], ConnectionError))
+        self.assertTrue(issubclass(errors[0], requests.ConnectionError))
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.limiter = RateLimiter(rate=100, capacity=1, max_queue_size=5)
+        self.limiter.set_endpoint("/cancel", priority=RequestPriority.HIGH, method="POST")
+        self.limiter.set_endpoint("/account", cost=1)
+        self.limiter.set_endpoint("/account/all", cost=5)
+
+        self.dispatched = []
+        self.rejected = []
+
+    def tearDown(self) -> None:
+        self.limiter.stop()
+
+    def create_request(self, method: str, path: str, params: dict = None):
+        return Request(method, path, params, None, None, callback=print)
+
+    def test_endpoint(self):
+        self.assertEqual(self.limiter.get_endpoint("GET", "/account/1"), (1, RequestPriority.LOW))
+        self.assertEqual(self.limiter.get_endpoint("GET", "/account/all"), (5, RequestPriority.LOW))
+        self.assertEqual(self.limiter.get_endpoint("POST", "/cancel/1"), (1, RequestPriority.HIGH))
+        self.assertEqual(self.limiter.get_endpoint("POST", "/order"), (1, RequestPriority.NORMAL))
+        self.assertEqual(self.limiter.get_endpoint("DELETE", "/order"), (1, RequestPriority.HIGH))
+
+    def test_acquire(self):
+        start = time.monotonic()
+        for _ in range(5):
+            self.limiter.acquire("GET", "/account/1")
+
+        # First one is sent with token in bucket, others wait for refill
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+        self.assertEqual(self.limiter.get_stats()["LOW"]["dispatched"], 5)
+
+        with self.assertRaises(RateLimitError):
+            self.limiter.acquire("GET", "/account/all")
+
+    def test_schedule(self):
+        for i in range(3):
+            self.limiter.put(self.create_request("GET", "/query", {"n": i}))
+        self.limiter.put(self.create_request("POST", "/order"))
+        self.limiter.put(self.create_request("POST", "/cancel"))
+
+        # Duplicate query is coalesced
+        request = self.create_request("GET", "/query", {"n": 0})
+        self.assertIsNotNone(self.limiter.put(request))
+
+        # Cost larger than capacity and full queue are rejected
+        with self.assertRaises(RateLimitError):
+            self.limiter.put(self.create_request("GET", "/account/all"))
+
+        for i in range(3, 5):
+            self.limiter.put(self.create_request("GET", "/query", {"n": i}))
+        with self.assertRaises(RateLimitError):
+            self.limiter.put(self.create_request("GET", "/query", {"n": 5}))
+
+        finished = Signal()
+
+        def dispatch(request: Request):
+            self.dispatched.append((request.method, request.path, request.params))
+            if len(self.dispatched) == 7:
+                finished.set()
+
+        start = time.monotonic()
+        self.limiter.start(dispatch, None)
+        self.assertTrue(finished.wait(5))
+
+        # 7 requests with capacity 1 and rate 100 take at least 0.06 second
+        self.assertGreater(time.monotonic() - start, 0.05)
+        self.assertEqual(self.dispatched[0], ("POST", "/cancel", None))
+        self.assertEqual(self.dispatched[1], ("POST", "/order", None))
+        self.assertEqual([params["n"] for _, _, params in self.dispatched[2:]], list(range(5)))
+
+        stats = self.limiter.get_stats()
+        self.assertEqual(stats["LOW"]["dispatched"], 5)
+        self.assertEqual(stats["LOW"]["rejected"], 2)
+        self.assertEqual(stats["LOW"]["coalesced"], 1)
+        self.assertEqual(stats["HIGH"]["queue_time"]["count"], 1)
+
+    def test_request_key(self):
+        request = self.create_request("GET", "/query", {"n": 0})
+        self.assertEqual(get_request_key(request), get_request_key(self.create_request("GET", "/query", {"n": 0})))
+
+        # Requests with extra, different headers or callbacks are not coalesced
+        request.extra = "order"
+        self.assertIsNone(get_request_key(request))
+
+        request = self.create_request("GET", "/query", {"n": 0})
+        request.headers = {"key": "value"}
+        self.assertNotEqual(get_request_key(request), get_request_key(self.create_request("GET", "/query", {"n": 0})))
+
+        request = self.create_request("GET", "/query", {"n": 0})
+        request.on_failed = print
+        self.assertNotEqual(get_request_key(request), get_request_key(self.create_request("GET", "/query", {"n": 0})))
+
+    def test_max_queue_time(self):
+        limiter = RateLimiter(rate=10, max_queue_time=0.05)
+        limiter.bucket.tokens = 0
+
+        finished = Signal()
+
+        def reject(request: Request, reason: str):
+            self.rejected.append(request.params["n"])
+            finished.set()
+
+        limiter.put(self.create_request("GET", "/query", {"n": 1}))
+        limiter.start(self.dispatched.append, reject)
+        self.assertTrue(finished.wait(5))
+        limiter.stop()
+
+        self.assertEqual(self.rejected, [1])
+        self.assertFalse(self.dispatched)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Test if rpc server and client work fine with pipelined requests
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from vnpy.rpc import RemoteException, RpcClient, RpcServer
+
+
+class TestClient(RpcClient):
+
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def callback(self, topic: str, data):
+        self.received.append((topic, data))
+
+
+class TestRpc(unittest.TestCase):
+
+    worker_count = 0
+
+    def setUp(self) -> None:
+        self.dirname = tempfile.mkdtemp()
+        rep_address = f"ipc://{os.path.join(self.dirname, 'rep')}"
+        pub_address = f"ipc://{os.path.join(self.dirname, 'pub')}"
+
+        self.thread_ids = set()
+
+        self.server = RpcServer(worker_count=self.worker_count)
+        self.server.register(self.sleep)
+        self.server.register(self.fail)
+        self.server.register(self.publish)
+        self.server.start(rep_address, pub_address)
+
+        self.client = TestClient()
+        self.client.start(rep_address, pub_address)
+
+    def tearDown(self) -> None:
+        self.client.stop()
+        self.client.join()
+        self.server.stop()
+        self.server.join()
+
+        for name in os.listdir(self.dirname):
+            os.remove(os.path.join(self.dirname, name))
+        os.rmdir(self.dirname)
+
+    def sleep(self, seconds: float):
+        self.thread_ids.add(threading.get_ident())
+        time.sleep(seconds)
+        return seconds
+
+    def fail(self):
+        raise ValueError("fail")
+
+    def publish(self, topic: str, data):
+        self.server.publish(topic, data)
+
+    def wait_received(self, topic: str) -> list:
+        for _ in range(50):
+            self.client.publish(topic, 1)
+
+            received = [data for t, data in self.client.received if t == topic]
+            if received:
+                return received
+            time.sleep(0.1)
+        return []
+
+    def test_call(self):
+        self.assertEqual(self.client.sleep(0), 0)
+
+        with self.assertRaises(RemoteException) as cm:
+            self.client.fail()
+        self.assertIn("ValueError", str(cm.exception))
+
+        with self.assertRaises(RemoteException):
+            self.client.submit("fail").result(5)
+
+    def test_call_timeout(self):
+        """
+        Late response of expired call is not returned to the next call.
+        """
+        with self.assertRaises(RemoteException):
+            self.client.sleep(0.5, timeout=100)
+        self.assertEqual(self.client.sleep(0.1), 0.1)
+
+        future = self.client.submit("sleep", 0.5, timeout=100)
+        with self.assertRaises(RemoteException):
+            future.result(5)
+        self.assertEqual(self.client.submit("sleep", 0.1).result(5), 0.1)
+
+    def test_submit(self):
+        """
+        Futures are matched with responses by request id.
+        """
+        delays = [0.3, 0.1, 0.2, 0]
+        futures = [self.client.submit("sleep", delay) for delay in delays]
+
+        results = [future.result(5) for future in futures]
+        self.assertEqual(results, delays)
+
+    def test_threads(self):
+        """
+        Calls from different threads are sent with their own sockets.
+        """
+        delays = [0.2, 0.1, 0] * 3
+
+        with ThreadPoolExecutor(len(delays)) as executor:
+            futures = [executor.submit(self.client.sleep, delay) for delay in delays]
+            results = [future.result(5) for future in futures]
+
+        self.assertEqual(results, delays)
+
+    def test_subscribe(self):
+        """
+        Topic subscribed after client started is set by client thread.
+        """
+        self.client.subscribe_topic("tick")
+        self.assertTrue(self.wait_received("tick"))
+        self.assertFalse([t for t, _ in self.client.received if t == "trade"])
+
+        self.client.unsubscribe_topic("tick")
+        self.client.sleep(0.2)
+        self.client.received.clear()
+
+        self.client.publish("tick", 1)
+        self.client.sleep(0.2)
+        self.assertFalse([t for t, _ in self.client.received if t == "tick"])
+
+    def test_stop(self):
+        """
+        Dealer sockets of caller threads are closed after client stopped.
+        """
+        sockets = []
+
+        def call():
+            self.client.sleep(0)
+            sockets.append(self.client._get_thread_socket())
+            self.client._release_thread_socket(sockets[-1])
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(sockets), 3)
+        self.assertFalse(any(socket.closed for socket in sockets))
+
+        self.client.stop()
+        self.client.join()
+        self.assertTrue(all(socket.closed for socket in sockets))
+
+        with self.assertRaises(RemoteException):
+            self.client.sleep(0)
+
+
+class TestRpcWorkers(TestRpc):
+
+    worker_count = 4
+
+    def test_subscribe(self):
+        # Publish socket of server is not used from worker threads
+        self.skipTest("publish is only called in server thread")
+
+    def test_submit(self):
+        """
+        Responses of requests executed by worker threads are out of order.
+        """
+        delays = [0.3, 0.1, 0.2, 0]
+        futures = {self.client.submit("sleep", delay): delay for delay in delays}
+
+        completed = []
+        for future in as_completed(futures, 5):
+            self.assertEqual(future.result(), futures[future])
+            completed.append(future.result())
+
+        self.assertEqual(completed, sorted(delays))
+        self.assertEqual(len(self.thread_ids), len(delays))
+
+    def test_pipelining(self):
+        """
+        Requests in flight are executed at the same time by worker pool.
+        """
+        start = time.monotonic()
+        futures = [self.client.submit("sleep", 0.2) for _ in range(self.worker_count)]
+        for future in futures:
+            future.result(5)
+
+        self.assertLess(time.monotonic() - start, 0.2 * self.worker_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+"""
+Test if websocket client decodes and processes data fine
+"""
+import asyncio
+import json
+import unittest
+import zlib
+from threading import Event as Signal, Thread
+from time import sleep
+
+from aiohttp import web
+
+from vnpy.api.websocket import (
+    AsyncWebsocketClient,
+    JsonDecoder,
+    WebsocketClient,
+    ZlibJsonDecoder,
+    WBITS_DEFLATE,
+    WBITS_GZIP
+)
+
+
+PACKETS = [{"n": i, "data": [[str(i), "1.5"]]} for i in range(10)]
+
+
+def compress(text: str, wbits: int) -> bytes:
+    compressor = zlib.compressobj(wbits=wbits)
+    return compressor.compress(text.encode()) + compressor.flush()
+
+
+class FakeWebsocket:
+
+    def __init__(self, client: WebsocketClient, messages: list):
+        self.client = client
+        self.messages = list(messages)
+
+    def recv(self):
+        if self.messages:
+            return self.messages.pop(0)
+
+        # Connection closed after all messages received
+        self.client._active = False
+        return ""
+
+    def close(self):
+        pass
+
+
+class TestDecoder(unittest.TestCase):
+
+    def test_json(self):
+        decoder = JsonDecoder()
+        for packet in PACKETS:
+            self.assertEqual(decoder(json.dumps(packet)), packet)
+            self.assertEqual(decoder(json.dumps(packet).encode()), packet)
+
+    def test_zlib(self):
+        for wbits in [WBITS_DEFLATE, WBITS_GZIP]:
+            decoder = ZlibJsonDecoder(wbits)
+            for packet in PACKETS:
+                data = compress(json.dumps(packet), wbits)
+                self.assertEqual(decoder(data), packet)
+
+    def test_zlib_stream(self):
+        compressor = zlib.compressobj(wbits=WBITS_DEFLATE)
+        decoder = ZlibJsonDecoder(WBITS_DEFLATE, stream=True)
+
+        for packet in PACKETS:
+            data = compressor.compress(json.dumps(packet).encode())
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.assertEqual(decoder(data), packet)
+
+
+class TestWebsocketClient(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = WebsocketClient()
+        self.client.decoder = ZlibJsonDecoder(WBITS_GZIP)
+
+        self.received = []
+        self.client.on_packet = self.received.append
+
+    def run_messages(self, messages: list):
+        ws = FakeWebsocket(self.client, messages)
+        self.client._ws = ws
+        self.client._active = True
+        self.client._run_recv(ws)
+
+    def test_run_recv(self):
+        messages = [compress(json.dumps(packet), WBITS_GZIP) for packet in PACKETS]
+        self.run_messages(messages)
+
+        self.assertEqual(self.received, PACKETS)
+        self.assertEqual(self.client._last_received_text, messages[-1])
+
+    def test_record_on_error(self):
+        self.client.record_received = False
+
+        def on_packet(packet: dict):
+            if packet["n"] == 3:
+                raise KeyError("n")
+
+        self.client.on_packet = on_packet
+        messages = [compress(json.dumps(packet), WBITS_GZIP) for packet in PACKETS]
+
+        with self.assertRaises(KeyError):
+            self.run_messages(messages)
+        self.assertEqual(self.client._last_received_text, messages[3])
+
+
+class TestServer:
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.runner = None
+        self.url = ""
+        self.connection_count = 0
+
+    def start(self):
+        Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.setup(), self.loop).result()
+
+    async def setup(self):
+        app = web.Application()
+        app.router.add_get("/ws", self.handle_ws)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = self.runner.addresses[0][1]
+        self.url = f"ws://127.0.0.1:{port}/ws"
+
+    async def handle_ws(self, request: web.Request):
+        """
+        Echo packets received, and close connection if asked.
+        """
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connection_count += 1
+
+        async for msg in ws:
+            packet = json.loads(msg.data)
+            if packet.get("close"):
+                break
+            await ws.send_str(json.dumps(packet))
+
+        await ws.close()
+        return ws
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class TestAsyncWebsocketClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = TestServer()
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def setUp(self) -> None:
+        self.received = []
+        self.disconnected = Signal()
+        self.finished = Signal()
+
+        self.clients = []
+        for _ in range(3):
+            client = AsyncWebsocketClient()
+            client.reconnect_interval = 0.1
+            client.init(self.server.url)
+            client.on_disconnected = self.disconnected.set
+            client.on_packet = self.on_packet
+            self.clients.append(client)
+
+    def tearDown(self) -> None:
+        for client in self.clients:
+            client.stop()
+            client.join()
+
+    def on_packet(self, packet: dict):
+        self.received.append(packet["n"])
+        if len(self.received) == 30:
+            self.finished.set()
+
+    def wait_connected(self, client: AsyncWebsocketClient):
+        for _ in range(50):
+            if client._ws:
+                return
+            sleep(0.1)
+        self.fail("connection timeout")
+
+    def test_multiplex(self):
+        for client in self.clients:
+            client.start()
+
+        for client in self.clients:
+            self.wait_connected(client)
+            for i in range(10):
+                client.send_packet({"n": i})
+
+        self.assertTrue(self.finished.wait(5))
+        self.assertEqual(sorted(self.received), sorted(list(range(10)) * 3))
+
+    def test_reconnect(self):
+        client = self.clients[0]
+        client.start()
+        self.wait_connected(client)
+        count = self.server.connection_count
+
+        client.send_packet({"close": True})
+        self.assertTrue(self.disconnected.wait(5))
+
+        self.wait_connected(client)
+        self.assertEqual(self.server.connection_count, count + 1)
+
+        client.stop()
+        client.join()
+        self.assertIsNone(client._ws)
+
+
+if __name__ == '__main__':
+    unittest.main()
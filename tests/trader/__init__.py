@@ -1,2 +1,9 @@
 from .test_database import *
 from .test_settings import *
+from .test_orderbook import *
+from .test_local_order_manager import *
+from .test_codec import *
+from .test_array_manager import *
+from .test_bar_generator import *
+from .test_converter import *
+from .test_oms_engine import *
@@ -0,0 +1,163 @@
+"""
+Test if array manager and streaming indicators work fine
+"""
+import unittest
+from datetime import datetime
+
+import numpy as np
+import talib
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import BarData
+from vnpy.trader.indicator import MfiIndicator
+from vnpy.trader.utility import ArrayManager
+
+
+SIZE = 50
+
+
+def create_bars(count: int, seed: int = 0) -> list:
+    rng = np.random.RandomState(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 1, count))
+
+    bars = []
+    for i in range(count):
+        bar = BarData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            datetime=datetime(2019, 1, 1),
+            gateway_name="TEST",
+            open_price=close[i] + rng.normal(0, 0.5),
+            high_price=close[i] + abs(rng.normal(0, 1)),
+            low_price=close[i] - abs(rng.normal(0, 1)),
+            close_price=close[i],
+            volume=float(rng.randint(1, 1000))
+        )
+        bars.append(bar)
+    return bars
+
+
+def assert_close(value, expected):
+    np.testing.assert_allclose(value, expected, rtol=1e-9, atol=1e-9)
+
+
+class TestArrayManager(unittest.TestCase):
+
+    def test_ring_buffer(self):
+        am = ArrayManager(SIZE)
+        closes = []
+
+        for bar in create_bars(SIZE * 5 + 7):
+            am.update_bar(bar)
+            closes.append(bar.close_price)
+
+            expected = np.zeros(SIZE)
+            latest = closes[-SIZE:]
+            expected[SIZE - len(latest):] = latest
+            np.testing.assert_array_equal(am.close, expected)
+
+        self.assertTrue(am.inited)
+        self.assertEqual(am.high[-1], bar.high_price)
+        self.assertEqual(am.volume[-1], bar.volume)
+
+    def test_window_indicators(self):
+        """
+        Window based indicators are the same as TA-Lib over time series.
+        """
+        am = ArrayManager(SIZE)
+        streaming_am = ArrayManager(SIZE, streaming=True)
+
+        for i, bar in enumerate(create_bars(SIZE * 4)):
+            am.update_bar(bar)
+            streaming_am.update_bar(bar)
+
+            # Indicators are registered with half of time series updated
+            if i < SIZE // 2:
+                continue
+
+            # TA-Lib results include zeros before inited
+            if not am.inited:
+                streaming_am.sma(10)
+                streaming_am.cci(14)
+                continue
+
+            assert_close(streaming_am.sma(10), am.sma(10))
+            assert_close(streaming_am.std(10), am.std(10))
+            assert_close(streaming_am.boll(20, 2), am.boll(20, 2))
+            assert_close(streaming_am.cci(14), am.cci(14))
+            assert_close(streaming_am.donchian(20), am.donchian(20))
+            assert_close(streaming_am.aroon(14), am.aroon(14))
+            assert_close(streaming_am.aroonosc(14), am.aroonosc(14))
+            assert_close(streaming_am.ultosc(), am.ultosc())
+            assert_close(streaming_am.mfi(14), am.mfi(14))
+
+        self.assertEqual(len(streaming_am.indicators), 10)
+
+    def test_recursive_indicators(self):
+        """
+        Recursive indicators are the same as TA-Lib over time series.
+        """
+        am = ArrayManager(SIZE)
+        streaming_am = ArrayManager(SIZE, streaming=True)
+
+        for bar in create_bars(SIZE * 4):
+            am.update_bar(bar)
+            streaming_am.update_bar(bar)
+
+            assert_close(streaming_am.atr(14), am.atr(14))
+            assert_close(streaming_am.rsi(14), am.rsi(14))
+            assert_close(streaming_am.adx(14), am.adx(14))
+            assert_close(streaming_am.macd(12, 26, 9), am.macd(12, 26, 9))
+
+            # Keltner uses streaming sma, which differs before inited
+            if am.inited:
+                assert_close(streaming_am.keltner(20, 2), am.keltner(20, 2))
+
+    def test_indicators_over_history(self):
+        """
+        Streaming mfi is the same as TA-Lib over all bars, beyond the
+        size of array manager.
+        """
+        bars = create_bars(SIZE * 4)
+        high = np.array([bar.high_price for bar in bars])
+        low = np.array([bar.low_price for bar in bars])
+        close = np.array([bar.close_price for bar in bars])
+        volume = np.array([bar.volume for bar in bars])
+
+        indicator = MfiIndicator(14)
+        expected = talib.MFI(high, low, close, volume, 14)
+
+        for i, bar in enumerate(bars):
+            value = indicator.update(bar.high_price, bar.low_price, bar.close_price, bar.volume)
+            assert_close(value, expected[i])
+
+    def test_memoize(self):
+        am = ArrayManager(SIZE, memoize=True)
+        plain_am = ArrayManager(SIZE)
+
+        for bar in create_bars(SIZE * 2):
+            am.update_bar(bar)
+            plain_am.update_bar(bar)
+
+            # sma(20, False) is calculated once and shared by boll and keltner
+            assert_close(am.boll(20, 2), plain_am.boll(20, 2))
+            assert_close(am.keltner(20, 2), plain_am.keltner(20, 2))
+            assert_close(am.sma(20), plain_am.sma(20))
+            assert_close(am.sma(n=20, array=True), plain_am.sma(20, True))
+            assert_close(am.sma(20, True), plain_am.sma(20, True))
+
+        stats = am.get_cache_stats()
+        self.assertEqual(stats["misses"], SIZE * 2 * 6)
+        self.assertEqual(stats["hits"], SIZE * 2 * 3)
+        self.assertEqual(plain_am.get_cache_stats()["hits"], 0)
+
+        # Arrays are only shared by callers if memoized
+        self.assertIs(am.sma(20, True), am.sma(20, True))
+
+        result = plain_am.sma(20, True)
+        result[:] = 0
+        assert_close(plain_am.sma(20, True), am.sma(20, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
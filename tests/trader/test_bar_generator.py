@@ -0,0 +1,133 @@
+"""
+Test if batch resampling gives the same bars as bar generator
+"""
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.utility import (
+    BAR_DTYPE,
+    BAR_FIELDS,
+    TICK_DTYPE,
+    BarGenerator,
+    resample_bars,
+    resample_ticks
+)
+
+
+def create_datetimes(count: int, max_gap: int, unit: str, seed: int) -> np.ndarray:
+    """
+    Create increasing datetimes with random gaps, including long gaps.
+    """
+    rng = np.random.RandomState(seed)
+    gaps = rng.randint(1, max_gap + 1, count)
+    gaps[rng.rand(count) < 0.002] *= 1000
+
+    start = np.datetime64(datetime(2019, 1, 1, 9, 0), unit)
+    return (start + np.cumsum(gaps).astype(f"timedelta64[{unit}]")).astype("datetime64[us]")
+
+
+def create_bar_array(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+
+    bars = np.zeros(count, dtype=BAR_DTYPE)
+    bars["datetime"] = create_datetimes(count, 3, "m", seed)
+    bars["close_price"] = 1000 + np.cumsum(rng.normal(0, 1, count))
+    bars["open_price"] = bars["close_price"] + rng.normal(0, 1, count)
+    bars["high_price"] = bars["close_price"] + np.abs(rng.normal(0, 1, count))
+    bars["low_price"] = bars["close_price"] - np.abs(rng.normal(0, 1, count))
+    bars["volume"] = rng.rand(count) * 100
+    bars["open_interest"] = rng.randint(1000, 2000, count)
+    return bars
+
+
+def create_tick_array(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+
+    ticks = np.zeros(count, dtype=TICK_DTYPE)
+    ticks["datetime"] = create_datetimes(count, 20, "s", seed)
+    ticks["last_price"] = np.round(1000 + np.cumsum(rng.normal(0, 1, count)), 1)
+    ticks["last_price"][rng.rand(count) < 0.01] = 0
+
+    # Volume is reset sometimes, and changes are fractional
+    ticks["volume"] = np.cumsum(rng.rand(count) * 0.1)
+    ticks["volume"][count // 2:] -= ticks["volume"][count // 2]
+    ticks["open_interest"] = rng.randint(1000, 2000, count)
+    return ticks
+
+
+def to_array(bars: list) -> np.ndarray:
+    array = np.zeros(len(bars), dtype=BAR_DTYPE)
+    for name in BAR_FIELDS:
+        array[name] = [getattr(bar, name) for bar in bars]
+    return array
+
+
+class TestBarGenerator(unittest.TestCase):
+
+    def generate_window_bars(self, array: np.ndarray, window: int, interval: Interval):
+        window_bars = []
+        generator = BarGenerator(None, window, window_bars.append, interval)
+
+        for values in zip(*[array[name].tolist() for name in BAR_FIELDS]):
+            bar = BarData(
+                symbol="BTCUSDT",
+                exchange=Exchange.HUOBI,
+                interval=Interval.MINUTE,
+                gateway_name="TEST",
+                **dict(zip(BAR_FIELDS, values))
+            )
+            generator.update_bar(bar)
+
+        return to_array(window_bars)
+
+    def test_resample_bars(self):
+        array = create_bar_array(20000)
+
+        for window in [1, 2, 3, 5, 15, 30]:
+            expected = self.generate_window_bars(array, window, Interval.MINUTE)
+            np.testing.assert_array_equal(resample_bars(array, window), expected)
+
+        for window in [1, 2, 4]:
+            expected = self.generate_window_bars(array, window, Interval.HOUR)
+            result = resample_bars(array, window, Interval.HOUR)
+            np.testing.assert_array_equal(result, expected)
+
+    def test_resample_ticks(self):
+        array = create_tick_array(20000)
+
+        bars = []
+        generator = BarGenerator(bars.append)
+        fields = ("datetime", "last_price", "volume", "open_interest")
+
+        for values in zip(*[array[name].tolist() for name in fields]):
+            tick = TickData(
+                symbol="BTCUSDT",
+                exchange=Exchange.HUOBI,
+                name="",
+                gateway_name="TEST",
+                **dict(zip(fields, values))
+            )
+            generator.update_tick(tick)
+
+        result = resample_ticks(array)
+        expected = to_array(bars)
+
+        # Volume changes are summed in different order
+        np.testing.assert_allclose(result["volume"], expected["volume"], rtol=1e-12)
+        for name in BAR_FIELDS:
+            if name != "volume":
+                np.testing.assert_array_equal(result[name], expected[name])
+
+    def test_empty(self):
+        self.assertEqual(len(resample_bars(create_bar_array(0), 5)), 0)
+        self.assertEqual(len(resample_bars(create_bar_array(3), 60)), 0)
+        self.assertEqual(len(resample_ticks(np.zeros(0, dtype=TICK_DTYPE))), 0)
+        self.assertEqual(len(resample_ticks(create_tick_array(10)[:1])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
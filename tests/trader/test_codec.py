@@ -0,0 +1,47 @@
+"""
+Test if codec works fine
+"""
+import unittest
+from datetime import datetime
+
+from vnpy.event import Event
+from vnpy.trader import codec
+from vnpy.trader.constant import Direction, Exchange, Status
+from vnpy.trader.object import OrderData, TickData
+
+
+class TestCodec(unittest.TestCase):
+
+    def test_event(self):
+        tick = TickData(
+            symbol="BTCUSDT",
+            exchange=Exchange.BINANCE,
+            datetime=datetime.now(),
+            gateway_name="TEST",
+            last_price=100.5
+        )
+        event = codec.loads(codec.dumps(Event("eTick.", tick)))
+
+        self.assertEqual(event.type, "eTick.")
+        self.assertEqual(event.data, tick)
+        self.assertEqual(event.data.vt_symbol, tick.vt_symbol)
+
+    def test_object(self):
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.BINANCE,
+            orderid="1",
+            direction=Direction.LONG,
+            status=Status.ALLTRADED,
+            gateway_name="TEST"
+        )
+        data = {"orders": [order], "extra": {1, 2}}
+        result = codec.loads(codec.dumps(data))
+
+        self.assertEqual(result["orders"][0], order)
+        self.assertEqual(result["orders"][0].vt_orderid, order.vt_orderid)
+        self.assertEqual(result["extra"], {1, 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
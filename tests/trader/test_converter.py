@@ -0,0 +1,179 @@
+"""
+Test if incremental frozen volume of position holding is the same as
+full recalculation
+"""
+import random
+import unittest
+
+from vnpy.trader.constant import Direction, Exchange, Offset, Product, Status
+from vnpy.trader.converter import PositionHolding
+from vnpy.trader.object import ContractData, OrderData, OrderRequest, TradeData
+
+
+FROZEN_NAMES = [
+    "long_pos_frozen",
+    "long_yd_frozen",
+    "long_td_frozen",
+    "short_pos_frozen",
+    "short_yd_frozen",
+    "short_td_frozen",
+]
+
+
+class FullHolding:
+    """
+    Frozen volume calculated by walking through all active orders.
+    """
+
+    def __init__(self):
+        self.active_orders = {}
+
+    def update_order(self, order: OrderData, holding: PositionHolding):
+        if order.is_active():
+            self.active_orders[order.vt_orderid] = order
+        else:
+            if order.vt_orderid in self.active_orders:
+                self.active_orders.pop(order.vt_orderid)
+
+        self.calculate_frozen(holding.long_td, holding.short_td)
+
+    def calculate_frozen(self, long_td: float, short_td: float):
+        self.long_pos_frozen = 0
+        self.long_yd_frozen = 0
+        self.long_td_frozen = 0
+
+        self.short_pos_frozen = 0
+        self.short_yd_frozen = 0
+        self.short_td_frozen = 0
+
+        for order in self.active_orders.values():
+            if order.offset == Offset.OPEN:
+                continue
+
+            frozen = order.volume - order.traded
+
+            if order.direction == Direction.LONG:
+                if order.offset == Offset.CLOSETODAY:
+                    self.short_td_frozen += frozen
+                elif order.offset == Offset.CLOSEYESTERDAY:
+                    self.short_yd_frozen += frozen
+                elif order.offset == Offset.CLOSE:
+                    self.short_td_frozen += frozen
+
+                    if self.short_td_frozen > short_td:
+                        self.short_yd_frozen += self.short_td_frozen - short_td
+                        self.short_td_frozen = short_td
+            elif order.direction == Direction.SHORT:
+                if order.offset == Offset.CLOSETODAY:
+                    self.long_td_frozen += frozen
+                elif order.offset == Offset.CLOSEYESTERDAY:
+                    self.long_yd_frozen += frozen
+                elif order.offset == Offset.CLOSE:
+                    self.long_td_frozen += frozen
+
+                    if self.long_td_frozen > long_td:
+                        self.long_yd_frozen += self.long_td_frozen - long_td
+                        self.long_td_frozen = long_td
+
+            self.long_pos_frozen = self.long_td_frozen + self.long_yd_frozen
+            self.short_pos_frozen = self.short_td_frozen + self.short_yd_frozen
+
+
+class TestPositionHolding(unittest.TestCase):
+
+    def setUp(self) -> None:
+        contract = ContractData(
+            symbol="rb2001",
+            exchange=Exchange.SHFE,
+            name="rb2001",
+            product=Product.FUTURES,
+            size=10,
+            pricetick=1,
+            gateway_name="TEST"
+        )
+        self.holding = PositionHolding(contract)
+        self.full = FullHolding()
+        self.orders = []
+        self.orderid = 0
+        self.random = random.Random(0)
+
+    def check_frozen(self):
+        for name in FROZEN_NAMES:
+            self.assertEqual(getattr(self.holding, name), getattr(self.full, name), name)
+
+    def send_order(self, offsets: list):
+        self.orderid += 1
+
+        req = OrderRequest(
+            symbol="rb2001",
+            exchange=Exchange.SHFE,
+            direction=self.random.choice([Direction.LONG, Direction.SHORT]),
+            type=None,
+            volume=float(self.random.randint(1, 10)),
+            offset=self.random.choice(offsets)
+        )
+        order = req.create_order_data(str(self.orderid), "TEST")
+
+        self.holding.update_order_request(req, order.vt_orderid)
+        self.full.update_order(order, self.holding)
+        self.orders.append(order)
+
+    def update_order(self):
+        order = self.random.choice(self.orders)
+
+        if self.random.random() < 0.5:
+            order.traded = min(order.volume, order.traded + self.random.randint(1, 3))
+            if order.traded == order.volume:
+                order.status = Status.ALLTRADED
+            else:
+                order.status = Status.PARTTRADED
+        else:
+            order.status = self.random.choice([Status.CANCELLED, Status.REJECTED])
+
+        self.holding.update_order(order)
+        self.full.update_order(order, self.holding)
+
+        if not order.is_active():
+            self.orders.remove(order)
+
+    def update_trade(self):
+        self.holding.update_trade(TradeData(
+            symbol="rb2001",
+            exchange=Exchange.SHFE,
+            orderid="",
+            tradeid="",
+            direction=self.random.choice([Direction.LONG, Direction.SHORT]),
+            offset=self.random.choice([Offset.OPEN, Offset.CLOSETODAY]),
+            volume=float(self.random.randint(1, 10)),
+            gateway_name="TEST"
+        ))
+
+    def run_random(self, offsets: list):
+        for _ in range(2000):
+            n = self.random.random()
+            if n < 0.4 or not self.orders:
+                self.send_order(offsets)
+            elif n < 0.8:
+                self.update_order()
+            else:
+                self.update_trade()
+
+            self.check_frozen()
+
+    def test_close(self):
+        self.run_random([Offset.OPEN, Offset.CLOSE, Offset.CLOSEYESTERDAY])
+
+    def test_close_today(self):
+        self.run_random([Offset.OPEN, Offset.CLOSETODAY, Offset.CLOSEYESTERDAY])
+
+    def test_mixed(self):
+        self.run_random([
+            Offset.OPEN,
+            Offset.CLOSE,
+            Offset.CLOSETODAY,
+            Offset.CLOSEYESTERDAY
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
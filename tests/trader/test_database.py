@@ -5,6 +5,7 @@ import os
 import unittest
 from copy import copy
 from datetime import datetime, timedelta
+from unittest import mock
 
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.database.database import Driver
@@ -66,6 +67,56 @@ tick = TickData(
 )
 
 
+def create_bars(count: int) -> list:
+    """
+    Create bars of increasing datetime ending before now.
+    """
+    start = now().replace(microsecond=0) - timedelta(minutes=count)
+
+    bars = []
+    for i in range(count):
+        data = copy(bar)
+        data.datetime = start + timedelta(minutes=i)
+        data.close_price = float(i)
+        data.volume = float(i * 10)
+        bars.append(data)
+    return bars
+
+
+def create_ticks(count: int) -> list:
+    """
+    Create ticks of increasing datetime ending before now, with depth
+    data for ticks of even index.
+    """
+    start = now().replace(microsecond=0) - timedelta(seconds=count)
+
+    ticks = []
+    for i in range(count):
+        data = copy(tick)
+        data.datetime = start + timedelta(seconds=i)
+        data.last_price = float(i)
+        data.bid_price_1 = float(i)
+        if not i % 2:
+            data.bid_price_2 = float(i - 1)
+            data.ask_volume_5 = float(i + 5)
+        ticks.append(data)
+    return ticks
+
+
+def patch_fetch_size(driver: Driver, size: int):
+    """
+    Patch number of rows fetched by each query of database.
+    """
+    if driver is Driver.MONGODB:
+        from vnpy.trader.database import database_mongo as module
+        name = "FETCH_BATCH_SIZE"
+    else:
+        from vnpy.trader.database import database_sql as module
+        name = "FETCH_CHUNK_SIZE"
+
+    return mock.patch.object(module, name, size)
+
+
 class TestDatabase(unittest.TestCase):
 
     def connect(self, settings: dict):
@@ -192,6 +243,95 @@ class TestDatabase(unittest.TestCase):
                 got = self.manager.get_newest_tick_data(tick.symbol, tick.exchange)
                 self.assertEqual(got.volume, newer_one.volume, "the newest tick we got mismatched")
 
+    def test_upsert_overwrite_bar(self):
+        for driver, settings in profiles.items():
+            with self.subTest(driver=driver, settings=settings):
+                self.connect(settings)
+                bars = create_bars(5)
+                self.manager.save_bar_data(bars)
+
+                # Existing bar is overwritten, and the last one of the same
+                # key in one call is saved.
+                first = copy(bars[2])
+                first.close_price = 100.0
+                second = copy(bars[2])
+                second.close_price = 200.0
+                self.manager.save_bar_data([first, second, bars[4]])
+
+                got = self.manager.load_bar_data(
+                    bar.symbol, bar.exchange, bar.interval, bars[0].datetime, now()
+                )
+                self.assertEqual(len(got), 5)
+                self.assertEqual([b.close_price for b in got], [0.0, 1.0, 200.0, 3.0, 4.0])
+
+    def test_upsert_overwrite_tick(self):
+        for driver, settings in profiles.items():
+            with self.subTest(driver=driver, settings=settings):
+                self.connect(settings)
+                ticks = create_ticks(3)
+                self.manager.save_tick_data(ticks)
+
+                # Depth data is cleared when overwritten by tick without it
+                data = copy(ticks[0])
+                data.last_price = 100.0
+                data.bid_price_2 = 0
+                data.ask_volume_5 = 0
+                self.manager.save_tick_data([data])
+
+                got = self.manager.load_tick_data(
+                    tick.symbol, tick.exchange, ticks[0].datetime, now()
+                )
+                self.assertEqual(len(got), 3)
+                self.assertEqual(got[0].last_price, 100.0)
+                self.assertEqual(got[0].bid_price_2, 0)
+                self.assertEqual(got[0].ask_volume_5, 0)
+                self.assertEqual(got[2].bid_price_2, 1.0)
+                self.assertEqual(got[2].ask_volume_5, 7.0)
+
+    def test_iter_bar_data(self):
+        for driver, settings in profiles.items():
+            with self.subTest(driver=driver, settings=settings):
+                self.connect(settings)
+
+                # Saved with several insert statements
+                bars = create_bars(7000)
+                self.manager.save_bar_data(bars)
+
+                # Count is a multiple of fetch size
+                with patch_fetch_size(driver, 1000):
+                    got = list(self.manager.iter_bar_data(
+                        bar.symbol, bar.exchange, bar.interval, bars[0].datetime, now()
+                    ))
+
+                self.assertEqual(got, bars)
+
+                # Range ends within a chunk
+                with patch_fetch_size(driver, 3):
+                    got = list(self.manager.iter_bar_data(
+                        bar.symbol, bar.exchange, bar.interval, bars[10].datetime, bars[20].datetime
+                    ))
+
+                self.assertEqual(got, bars[10:21])
+
+    def test_iter_tick_data(self):
+        for driver, settings in profiles.items():
+            with self.subTest(driver=driver, settings=settings):
+                self.connect(settings)
+                ticks = create_ticks(10)
+                self.manager.save_tick_data(ticks)
+
+                with patch_fetch_size(driver, 3):
+                    got = list(self.manager.iter_tick_data(
+                        tick.symbol, tick.exchange, ticks[0].datetime, now()
+                    ))
+
+                self.assertEqual(len(got), 10)
+                for data, expected in zip(got, ticks):
+                    self.assertEqual(data.datetime, expected.datetime)
+                    self.assertEqual(data.last_price, expected.last_price)
+                    self.assertEqual(data.bid_price_2, expected.bid_price_2)
+                    self.assertEqual(data.ask_volume_5, expected.ask_volume_5)
+
 
 if __name__ == "__main__":
     unittest.main()
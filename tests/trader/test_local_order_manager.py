@@ -0,0 +1,165 @@
+"""
+Test if local order manager works fine
+"""
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from vnpy.trader.constant import Direction, Exchange, Status
+from vnpy.trader.gateway import LocalOrderManager
+from vnpy.trader.object import CancelRequest, OrderData
+
+
+class Clock:
+    """
+    Clock patched as monotonic time of local order manager.
+    """
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalOrderManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.pushed = []
+        self.cancelled = []
+        self.logs = []
+        gateway = SimpleNamespace(
+            cancel_order=self.cancelled.append,
+            on_order=self.pushed.append,
+            write_log=self.logs.append
+        )
+        self.manager = LocalOrderManager(
+            gateway,
+            max_finished_orders=2,
+            finished_order_ttl=30,
+            push_data_ttl=60
+        )
+
+        self.clock = Clock()
+        patcher = mock.patch("vnpy.trader.gateway.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_order(self, sys_orderid: str, status: Status):
+        if sys_orderid:
+            local_orderid = self.manager.get_local_orderid(sys_orderid)
+        else:
+            local_orderid = self.manager.new_local_orderid()
+
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid=local_orderid,
+            direction=Direction.LONG,
+            status=status,
+            gateway_name="TEST"
+        )
+        self.manager.on_order(order)
+        return order
+
+    def test_evict_finished_orders(self):
+        active = self.create_order("0", Status.NOTTRADED)
+        for i in range(1, 6):
+            self.create_order(str(i), Status.ALLTRADED)
+
+        stats = self.manager.get_stats()
+        self.assertEqual(stats["orders"], 3)
+        self.assertEqual(stats["sys_local_orderid_map"], 3)
+        self.assertEqual(stats["evicted_count"], 3)
+        self.assertEqual(len(self.pushed), 6)
+
+        self.assertIsNone(self.manager.get_order_with_sys_orderid("1"))
+        self.assertIsNotNone(self.manager.get_order_with_sys_orderid("5"))
+        self.assertEqual(
+            self.manager.get_order_with_local_orderid(active.orderid).status,
+            Status.NOTTRADED
+        )
+
+    def test_evict_by_time(self):
+        self.create_order("1", Status.ALLTRADED)
+
+        self.clock.now = 20
+        self.create_order("2", Status.CANCELLED)
+        self.assertEqual(self.manager.get_stats()["evicted_count"], 0)
+
+        # Order finished more than ttl ago is evicted by next finished one
+        self.clock.now = 40
+        self.create_order("3", Status.ALLTRADED)
+
+        self.assertIsNone(self.manager.get_order_with_sys_orderid("1"))
+        self.assertIsNotNone(self.manager.get_order_with_sys_orderid("2"))
+        self.assertEqual(self.manager.get_stats()["evicted_count"], 1)
+
+    def test_expire_push_data(self):
+        received = []
+        self.manager.push_data_callback = received.append
+
+        self.manager.add_push_data("1", {"id": 1})
+
+        self.clock.now = 30
+        self.manager.add_push_data("2", {"id": 2})
+        self.assertEqual(self.manager.get_stats()["expired_count"], 0)
+
+        # Push data waiting more than ttl is expired by next one
+        self.clock.now = 61
+        self.manager.add_push_data("3", {"id": 3})
+        self.assertEqual(self.manager.get_stats()["expired_count"], 1)
+        self.assertEqual(self.manager.get_stats()["push_data_buf"], 2)
+
+        # Push data still waiting is processed after orderid map updated
+        self.manager.get_local_orderid("1")
+        self.manager.get_local_orderid("2")
+        self.assertEqual(received, [{"id": 2}])
+
+    def test_cancel_order(self):
+        order = self.create_order("", Status.SUBMITTING)
+        req = CancelRequest(order.orderid, order.symbol, order.exchange)
+
+        # Cancel request is sent after sys orderid received
+        self.manager.cancel_order(req)
+        self.assertFalse(self.cancelled)
+
+        self.manager.update_orderid_map(order.orderid, "1")
+        self.assertEqual(self.cancelled, [req])
+        self.assertEqual(self.manager.get_stats()["cancel_request_buf"], 0)
+
+    def test_cancel_unknown_order(self):
+        # Unknown order
+        req = CancelRequest("unknown", "BTCUSDT", Exchange.HUOBI)
+        self.manager.cancel_order(req)
+
+        # Order finished before sys orderid received
+        order = self.create_order("", Status.SUBMITTING)
+        req = CancelRequest(order.orderid, order.symbol, order.exchange)
+        order.status = Status.REJECTED
+        self.manager.on_order(order)
+        self.manager.cancel_order(req)
+
+        # Evicted order
+        order = self.create_order("1", Status.ALLTRADED)
+        for i in range(2, 5):
+            self.create_order(str(i), Status.ALLTRADED)
+        req = CancelRequest(order.orderid, order.symbol, order.exchange)
+        self.manager.cancel_order(req)
+
+        self.assertFalse(self.cancelled)
+        self.assertEqual(self.manager.get_stats()["cancel_request_buf"], 0)
+        self.assertEqual(len(self.logs), 3)
+
+    def test_finish_before_sys_orderid(self):
+        order = self.create_order("", Status.SUBMITTING)
+        req = CancelRequest(order.orderid, order.symbol, order.exchange)
+        self.manager.cancel_order(req)
+
+        order.status = Status.REJECTED
+        self.manager.on_order(order)
+        self.assertEqual(self.manager.get_stats()["cancel_request_buf"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
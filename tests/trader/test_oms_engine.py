@@ -0,0 +1,233 @@
+"""
+Test if active order indexes of oms engine work fine
+"""
+import random
+import time
+import unittest
+from threading import Thread
+from types import SimpleNamespace
+from unittest import mock
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Status
+from vnpy.trader.engine import OmsEngine
+from vnpy.trader.event import EVENT_ORDER
+from vnpy.trader.object import OrderData
+
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "EOSUSDT"]
+GATEWAYS = ["BINANCE", "HUOBI"]
+REFERENCES = ["", "STRATEGY1", "STRATEGY2"]
+
+
+def get_orderids(orders: list) -> set:
+    return {order.vt_orderid for order in orders}
+
+
+class PausingDict(dict):
+    """
+    Dict calling pause function once after the first lookup, so that
+    another thread can run in between.
+    """
+
+    def __init__(self, data: dict, pause):
+        super().__init__(data)
+        self.pause = pause
+
+    def after_lookup(self):
+        pause, self.pause = self.pause, None
+        if pause:
+            pause()
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        self.after_lookup()
+        return value
+
+    def __contains__(self, key):
+        value = super().__contains__(key)
+        self.after_lookup()
+        return value
+
+
+class TestOmsEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.main_engine = SimpleNamespace()
+        self.engine = OmsEngine(self.main_engine, EventEngine())
+        self.references = {}
+        self.random = random.Random(0)
+
+    def update_order(self, order: OrderData):
+        self.engine.process_order_event(Event(EVENT_ORDER, order))
+
+    def create_order(self, orderid: int):
+        order = OrderData(
+            symbol=self.random.choice(SYMBOLS),
+            exchange=Exchange.HUOBI,
+            orderid=str(orderid),
+            direction=Direction.LONG,
+            status=Status.SUBMITTING,
+            gateway_name=self.random.choice(GATEWAYS)
+        )
+        reference = self.random.choice(REFERENCES)
+        self.references[order.vt_orderid] = reference
+
+        # Reference may be updated before or after order event
+        if self.random.random() < 0.5:
+            self.update_order(order)
+            if reference:
+                self.main_engine.update_order_reference(order.vt_orderid, reference)
+        else:
+            if reference:
+                self.main_engine.update_order_reference(order.vt_orderid, reference)
+            self.update_order(order)
+
+    def check_indexes(self):
+        active_orders = list(self.engine.active_orders.values())
+        self.assertEqual(self.main_engine.get_active_order_count(), len(active_orders))
+
+        for vt_symbol in [f"{symbol}.HUOBI" for symbol in SYMBOLS]:
+            expected = [order for order in active_orders if order.vt_symbol == vt_symbol]
+            orders = self.main_engine.get_all_active_orders(vt_symbol)
+            self.assertEqual(get_orderids(orders), get_orderids(expected))
+            self.assertEqual(self.main_engine.get_active_order_count(vt_symbol=vt_symbol), len(expected))
+
+        for gateway_name in GATEWAYS:
+            expected = [order for order in active_orders if order.gateway_name == gateway_name]
+            orders = self.main_engine.get_gateway_active_orders(gateway_name)
+            self.assertEqual(get_orderids(orders), get_orderids(expected))
+            self.assertEqual(self.main_engine.get_active_order_count(gateway_name=gateway_name), len(expected))
+
+        for reference in REFERENCES[1:]:
+            expected = [
+                order for order in active_orders
+                if self.references[order.vt_orderid] == reference
+            ]
+            orders = self.main_engine.get_reference_active_orders(reference)
+            self.assertEqual(get_orderids(orders), get_orderids(expected))
+            self.assertEqual(self.main_engine.get_active_order_count(reference=reference), len(expected))
+
+    def test_indexes(self):
+        for i in range(1000):
+            if self.random.random() < 0.5 or not self.engine.active_orders:
+                self.create_order(i)
+            else:
+                order = self.random.choice(list(self.engine.active_orders.values()))
+                order.status = self.random.choice([
+                    Status.PARTTRADED,
+                    Status.ALLTRADED,
+                    Status.CANCELLED
+                ])
+                self.update_order(order)
+
+            self.check_indexes()
+
+        # Finish all orders and indexes should be empty
+        for order in list(self.engine.active_orders.values()):
+            order.status = Status.CANCELLED
+            self.update_order(order)
+
+        self.check_indexes()
+        self.assertFalse(self.engine.symbol_active_orders)
+        self.assertFalse(self.engine.gateway_active_orders)
+        self.assertFalse(self.engine.reference_active_orders)
+        self.assertFalse(self.engine.order_references)
+        self.assertFalse(self.engine.pending_references)
+
+    def test_reference_expired(self):
+        """
+        Reference of order without any order event expires after ttl.
+        """
+        clock = SimpleNamespace(now=0)
+        patcher = mock.patch("vnpy.trader.engine.monotonic", lambda: clock.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.main_engine.update_order_reference("HUOBI.1", "STRATEGY1")
+        clock.now = 30
+        self.main_engine.update_order_reference("HUOBI.2", "STRATEGY1")
+
+        # Order event arrives after reference
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid="2",
+            status=Status.NOTTRADED,
+            gateway_name="HUOBI"
+        )
+        self.update_order(order)
+
+        clock.now = 61
+        self.main_engine.update_order_reference("HUOBI.3", "STRATEGY2")
+
+        self.assertEqual(self.engine.order_references, {"HUOBI.2": "STRATEGY1", "HUOBI.3": "STRATEGY2"})
+        self.assertEqual(list(self.engine.pending_references), ["HUOBI.3"])
+        self.assertEqual(self.main_engine.get_active_order_count(reference="STRATEGY1"), 1)
+
+    def test_reference_after_finished(self):
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid="1",
+            status=Status.REJECTED,
+            gateway_name="HUOBI"
+        )
+        self.update_order(order)
+        self.main_engine.update_order_reference(order.vt_orderid, "STRATEGY1")
+
+        self.assertFalse(self.engine.order_references)
+        self.assertEqual(self.main_engine.get_active_order_count(reference="STRATEGY1"), 0)
+
+    def test_reference_before_finished(self):
+        self.main_engine.update_order_reference("HUOBI.1", "STRATEGY1")
+
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid="1",
+            status=Status.REJECTED,
+            gateway_name="HUOBI"
+        )
+        self.update_order(order)
+
+        self.assertFalse(self.engine.order_references)
+        self.assertFalse(self.engine.reference_active_orders)
+
+    def test_reference_during_order_event(self):
+        """
+        Order finished in another thread while reference is updated.
+        """
+        order = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid="1",
+            status=Status.NOTTRADED,
+            gateway_name="HUOBI"
+        )
+        self.update_order(order)
+
+        finished = OrderData(
+            symbol="BTCUSDT",
+            exchange=Exchange.HUOBI,
+            orderid="1",
+            status=Status.CANCELLED,
+            gateway_name="HUOBI"
+        )
+        thread = Thread(target=self.update_order, args=(finished,))
+
+        def finish_order():
+            thread.start()
+            time.sleep(0.1)
+
+        self.engine.orders = PausingDict(self.engine.orders, finish_order)
+        self.main_engine.update_order_reference(order.vt_orderid, "STRATEGY1")
+        thread.join()
+
+        self.assertFalse(self.engine.order_references)
+        self.assertFalse(self.engine.reference_active_orders)
+        self.assertEqual(self.main_engine.get_active_order_count(reference="STRATEGY1"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
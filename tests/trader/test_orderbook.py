@@ -0,0 +1,176 @@
+"""
+Test if order book works fine
+"""
+import json
+import random
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from zlib import crc32
+
+from vnpy.gateway.bitfinex.bitfinex_gateway import BitfinexWebsocketApi
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import TickData
+from vnpy.trader.orderbook import OrderBook
+
+
+# Order book snapshot of Bitfinex, with [price, count, amount] levels
+BITFINEX_SNAPSHOT = """[1, [
+    [7254.7, 3, 3.3], [7254.6, 2, 0.00005], [7254, 1, 12], [7253.9, 4, 0.5],
+    [7253.5, 1, 2.000001], [7252, 2, 1e-7], [7251.8, 1, 8],
+    [7254.8, 1, -0.1], [7255, 2, -4], [7255.1, 1, -0.00000123],
+    [7255.6, 3, -20.5], [7256, 1, -1], [7257.2, 1, -0.03]
+]]"""
+
+
+def calculate_bitfinex_checksum(levels: list) -> int:
+    """
+    Checksum calculated as documented by Bitfinex, with raw number text.
+    """
+    bids = [level for level in levels if not level[2].startswith("-")]
+    asks = [level for level in levels if level[2].startswith("-")]
+
+    bids.sort(key=lambda level: float(level[0]), reverse=True)
+    asks.sort(key=lambda level: float(level[0]))
+
+    buf = []
+    for i in range(25):
+        if i < len(bids):
+            buf.extend([bids[i][0], bids[i][2]])
+        if i < len(asks):
+            buf.extend([asks[i][0], asks[i][2]])
+
+    checksum = crc32(":".join(buf).encode())
+    if checksum >= 2 ** 31:
+        checksum -= 2 ** 32
+    return checksum
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def test_update(self):
+        book = OrderBook()
+        bids = {}
+        asks = {}
+
+        for _ in range(10000):
+            price = float(random.randint(1, 50))
+            volume = float(random.choice([0, 1, 2, 3]))
+
+            if random.random() > 0.5:
+                book.update_bid(price, volume)
+                data = bids
+            else:
+                book.update_ask(price, volume)
+                data = asks
+
+            if volume:
+                data[price] = volume
+            else:
+                data.pop(price, None)
+
+        self.assertEqual(book.bid_prices, sorted(bids))
+        self.assertEqual(book.ask_prices, sorted(asks))
+
+        expected_bids = [(price, bids[price]) for price in sorted(bids, reverse=True)[:5]]
+        self.assertEqual(book.get_bids(5), expected_bids)
+
+        expected_asks = [(price, asks[price]) for price in sorted(asks)[:5]]
+        self.assertEqual(book.get_asks(5), expected_asks)
+
+    def test_update_tick(self):
+        book = OrderBook()
+        book.apply_snapshot(
+            [(100.0, 1.0), (99.0, 2.0), (98.0, 3.0)],
+            [(101.0, 4.0), (102.0, 0)]
+        )
+
+        tick = TickData(
+            symbol="BTCUSD",
+            exchange=Exchange.BITMEX,
+            datetime=datetime.now(),
+            gateway_name="TEST"
+        )
+        tick.ask_price_2 = 1.0
+        book.update_tick(tick)
+
+        self.assertEqual(tick.bid_price_1, 100.0)
+        self.assertEqual(tick.bid_volume_3, 3.0)
+        self.assertEqual(tick.bid_price_4, 0)
+        self.assertEqual(tick.ask_price_1, 101.0)
+        self.assertEqual(tick.ask_volume_1, 4.0)
+        self.assertEqual(tick.ask_price_2, 0)
+
+    def test_checksum(self):
+        book = OrderBook()
+        book.apply_snapshot([(100.0, 1.0)], [(101.0, 2.0)])
+
+        other = OrderBook()
+        other.update_ask(101.0, 2.0)
+        other.update_bid(100.0, 1.0)
+        other.update_bid(99.0, 1.0)
+        other.update_bid(99.0, 0)
+
+        self.assertEqual(book.calculate_checksum(), other.calculate_checksum())
+
+        other.update_ask(102.0, 1.0)
+        self.assertNotEqual(book.calculate_checksum(), other.calculate_checksum())
+
+    def test_bitfinex_checksum(self):
+        levels = json.loads(BITFINEX_SNAPSHOT, parse_int=str, parse_float=str)[1]
+        expected = calculate_bitfinex_checksum(levels)
+
+        book = OrderBook()
+        book.apply_snapshot(
+            [(float(price), float(amount)) for price, _, amount in levels if float(amount) > 0],
+            [(float(price), -float(amount)) for price, _, amount in levels if float(amount) < 0]
+        )
+        self.assertEqual(book.calculate_checksum(ask_sign=-1), expected)
+
+
+class TestBitfinexChecksum(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.logs = []
+        gateway = SimpleNamespace(
+            gateway_name="BITFINEX",
+            write_log=self.logs.append,
+            on_tick=lambda tick: None
+        )
+
+        self.api = BitfinexWebsocketApi(gateway)
+        self.api.channels[1] = ("book", "BTCUSD")
+        self.packets = []
+        self.api.send_packet = self.packets.append
+
+        self.api.on_packet(json.loads(BITFINEX_SNAPSHOT))
+        levels = json.loads(BITFINEX_SNAPSHOT, parse_int=str, parse_float=str)[1]
+        self.checksum = calculate_bitfinex_checksum(levels)
+
+    def test_checksum(self):
+        self.api.on_packet([1, "cs", self.checksum])
+        self.assertFalse(self.packets)
+
+        # Updates of price levels are included in checksum
+        self.api.on_packet([1, [7254.7, 0, 1]])
+        self.api.on_packet([1, [7258, 1, -0.5]])
+        self.api.on_packet([1, "cs", self.checksum])
+        self.assertEqual(len(self.packets), 2)
+
+    def test_resubscribe(self):
+        self.api.on_packet([1, "cs", self.checksum + 1])
+
+        self.assertEqual(self.packets, [
+            {"event": "unsubscribe", "chanId": 1},
+            {"event": "subscribe", "channel": "book", "symbol": "BTCUSD"}
+        ])
+        self.assertNotIn("BTCUSD", self.api.orderbooks)
+        self.assertEqual(len(self.logs), 1)
+
+        # Updates of unsubscribed channel are ignored
+        self.api.on_packet([1, [7254.7, 1, 1]])
+        self.assertNotIn("BTCUSD", self.api.orderbooks)
+
+
+if __name__ == '__main__':
+    unittest.main()
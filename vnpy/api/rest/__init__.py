@@ -1 +1,3 @@
 from .rest_client import Request, RequestStatus, RestClient
+from .async_rest_client import AsyncRestClient, AsyncConnectionError
+from .rate_limiter import RateLimiter, RateLimitError, RequestPriority
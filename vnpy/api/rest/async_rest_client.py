@@ -0,0 +1,289 @@
+import asyncio
+import json
+import sys
+import uuid
+from threading import Thread, current_thread
+from typing import Any, List, Optional, Tuple
+
+import aiohttp
+import requests
+from yarl import URL
+
+from .rest_client import Request, RequestStatus, RestClient
+
+
+# Exceptions raised by aiohttp when connection lost or timeout
+NETWORK_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class AsyncConnectionError(requests.ConnectionError, ConnectionError):
+    """
+    Network error of aiohttp, which is subclass of both ConnectionError
+    of requests and builtin ConnectionError, so that it can be filtered
+    by error callbacks written for requests.
+    """
+    pass
+
+
+class AsyncResponse:
+    """
+    Response received by aiohttp, with the same attributes and methods
+    as requests.Response used in callbacks.
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, content: bytes):
+        """"""
+        self.status_code = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.content = content
+        self.encoding = response.charset or "utf-8"
+
+    @property
+    def text(self) -> str:
+        """"""
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        """"""
+        return json.loads(self.content)
+
+
+class AsyncRestClient(RestClient):
+    """
+    HTTP Client with requests sent by asyncio/aiohttp in a single thread,
+    instead of a blocking session for each request in thread pool.
+
+    * Connections are kept alive and reused for each host.
+    * At most max_connections requests are sent at the same time, and
+      other requests wait for free connection.
+    * Same add_request and callback contract as RestClient, and callbacks
+      are called in the event loop thread, so they should not block.
+    """
+
+    def __init__(self, max_connections: int = 100, max_connections_per_host: int = 0):
+        """
+        max_connections_per_host 0 for no limit other than max_connections.
+        """
+        super().__init__()
+
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Requests added before client started
+        self._waiting_requests: List[Request] = []
+
+    def start(self, n: int = 3):
+        """
+        Start event loop thread. Session count n is not used since all
+        requests are sent with one session.
+        """
+        if self._active:
+            return
+        self._active = True
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run_loop, args=(self._loop,), daemon=True)
+        self._thread.start()
+
+        future = asyncio.run_coroutine_threadsafe(self._create_client_session(), self._loop)
+        future.result()
+
+        for request in self._waiting_requests:
+            self._schedule(request)
+        self._waiting_requests.clear()
+
+        self._start_rate_limiter()
+
+    def stop(self):
+        """
+        Stop rest client immediately, requests not finished are cancelled.
+
+        If called from callback function, shutdown is scheduled in event
+        loop and this function returns without waiting for it.
+        """
+        if not self._active:
+            return
+
+        # Stop rate limiter first, so that no request is sent after stopped
+        self._stop_rate_limiter()
+        self._active = False
+
+        loop = self._loop
+
+        if self._thread is current_thread():
+            task = loop.create_task(self._shutdown())
+            task.add_done_callback(lambda task: loop.stop())
+            return
+
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+        future.result()
+
+        loop.call_soon_threadsafe(loop.stop)
+
+    def join(self):
+        """
+        Wait till all requests are processed.
+
+        This function cannot be called from callback function, and returns
+        immediately if so.
+        """
+        if self._thread is current_thread():
+            return
+
+        super().join()
+
+        if self._thread and not self._active:
+            self._thread.join()
+            self._thread = None
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop):
+        """
+        Run event loop given, since client may be restarted with a new
+        loop before this one exits.
+        """
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        loop.close()
+
+    async def _create_client_session(self):
+        """"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+
+    async def _shutdown(self):
+        """
+        Cancel all request tasks and then close session.
+        """
+        tasks = [
+            task for task in asyncio.all_tasks()
+            if task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        await self._session.close()
+        self._session = None
+
+    def _send_request(self, request: Request):
+        """
+        Send request in event loop, or wait till client started.
+        """
+        if self._active:
+            self._schedule(request)
+        else:
+            self._waiting_requests.append(request)
+
+    def _schedule(self, request: Request):
+        """
+        Run request coroutine in event loop, which can be called from
+        any thread including the event loop thread.
+        """
+        self._loop.call_soon_threadsafe(
+            self._loop.create_task, self._process_request_async(request)
+        )
+
+    async def _process_request_async(self, request: Request):
+        """
+        Sending request to server and get result.
+        """
+        try:
+            request = self.sign(request)
+            url = self.make_full_url(request.path)
+
+            # send request
+            uid = uuid.uuid4()
+            method = request.method
+            headers = request.headers
+            params = convert_params(request.params)
+            data = request.data
+            self._log("[%s] sending request %s %s, headers:%s, params:%s, data:%s",
+                      uid, method, url,
+                      headers, params, data)
+
+            # Keep url as it is, since query string may have been signed
+            try:
+                async with self._session.request(
+                    method,
+                    URL(url, encoded=True),
+                    headers=headers,
+                    params=params,
+                    data=data,
+                    proxy=self.get_proxy(),
+                ) as resp:
+                    content = await resp.read()
+            except NETWORK_ERRORS as e:
+                raise AsyncConnectionError(repr(e)) from e
+
+            response = AsyncResponse(resp, content)
+            request.response = response
+            status_code = response.status_code
+
+            self._log("[%s] received response from %s:%s", uid, method, url)
+
+            # check result & call corresponding callbacks
+            if status_code // 100 == 2:  # 2xx codes are all successful
+                if status_code == 204:
+                    json_body = None
+                else:
+                    json_body = response.json()
+                self._process_json_body(json_body, request)
+            else:
+                if request.on_failed:
+                    request.status = RequestStatus.failed
+                    request.on_failed(status_code, request)
+                else:
+                    self.on_failed(status_code, request)
+        except Exception:
+            request.status = RequestStatus.error
+            t, v, tb = sys.exc_info()
+            if request.on_error:
+                request.on_error(t, v, tb, request)
+            else:
+                self.on_error(t, v, tb, request)
+        finally:
+            self._finish_request()
+
+    def get_proxy(self) -> Optional[str]:
+        """
+        Get proxy url for aiohttp.
+        """
+        if not self.proxies:
+            return None
+
+        proxy = self.proxies["http"]
+        if "://" not in proxy:
+            proxy = "http://" + proxy
+        return proxy
+
+
+def convert_params(params: Optional[dict]) -> Optional[List[Tuple[str, str]]]:
+    """
+    Convert query params in the same way as requests, which drops None
+    values, repeats key for each item of list value, and converts others
+    into str.
+    """
+    if not params:
+        return None
+
+    pairs = []
+    for k, v in params.items():
+        if isinstance(v, (list, tuple)):
+            values = v
+        else:
+            values = [v]
+
+        for value in values:
+            if value is not None:
+                pairs.append((k, str(value)))
+    return pairs
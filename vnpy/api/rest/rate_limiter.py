@@ -0,0 +1,341 @@
+from collections import deque
+from enum import IntEnum
+from threading import Condition, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+from vnpy.trader.stats import LatencyHistogram
+
+if TYPE_CHECKING:
+    from .rest_client import Request
+
+
+class RequestPriority(IntEnum):
+    """
+    Requests with smaller value are sent first.
+    """
+    HIGH = 0      # e.g. cancel order
+    NORMAL = 1    # e.g. send order
+    LOW = 2       # e.g. query
+
+
+# Priority of endpoint not configured, decided by http method
+METHOD_PRIORITIES = {
+    "DELETE": RequestPriority.HIGH,
+    "GET": RequestPriority.LOW,
+}
+
+
+class RateLimitError(Exception):
+    """
+    Raised into on_error callback when request is rejected by rate limiter.
+    """
+    pass
+
+
+class TokenBucket:
+    """
+    Tokens are refilled by rate per second, and at most capacity
+    tokens can be consumed in a burst.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.time = monotonic()
+
+    def refill(self, now: float):
+        """"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.time) * self.rate)
+        self.time = now
+
+    def get_wait_time(self, cost: float, now: float) -> float:
+        """
+        Get seconds to wait before cost can be consumed, 0 if available now.
+        """
+        self.refill(now)
+        if self.tokens >= cost:
+            return 0
+        return (cost - self.tokens) / self.rate
+
+    def consume(self, cost: float):
+        """"""
+        self.tokens -= cost
+
+
+class RateLimiter:
+    """
+    Schedule requests with a weight based token bucket.
+
+    * Each endpoint costs its configured weight, 1 by default.
+    * Requests are queued in priority lanes, and lane with higher
+      priority is always sent first.
+    * A GET request without extra, which is the same as a pending one
+      in queue, is coalesced into it instead of being sent twice.
+    * Requests are rejected if the lane queue is full, or waited in
+      queue longer than max_queue_time.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 0,
+        max_queue_size: int = 0,
+        max_queue_time: float = 0,
+    ):
+        """
+        capacity is rate if not given. 0 of max_queue_size and
+        max_queue_time for no limit.
+        """
+        self.bucket = TokenBucket(rate, capacity or rate)
+        self.max_queue_size = max_queue_size
+        self.max_queue_time = max_queue_time
+
+        # (method, path prefix) -> (cost, priority)
+        self.endpoints: Dict[Tuple[str, str], Tuple[float, Optional[RequestPriority]]] = {}
+
+        self.lanes: List[Deque[tuple]] = [deque() for _ in RequestPriority]
+        self.pending: Dict[tuple, "Request"] = {}
+
+        self.dispatched_counts = [0] * len(RequestPriority)
+        self.rejected_counts = [0] * len(RequestPriority)
+        self.coalesced_counts = [0] * len(RequestPriority)
+        self.queue_time_stats = [LatencyHistogram() for _ in RequestPriority]
+
+        self._active = False
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+
+        self._dispatch: Optional[Callable[["Request"], None]] = None
+        self._reject: Optional[Callable[["Request", str], None]] = None
+
+    def set_endpoint(
+        self,
+        path: str,
+        cost: float = 1,
+        priority: RequestPriority = None,
+        method: str = "",
+    ):
+        """
+        Set cost and priority of requests with path starting with given
+        path. Empty method matches all methods, and the longest path
+        matched is used.
+        """
+        self.endpoints[(method, path)] = (cost, priority)
+
+    def get_endpoint(self, method: str, path: str) -> Tuple[float, RequestPriority]:
+        """
+        Get cost and priority of request.
+        """
+        cost = 1
+        priority = None
+        matched = -1
+
+        for (endpoint_method, endpoint_path), setting in self.endpoints.items():
+            if endpoint_method and endpoint_method != method:
+                continue
+
+            if path.startswith(endpoint_path) and len(endpoint_path) > matched:
+                cost, priority = setting
+                matched = len(endpoint_path)
+
+        if priority is None:
+            priority = METHOD_PRIORITIES.get(method, RequestPriority.NORMAL)
+
+        return cost, priority
+
+    def start(
+        self,
+        dispatch: Callable[["Request"], None],
+        reject: Callable[["Request", str], None]
+    ):
+        """
+        Start scheduler thread, which calls dispatch for sending request,
+        and reject with reason for rejected request.
+        """
+        if self._active:
+            return
+
+        self._dispatch = dispatch
+        self._reject = reject
+
+        self._active = True
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List["Request"]:
+        """
+        Stop scheduler thread, and return requests still in queue.
+        """
+        with self._condition:
+            self._active = False
+            self._condition.notify_all()
+
+            requests = [item[0] for lane in self.lanes for item in lane]
+            for lane in self.lanes:
+                lane.clear()
+            self.pending.clear()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        return requests
+
+    def put(self, request: "Request") -> Optional["Request"]:
+        """
+        Put request into queue. Return the pending request if coalesced,
+        otherwise None. RateLimitError is raised if rejected.
+        """
+        cost, priority = self.get_endpoint(request.method, request.path)
+
+        key = None
+        if request.method == "GET":
+            key = get_request_key(request)
+
+        with self._condition:
+            if key:
+                pending_request = self.pending.get(key, None)
+                if pending_request:
+                    self.coalesced_counts[priority] += 1
+                    return pending_request
+
+            lane = self.lanes[priority]
+            if cost > self.bucket.capacity:
+                reason = f"cost {cost} exceeds bucket capacity"
+            elif self.max_queue_size and len(lane) >= self.max_queue_size:
+                reason = f"{priority.name} lane queue is full"
+            else:
+                reason = ""
+                lane.append((request, cost, key, monotonic()))
+                if key:
+                    self.pending[key] = request
+                self._condition.notify()
+
+            if reason:
+                self.rejected_counts[priority] += 1
+                raise RateLimitError(reason)
+
+        return None
+
+    def acquire(self, method: str, path: str):
+        """
+        Wait till tokens for request sent directly instead of queued are
+        available, and consume them. RateLimitError is raised if cost
+        exceeds bucket capacity.
+        """
+        cost, priority = self.get_endpoint(method, path)
+
+        with self._condition:
+            if cost > self.bucket.capacity:
+                self.rejected_counts[priority] += 1
+                raise RateLimitError(f"cost {cost} exceeds bucket capacity")
+
+            while True:
+                wait_time = self.bucket.get_wait_time(cost, monotonic())
+                if not wait_time:
+                    break
+                self._condition.wait(wait_time)
+
+            self.bucket.consume(cost)
+            self.dispatched_counts[priority] += 1
+
+    def _run(self):
+        """"""
+        while self._active:
+            rejected = []
+
+            with self._condition:
+                item = None
+                wait_time = None
+                now = monotonic()
+
+                for priority, lane in zip(RequestPriority, self.lanes):
+                    # Requests waited too long are rejected
+                    while (
+                        self.max_queue_time
+                        and lane
+                        and now - lane[0][3] > self.max_queue_time
+                    ):
+                        request, _, key, _ = lane.popleft()
+                        self.pending.pop(key, None)
+                        self.rejected_counts[priority] += 1
+                        rejected.append(request)
+
+                    if not lane:
+                        continue
+
+                    cost = lane[0][1]
+                    wait_time = self.bucket.get_wait_time(cost, now)
+                    if not wait_time:
+                        item = lane.popleft()
+                        self.bucket.consume(cost)
+                        self.pending.pop(item[2], None)
+                        self.dispatched_counts[priority] += 1
+                        self.queue_time_stats[priority].add(now - item[3])
+
+                    # Lanes with lower priority wait for this lane
+                    break
+
+                if not item and not rejected:
+                    self._condition.wait(wait_time)
+
+            for request in rejected:
+                self._reject(request, "queue time exceeds limit")
+
+            if item:
+                self._dispatch(item[0])
+
+    def get_queue_size(self) -> int:
+        """"""
+        return sum(len(lane) for lane in self.lanes)
+
+    def get_stats(self) -> dict:
+        """
+        Get queue size, counts and queue time statistics of each priority.
+        """
+        stats = {}
+        for priority in RequestPriority:
+            stats[priority.name] = {
+                "queued": len(self.lanes[priority]),
+                "dispatched": self.dispatched_counts[priority],
+                "rejected": self.rejected_counts[priority],
+                "coalesced": self.coalesced_counts[priority],
+                "queue_time": self.queue_time_stats[priority].get_stats(),
+            }
+        stats["tokens"] = self.bucket.tokens
+        return stats
+
+
+def get_request_key(request: "Request") -> Optional[tuple]:
+    """
+    Get key of query for coalescing, None if request cannot be compared.
+
+    Request with extra is never coalesced, since callback of each caller
+    expects its own extra.
+    """
+    if request.extra is not None:
+        return None
+
+    try:
+        params = tuple(sorted((request.params or {}).items()))
+        headers = tuple(sorted((request.headers or {}).items()))
+        if isinstance(request.data, dict):
+            data = tuple(sorted(request.data.items()))
+        else:
+            data = request.data
+        key = (
+            request.path,
+            params,
+            headers,
+            data,
+            request.callback,
+            request.on_failed,
+            request.on_error
+        )
+        hash(key)
+    except TypeError:
+        return None
+    return key
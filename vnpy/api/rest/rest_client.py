@@ -8,13 +8,15 @@ import uuid
 from datetime import datetime
 from enum import Enum
 from multiprocessing.dummy import Pool
-from threading import Lock, Thread
+from threading import Condition, Lock, Thread
 from types import TracebackType
 from typing import Any, Callable, List, Optional, Type, Union
 from vnpy.trader.utility import get_file_logger
 
 import requests
 
+from .rate_limiter import RateLimiter, RateLimitError, RequestPriority
+
 
 class RequestStatus(Enum):
     ready = 0  # Request created
@@ -138,14 +140,18 @@ class RestClient(object):
 
         self.proxies = None
 
-        self._tasks_lock = Lock()
-        self._tasks: List[multiprocessing.pool.AsyncResult] = []
+        # Number of requests not finished, for join
+        self._pending_count = 0
+        self._pending_condition = Condition()
+
         self._sessions_lock = Lock()
         self._sessions: List[requests.Session] = []
 
         self._streams_lock = Lock()
         self._streams: List[Thread] = []
 
+        self.rate_limiter: Optional[RateLimiter] = None
+
     @property
     def alive(self):
         return self._active
@@ -174,6 +180,44 @@ class RestClient(object):
             proxy = f"{proxy_host}:{proxy_port}"
             self.proxies = {"http": proxy, "https": proxy}
 
+    def set_rate_limit(
+        self,
+        rate: float,
+        capacity: float = 0,
+        max_queue_size: int = 0,
+        max_queue_time: float = 0,
+    ):
+        """
+        Limit requests sent by add_request with a token bucket, which is
+        refilled by rate per second and holds at most capacity tokens.
+        Should be called before start.
+        """
+        self.rate_limiter = RateLimiter(rate, capacity, max_queue_size, max_queue_time)
+
+    def set_endpoint(
+        self,
+        path: str,
+        cost: float = 1,
+        priority: RequestPriority = None,
+        method: str = "",
+    ):
+        """
+        Set cost and priority of requests with path starting with given path.
+        Should be called after set_rate_limit.
+        """
+        if not self.rate_limiter:
+            raise RuntimeError("set_rate_limit should be called before set_endpoint")
+
+        self.rate_limiter.set_endpoint(path, cost, priority, method)
+
+    def get_rate_limit_stats(self) -> dict:
+        """
+        Get queue and rejection statistics of rate limiter.
+        """
+        if not self.rate_limiter:
+            return {}
+        return self.rate_limiter.get_stats()
+
     def _create_session(self):
         """"""
         return requests.session()
@@ -186,18 +230,22 @@ class RestClient(object):
             return
         self._active = True
 
+        self._start_rate_limiter()
+
     def stop(self):
         """
         Stop rest client immediately.
         """
         self._active = False
 
+        self._stop_rate_limiter()
+
     def join(self):
         """
         Wait till all requests are processed.
         """
-        for task in self._tasks:
-            task.wait()
+        with self._pending_condition:
+            self._pending_condition.wait_for(lambda: not self._pending_count)
 
     def add_streaming_request(
         self,
@@ -275,23 +323,80 @@ class RestClient(object):
             extra=extra,
             client=self,
         )
-        task = pool.apply_async(
+        self._start_request()
+
+        if not self.rate_limiter:
+            self._send_request(request)
+            return request
+
+        try:
+            pending_request = self.rate_limiter.put(request)
+        except RateLimitError as e:
+            self._reject_request(request, str(e))
+            return request
+
+        # Same query pending in queue, and this one is not sent
+        if pending_request:
+            self._finish_request()
+            return pending_request
+
+        return request
+
+    def _send_request(self, request: Request):
+        """
+        Send request in thread pool.
+        """
+        pool.apply_async(
             self._process_request,
             args=[request, ],
-            callback=self._clean_finished_tasks,
-            # error_callback=lambda e: self.on_error(type(e), e, e.__traceback__, request),
+            callback=self._finish_request,
+            error_callback=self._finish_request,
         )
-        self._push_task(task)
-        return request
 
-    def _push_task(self, task):
-        with self._tasks_lock:
-            self._tasks.append(task)
+    def _start_rate_limiter(self):
+        """"""
+        if self.rate_limiter:
+            self.rate_limiter.start(self._send_request, self._reject_request)
 
-    def _clean_finished_tasks(self, result: None):
-        with self._tasks_lock:
-            not_finished_tasks = [i for i in self._tasks if not i.ready()]
-            self._tasks = not_finished_tasks
+    def _stop_rate_limiter(self):
+        """
+        Stop rate limiter, and requests in queue are dropped.
+        """
+        if self.rate_limiter:
+            for _ in self.rate_limiter.stop():
+                self._finish_request()
+
+    def _reject_request(self, request: Request, reason: str):
+        """
+        Call on_error with RateLimitError for request rejected.
+        """
+        try:
+            raise RateLimitError(reason)
+        except RateLimitError:
+            request.status = RequestStatus.error
+            t, v, tb = sys.exc_info()
+            if request.on_error:
+                request.on_error(t, v, tb, request)
+            else:
+                self.on_error(t, v, tb, request)
+        finally:
+            self._finish_request()
+
+    def _start_request(self):
+        """
+        Count request not finished.
+        """
+        with self._pending_condition:
+            self._pending_count += 1
+
+    def _finish_request(self, result: Any = None):
+        """
+        Count request finished, and wake up join if all finished.
+        """
+        with self._pending_condition:
+            self._pending_count -= 1
+            if not self._pending_count:
+                self._pending_condition.notify_all()
 
     def _clean_finished_streams(self):
         with self._streams_lock:
@@ -476,6 +581,10 @@ class RestClient(object):
         :param headers: dict for headers
         :return: requests.Response
         """
+        # Request sent directly also consumes tokens of rate limiter
+        if self.rate_limiter:
+            self.rate_limiter.acquire(method, path)
+
         request = Request(
             method,
             path,
@@ -1 +1,3 @@
 from .websocket_client import WebsocketClient
+from .decoder import JsonDecoder, ZlibJsonDecoder, WBITS_DEFLATE, WBITS_GZIP
+from .async_websocket_client import AsyncWebsocketClient
@@ -0,0 +1,217 @@
+import asyncio
+import ssl
+import sys
+from concurrent.futures import Future
+from threading import Lock, Thread, get_ident
+from typing import Optional
+
+import aiohttp
+
+from .websocket_client import WebsocketClient
+
+
+class EventLoopThread:
+    """
+    Event loop running in a daemon thread, shared by all async websocket
+    clients so that connections are multiplexed in a single thread.
+    """
+
+    def __init__(self):
+        """"""
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[Thread] = None
+        self.thread_id = 0
+        self.lock = Lock()
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the event loop, which is started when used for the first time.
+        """
+        with self.lock:
+            if not self.loop:
+                self.loop = asyncio.new_event_loop()
+                self.thread = Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+        return self.loop
+
+    def run(self):
+        """"""
+        self.thread_id = get_ident()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        """"""
+        return get_ident() == self.thread_id
+
+
+event_loop_thread = EventLoopThread()
+
+
+class AsyncWebsocketClient(WebsocketClient):
+    """
+    Websocket API with all connections running in one shared asyncio
+    event loop thread, instead of worker and ping threads for each client.
+
+    Callbacks are the same as WebsocketClient, and are called in the event
+    loop thread, so they should not block, otherwise data of all clients
+    sharing the loop is delayed.
+
+    Connection is reconnected automatically after lost, and ping is sent
+    every ping_interval seconds by aiohttp heartbeat.
+    """
+
+    def __init__(self):
+        """"""
+        super().__init__()
+
+        self.reconnect_interval = 1  # seconds
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._token: Optional[object] = None
+        self._future: Optional[Future] = None
+
+    def start(self):
+        """
+        Start the client and on_connected function is called after webscoket
+        is connected succesfully.
+
+        Please don't send packet untill on_connected fucntion is called.
+        """
+        self._active = True
+        self._loop = event_loop_thread.get_loop()
+
+        token = object()
+        self._token = token
+        self._future = asyncio.run_coroutine_threadsafe(self._run_async(token), self._loop)
+
+    def stop(self):
+        """
+        Stop the client.
+        """
+        self._active = False
+        self._token = None
+
+        ws = self._ws
+        if ws:
+            self._call_in_loop(ws.close())
+
+    def join(self):
+        """
+        Wait till connection closed.
+
+        This function cannot be called from callback function, and returns
+        immediately if so.
+        """
+        if self._future and not event_loop_thread.in_loop_thread():
+            self._future.result()
+
+    def _call_in_loop(self, coro):
+        """
+        Run coroutine in event loop from any thread.
+        """
+        if event_loop_thread.in_loop_thread():
+            self._loop.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _send_text(self, text: str):
+        """
+        Send a text string to server.
+        """
+        ws = self._ws
+        if ws:
+            self._call_in_loop(ws.send_str(text))
+            self._log('sent text: %s', text)
+
+    def _send_binary(self, data: bytes):
+        """
+        Send bytes data to server.
+        """
+        ws = self._ws
+        if ws:
+            self._call_in_loop(ws.send_bytes(data))
+            self._log('sent binary: %s', data)
+
+    async def _run_async(self, token: object):
+        """
+        Keep connecting and receiving till stop is called.
+        """
+        if self.proxy_host and self.proxy_port:
+            proxy = f"http://{self.proxy_host}:{self.proxy_port}"
+        else:
+            proxy = None
+
+        sslcontext = ssl.create_default_context()
+        sslcontext.check_hostname = False
+        sslcontext.verify_mode = ssl.CERT_NONE
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while self._token is token:
+                try:
+                    ws = await session.ws_connect(
+                        self.host,
+                        headers=self.header,
+                        proxy=proxy,
+                        ssl=sslcontext,
+                        heartbeat=self.ping_interval,
+                        max_msg_size=0,
+                    )
+                except (aiohttp.ClientError, OSError, asyncio.TimeoutError):
+                    await asyncio.sleep(self.reconnect_interval)
+                    continue
+
+                # Stopped while connecting
+                if self._token is not token:
+                    await ws.close()
+                    break
+
+                self._ws = ws
+                try:
+                    self.decoder.reset()
+                    self.on_connected()
+                    await self._run_recv_async(ws)
+                except:  # noqa
+                    et, ev, tb = sys.exc_info()
+                    self.on_error(et, ev, tb)
+                finally:
+                    self._ws = None
+                    await ws.close()
+                    self.on_disconnected()
+
+                if self._token is token:
+                    await asyncio.sleep(self.reconnect_interval)
+
+    async def _run_recv_async(self, ws: aiohttp.ClientWebSocketResponse):
+        """
+        Receive and process data till connection is lost.
+        """
+        unpack_data = self.unpack_data
+        on_packet = self.on_packet
+
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT or msg.type == aiohttp.WSMsgType.BINARY:
+                text = msg.data
+            else:
+                break
+
+            if self.record_received:
+                self._record_last_received_text(text)
+
+            try:
+                data = unpack_data(text)
+            except ValueError as e:
+                print("websocket unable to parse data: " + str(text))
+                self._record_last_received_text(text)
+                raise e
+
+            self._log('recv data: %s', data)
+
+            try:
+                on_packet(data)
+            except:  # noqa
+                self._record_last_received_text(text)
+                raise
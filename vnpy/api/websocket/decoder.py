@@ -0,0 +1,94 @@
+"""
+Decoders converting data received from websocket into packet.
+
+The fastest json library installed is used, with orjson preferred over
+ujson, and stdlib json as fallback.
+"""
+
+import json
+import zlib
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+    json_loads: Callable[[Union[str, bytes]], Any] = orjson.loads
+    JSON_LIBRARY = "orjson"
+except ImportError:
+    try:
+        import ujson
+        json_loads = ujson.loads
+        JSON_LIBRARY = "ujson"
+    except ImportError:
+        json_loads = json.loads
+        JSON_LIBRARY = "json"
+
+
+# wbits of compression formats used by exchanges
+WBITS_DEFLATE = -zlib.MAX_WBITS   # raw deflate, e.g. OKEX
+WBITS_GZIP = 16 + zlib.MAX_WBITS  # gzip, e.g. HUOBI
+
+
+class JsonDecoder:
+    """
+    Decode text or bytes of json into packet.
+    """
+
+    def __init__(self, loads: Callable[[Union[str, bytes]], Any] = None):
+        """
+        json_loads of fastest library is used if loads not given.
+        """
+        self.loads = loads or json_loads
+
+    def reset(self):
+        """
+        Reset decoder state after reconnected.
+        """
+        pass
+
+    def __call__(self, data: Union[str, bytes]) -> Any:
+        """"""
+        return self.loads(data)
+
+
+class ZlibJsonDecoder(JsonDecoder):
+    """
+    Decode compressed json into packet.
+
+    If stream is False, each message is compressed separately and is
+    decompressed with zlib.decompress, which is faster than creating or
+    copying a decompressobj for each message.
+
+    If stream is True, messages are parts of one compressed stream with
+    shared context, and are decompressed by a reused decompressobj which
+    should be reset after reconnected.
+    """
+
+    def __init__(
+        self,
+        wbits: int = WBITS_DEFLATE,
+        stream: bool = False,
+        loads: Callable[[Union[str, bytes]], Any] = None
+    ):
+        """"""
+        super().__init__(loads)
+
+        self.wbits = wbits
+        self.stream = stream
+        self.decompressor = None
+
+        self.reset()
+
+    def reset(self):
+        """
+        Create a new decompressobj for stream.
+        """
+        if self.stream:
+            self.decompressor = zlib.decompressobj(self.wbits)
+
+    def __call__(self, data: bytes) -> Any:
+        """"""
+        if self.stream:
+            buf = self.decompressor.decompress(data)
+        else:
+            buf = zlib.decompress(data, self.wbits)
+        return self.loads(buf)
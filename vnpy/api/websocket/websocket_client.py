@@ -13,6 +13,8 @@ import websocket
 
 from vnpy.trader.utility import get_file_logger
 
+from .decoder import JsonDecoder
+
 
 class WebsocketClient(object):
     """
@@ -24,7 +26,11 @@ class WebsocketClient(object):
     Use stop to stop threads and disconnect websocket before destroying the client
     object (especially when exiting the programme).
 
-    Default serialization format is json.
+    Default serialization format is json, decoded by the decoder object
+    which can be replaced, e.g. ZlibJsonDecoder for compressed data.
+
+    Set record_received to False to skip recording every text received
+    for debugging, and then only the text causing exception is recorded.
 
     Callbacks to overrides:
     * unpack_data
@@ -56,7 +62,10 @@ class WebsocketClient(object):
 
         self.logger: Optional[logging.Logger] = None
 
+        self.decoder: JsonDecoder = JsonDecoder()
+
         # For debugging
+        self.record_received = True
         self._last_sent_text = None
         self._last_received_text = None
 
@@ -171,6 +180,7 @@ class WebsocketClient(object):
                 )
                 triggered = True
         if triggered:
+            self.decoder.reset()
             self.on_connected()
 
     def _disconnect(self):
@@ -197,23 +207,7 @@ class WebsocketClient(object):
                     self._ensure_connection()
                     ws = self._ws
                     if ws:
-                        text = ws.recv()
-
-                        # ws object is closed when recv function is blocking
-                        if not text:
-                            self._disconnect()
-                            continue
-
-                        self._record_last_received_text(text)
-
-                        try:
-                            data = self.unpack_data(text)
-                        except ValueError as e:
-                            print("websocket unable to parse data: " + text)
-                            raise e
-
-                        self._log('recv data: %s', data)
-                        self.on_packet(data)
+                        self._run_recv(ws)
                 # ws is closed before recv function is called
                 # For socket.error, see Issue #1608
                 except (websocket.WebSocketConnectionClosedException, socket.error):
@@ -229,14 +223,47 @@ class WebsocketClient(object):
             self.on_error(et, ev, tb)
         self._disconnect()
 
-    @staticmethod
-    def unpack_data(data: str):
+    def _run_recv(self, ws: websocket.WebSocket):
+        """
+        Receive and process data till connection is lost or replaced,
+        without checking connection for every frame.
+        """
+        unpack_data = self.unpack_data
+        on_packet = self.on_packet
+
+        while self._active and ws is self._ws:
+            text = ws.recv()
+
+            # ws object is closed when recv function is blocking
+            if not text:
+                self._disconnect()
+                return
+
+            if self.record_received:
+                self._record_last_received_text(text)
+
+            try:
+                data = unpack_data(text)
+            except ValueError as e:
+                print("websocket unable to parse data: " + str(text))
+                self._record_last_received_text(text)
+                raise e
+
+            self._log('recv data: %s', data)
+
+            try:
+                on_packet(data)
+            except:  # noqa
+                self._record_last_received_text(text)
+                raise
+
+    def unpack_data(self, data: str):
         """
-        Default serialization format is json.
+        Default serialization format is json, decoded by decoder.
 
         override this method if you want to use other serialization format.
         """
-        return json.loads(data)
+        return self.decoder(data)
 
     def _run_ping(self):
         """"""
@@ -1,11 +1,14 @@
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Callable
-from itertools import product
+from typing import Callable, Iterable
+from itertools import product, islice
 from functools import lru_cache
 from time import time
 import multiprocessing
 import random
+import tempfile
+import os
+import pickle
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -17,7 +20,13 @@ from vnpy.trader.constant import (Direction, Offset, Exchange,
                                   Interval, Status)
 from vnpy.trader.database import database_manager
 from vnpy.trader.object import OrderData, TradeData, BarData, TickData
-from vnpy.trader.utility import round_to
+from vnpy.trader.utility import (
+    round_to,
+    BAR_FIELDS,
+    BAR_DTYPE,
+    TICK_FIELDS,
+    TICK_DTYPE
+)
 
 from .base import (
     BacktestingMode,
@@ -30,6 +39,9 @@ from .base import (
 from .template import CtaTemplate
 
 sns.set_style("whitegrid")
+
+# Number of rows converted into python objects at a time during replay
+REPLAY_BLOCK_SIZE = 10_000
 creator.create("FitnessMax", base.Fitness, weights=(1.0,))
 creator.create("Individual", list, fitness=creator.FitnessMax)
 
@@ -127,6 +139,8 @@ class BacktestingEngine:
         self.days = 0
         self.callback = None
         self.history_data = []
+        self.columnar = False
+        self.history_array = None
 
         self.stop_order_count = 0
         self.stop_orders = {}
@@ -179,9 +193,13 @@ class BacktestingEngine:
         capital: int = 0,
         end: datetime = None,
         mode: BacktestingMode = BacktestingMode.BAR,
-        inverse: bool = False
+        inverse: bool = False,
+        columnar: bool = False
     ):
-        """"""
+        """
+        Set columnar to True for keeping history data in structured
+        numpy arrays, and creating bar/tick objects only during replay.
+        """
         self.mode = mode
         self.vt_symbol = vt_symbol
         self.interval = Interval(interval)
@@ -198,6 +216,7 @@ class BacktestingEngine:
         self.end = end
         self.mode = mode
         self.inverse = inverse
+        self.columnar = columnar
 
     def add_strategy(self, strategy_class: type, setting: dict):
         """"""
@@ -218,8 +237,22 @@ class BacktestingEngine:
             return
 
         self.history_data.clear()       # Clear previously loaded history data
+        self.history_array = None
+
+        if self.columnar:
+            self.history_array = self.load_history_array()
+            count = len(self.history_array)
+        else:
+            for data in self.load_history_chunks(columnar=False):
+                self.history_data.extend(data)
+            count = len(self.history_data)
+
+        self.output(f"历史数据加载完成，数据量：{count}")
 
-        # Load 30 days of data each time and allow for progress update
+    def load_history_chunks(self, columnar: bool):
+        """
+        Load history data in chunks of 30 days and output progress.
+        """
         progress_delta = timedelta(days=30)
         total_delta = self.end - self.start
         interval_delta = INTERVAL_DELTA_MAP[self.interval]
@@ -232,7 +265,12 @@ class BacktestingEngine:
             end = min(end, self.end)  # Make sure end time stays within set range
 
             if self.mode == BacktestingMode.BAR:
-                data = load_bar_data(
+                if columnar:
+                    load_func = load_bar_array
+                else:
+                    load_func = load_bar_data
+
+                yield load_func(
                     self.symbol,
                     self.exchange,
                     self.interval,
@@ -240,15 +278,18 @@ class BacktestingEngine:
                     end
                 )
             else:
-                data = load_tick_data(
+                if columnar:
+                    load_func = load_tick_array
+                else:
+                    load_func = load_tick_data
+
+                yield load_func(
                     self.symbol,
                     self.exchange,
                     start,
                     end
                 )
 
-            self.history_data.extend(data)
-
             progress += progress_delta / total_delta
             progress = min(progress, 1)
             progress_bar = "#" * int(progress * 10)
@@ -257,7 +298,43 @@ class BacktestingEngine:
             start = end + interval_delta
             end += (progress_delta + interval_delta)
 
-        self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
+    def load_history_array(self):
+        """
+        Load history data into one structured numpy array.
+        """
+        arrays = list(self.load_history_chunks(columnar=True))
+        if arrays:
+            return np.concatenate(arrays)
+
+        if self.mode == BacktestingMode.BAR:
+            return np.empty(0, dtype=BAR_DTYPE)
+        else:
+            return np.empty(0, dtype=TICK_DTYPE)
+
+    def save_history_file(self):
+        """
+        Load history data and save it into a temporary npy file, which
+        can be memory-mapped by optimization worker processes.
+        """
+        if not self.end:
+            self.end = datetime.now()
+
+        array = self.load_history_array()
+
+        fd, path = tempfile.mkstemp(prefix="vnpy_backtesting_", suffix=".npy")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+
+        return path
+
+    def attach_history_file(self, path: str):
+        """
+        Use history data in npy file saved by another engine, without
+        loading from database or copying into process memory.
+        """
+        self.columnar = True
+        self.history_data.clear()
+        self.history_array = np.load(path, mmap_mode="r")
 
     def run_backtesting(self):
         """"""
@@ -266,13 +343,18 @@ class BacktestingEngine:
         else:
             func = self.new_tick
 
+        if self.columnar:
+            history = self.generate_history()
+        else:
+            history = iter(self.history_data)
+
         self.strategy.on_init()
 
         # Use the first [days] of history data for initializing strategy
         day_count = 0
-        ix = 0
+        data = None
 
-        for ix, data in enumerate(self.history_data):
+        for data in history:
             if self.datetime and data.datetime.day != self.datetime.day:
                 day_count += 1
                 if day_count >= self.days:
@@ -288,12 +370,56 @@ class BacktestingEngine:
         self.strategy.trading = True
         self.output("开始回放历史数据")
 
-        # Use the rest of history data for running backtesting
-        for data in self.history_data[ix:]:
+        # Use the rest of history data for running backtesting,
+        # starting from the data which ended the initialization.
+        if data is not None:
+            func(data)
+
+        for data in history:
             func(data)
 
         self.output("历史数据回放结束")
 
+    def generate_history(self):
+        """
+        Generate bar/tick objects from columnar history data block by block,
+        so that only a small part of history exists as python objects.
+
+        Objects are filled from a template attribute dict instead of calling
+        dataclass __init__/__post_init__ for every row. A new object is still
+        created for each row, since strategies and BarGenerator may keep
+        references to previous bars/ticks.
+        """
+        if self.mode == BacktestingMode.BAR:
+            data_class = BarData
+            fields = BAR_FIELDS
+            extra = {"interval": self.interval}
+        else:
+            data_class = TickData
+            fields = TICK_FIELDS
+            extra = {}
+
+        template = data_class(
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=None,
+            gateway_name="DB",
+            **extra
+        ).__dict__
+        new_object = object.__new__
+
+        array = self.history_array
+        for ix in range(0, len(array), REPLAY_BLOCK_SIZE):
+            block = array[ix:ix + REPLAY_BLOCK_SIZE]
+            columns = [block[name].tolist() for name in fields]
+
+            for values in zip(*columns):
+                data = new_object(data_class)
+                attributes = data.__dict__
+                attributes.update(template)
+                attributes.update(zip(fields, values))
+                yield data
+
     def calculate_result(self):
         """"""
         self.output("开始计算逐日盯市盈亏")
@@ -396,7 +522,7 @@ class BacktestingEngine:
             max_drawdown = df["drawdown"].min()
             max_ddpercent = df["ddpercent"].min()
             max_drawdown_end = df["drawdown"].idxmin()
-            max_drawdown_start = df["balance"][:max_drawdown_end].argmax()
+            max_drawdown_start = df["balance"][:max_drawdown_end].idxmax()
             max_drawdown_duration = (max_drawdown_end - max_drawdown_start).days
 
             total_net_pnl = df["net_pnl"].sum()
@@ -537,31 +663,41 @@ class BacktestingEngine:
             self.output("优化目标未设置，请检查")
             return
 
+        # Load history data only once, and share it with all worker
+        # processes through memory-mapped file.
+        self.output("开始加载共享历史数据")
+        history_path = self.save_history_file()
+
         # Use multiprocessing pool for running backtesting with different setting
         pool = multiprocessing.Pool(multiprocessing.cpu_count())
 
-        results = []
-        for setting in settings:
-            result = (pool.apply_async(optimize, (
-                target_name,
-                self.strategy_class,
-                setting,
-                self.vt_symbol,
-                self.interval,
-                self.start,
-                self.rate,
-                self.slippage,
-                self.size,
-                self.pricetick,
-                self.capital,
-                self.end,
-                self.mode,
-                self.inverse
-            )))
-            results.append(result)
-
-        pool.close()
-        pool.join()
+        try:
+            results = []
+            for setting in settings:
+                result = (pool.apply_async(optimize, (
+                    target_name,
+                    self.strategy_class,
+                    setting,
+                    self.vt_symbol,
+                    self.interval,
+                    self.start,
+                    self.rate,
+                    self.slippage,
+                    self.size,
+                    self.pricetick,
+                    self.capital,
+                    self.end,
+                    self.mode,
+                    self.inverse,
+                    self.columnar,
+                    history_path
+                )))
+                results.append(result)
+
+            pool.close()
+            pool.join()
+        finally:
+            os.remove(history_path)
 
         # Sort results and output
         result_values = [result.get() for result in results]
@@ -574,8 +710,22 @@ class BacktestingEngine:
 
         return result_values
 
-    def run_ga_optimization(self, optimization_setting: OptimizationSetting, population_size=100, ngen_size=30, output=True):
-        """"""
+    def run_ga_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        population_size=100,
+        ngen_size=30,
+        output=True,
+        checkpoint_path: str = ""
+    ):
+        """
+        Run genetic algorithm optimization with multiprocessing pool.
+
+        If checkpoint_path is given, the state of each generation is saved
+        into the file, and an unfinished optimization with the same file
+        will be resumed from the last saved generation. A checkpoint saved
+        by optimization with different setting is ignored.
+        """
         # Get optimization setting and target
         settings = optimization_setting.generate_setting_ga()
         target_name = optimization_setting.target_name
@@ -602,36 +752,19 @@ class BacktestingEngine:
                     individual[i] = paramlist[i]
             return individual,
 
-        # Create ga object function
-        global ga_target_name
-        global ga_strategy_class
-        global ga_setting
-        global ga_vt_symbol
-        global ga_interval
-        global ga_start
-        global ga_rate
-        global ga_slippage
-        global ga_size
-        global ga_pricetick
-        global ga_capital
-        global ga_end
-        global ga_mode
-        global ga_inverse
-
-        ga_target_name = target_name
-        ga_strategy_class = self.strategy_class
-        ga_setting = settings[0]
-        ga_vt_symbol = self.vt_symbol
-        ga_interval = self.interval
-        ga_start = self.start
-        ga_rate = self.rate
-        ga_slippage = self.slippage
-        ga_size = self.size
-        ga_pricetick = self.pricetick
-        ga_capital = self.capital
-        ga_end = self.end
-        ga_mode = self.mode
-        ga_inverse = self.inverse
+        # Fitness of evaluated parameters is cached in main process and
+        # shared by all workers, so that each parameter is run only once.
+        fitness_cache = {}
+
+        def map_fitness(evaluate, individuals):
+            """"""
+            keys = [tuple(individual) for individual in individuals]
+            new_keys = [key for key in dict.fromkeys(keys) if key not in fitness_cache]
+
+            for key, fitness in zip(new_keys, pool.map(evaluate, new_keys)):
+                fitness_cache[key] = fitness
+
+            return [fitness_cache[key] for key in keys]
 
         # Set up genetic algorithem
         toolbox = base.Toolbox()
@@ -641,6 +774,7 @@ class BacktestingEngine:
         toolbox.register("mutate", mutate_individual, indpb=1)
         toolbox.register("evaluate", ga_optimize)
         toolbox.register("select", tools.selNSGA2)
+        toolbox.register("map", map_fitness)
 
         total_size = len(settings)
         pop_size = population_size                      # number of individuals in each generation
@@ -651,9 +785,6 @@ class BacktestingEngine:
         mutpb = 1 - cxpb    # probability that an offspring is produced by mutation
         ngen = ngen_size    # number of generation
 
-        pop = toolbox.population(pop_size)
-        hof = tools.ParetoFront()               # end result of pareto front
-
         stats = tools.Statistics(lambda ind: ind.fitness.values)
         np.set_printoptions(suppress=True)
         stats.register("mean", np.mean, axis=0)
@@ -661,9 +792,50 @@ class BacktestingEngine:
         stats.register("min", np.min, axis=0)
         stats.register("max", np.max, axis=0)
 
-        # Multiprocessing is not supported yet.
-        # pool = multiprocessing.Pool(multiprocessing.cpu_count())
-        # toolbox.register("map", pool.map)
+        # Checkpoint can only be resumed by optimization with the same setting
+        run_setting = {
+            "strategy_class": f"{self.strategy_class.__module__}.{self.strategy_class.__qualname__}",
+            "vt_symbol": self.vt_symbol,
+            "interval": self.interval,
+            "start": self.start,
+            "end": self.end,
+            "mode": self.mode,
+            "rate": self.rate,
+            "slippage": self.slippage,
+            "size": self.size,
+            "pricetick": self.pricetick,
+            "capital": self.capital,
+            "inverse": self.inverse,
+            "params": optimization_setting.params,
+            "target_name": target_name,
+            "population_size": population_size
+        }
+
+        checkpoint = None
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "rb") as f:
+                checkpoint = pickle.load(f)
+
+            if checkpoint.get("run_setting") != run_setting:
+                self.output("检查点文件与本次优化设置不一致，忽略检查点")
+                checkpoint = None
+
+        # Restore state from checkpoint file of last unfinished optimization
+        if checkpoint:
+            pop = checkpoint["population"]
+            hof = checkpoint["halloffame"]
+            logbook = checkpoint["logbook"]
+            fitness_cache.update(checkpoint["fitness_cache"])
+            random.setstate(checkpoint["random_state"])
+            start_gen = checkpoint["generation"] + 1
+
+            self.output(f"从第{start_gen}代恢复遗传算法优化")
+        else:
+            pop = toolbox.population(pop_size)
+            hof = tools.ParetoFront()               # end result of pareto front
+            logbook = tools.Logbook()
+            logbook.header = ["gen", "nevals"] + stats.fields
+            start_gen = 0
 
         # Run ga optimization
         self.output(f"参数优化空间：{total_size}")
@@ -675,29 +847,89 @@ class BacktestingEngine:
 
         start = time()
 
-        algorithms.eaMuPlusLambda(
-            pop,
-            toolbox,
-            mu,
-            lambda_,
-            cxpb,
-            mutpb,
-            ngen,
-            stats,
-            halloffame=hof
+        # Load history data only once, and ship it with other backtesting
+        # parameters to each worker process when the pool starts.
+        history_path = self.save_history_file()
+
+        context = {
+            "target_name": target_name,
+            "strategy_class": self.strategy_class,
+            "vt_symbol": self.vt_symbol,
+            "interval": self.interval,
+            "start": self.start,
+            "rate": self.rate,
+            "slippage": self.slippage,
+            "size": self.size,
+            "pricetick": self.pricetick,
+            "capital": self.capital,
+            "end": self.end,
+            "mode": self.mode,
+            "inverse": self.inverse,
+            "history_path": history_path
+        }
+
+        pool = multiprocessing.Pool(
+            multiprocessing.cpu_count(),
+            initializer=init_ga_worker,
+            initargs=(context,)
         )
 
+        try:
+            for gen in range(start_gen, ngen + 1):
+                # The first generation is the initial population
+                if gen:
+                    offspring = algorithms.varOr(pop, toolbox, lambda_, cxpb, mutpb)
+                else:
+                    offspring = pop
+
+                # Evaluate the individuals with an invalid fitness
+                invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+                fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
+                for ind, fit in zip(invalid_ind, fitnesses):
+                    ind.fitness.values = fit
+
+                hof.update(offspring)
+
+                # Select the next generation population
+                if gen:
+                    pop[:] = toolbox.select(pop + offspring, mu)
+
+                record = stats.compile(pop)
+                logbook.record(gen=gen, nevals=len(invalid_ind), **record)
+                if output:
+                    self.output(logbook.stream)
+
+                if checkpoint_path:
+                    checkpoint = {
+                        "run_setting": run_setting,
+                        "population": pop,
+                        "halloffame": hof,
+                        "logbook": logbook,
+                        "fitness_cache": fitness_cache,
+                        "random_state": random.getstate(),
+                        "generation": gen
+                    }
+                    save_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            pool.terminate()
+            pool.join()
+            os.remove(history_path)
+
         end = time()
         cost = int((end - start))
 
         self.output(f"遗传算法优化完成，耗时{cost}秒")
 
+        # Checkpoint is no longer needed after optimization finished
+        if checkpoint_path:
+            os.remove(checkpoint_path)
+
         # Return result list
         results = []
 
         for parameter_values in hof:
             setting = dict(parameter_values)
-            target_value = ga_optimize(parameter_values)[0]
+            target_value = fitness_cache[tuple(parameter_values)][0]
             results.append((setting, target_value, {}))
 
         return results
@@ -1174,7 +1406,9 @@ def optimize(
     capital: int,
     end: datetime,
     mode: BacktestingMode,
-    inverse: bool
+    inverse: bool,
+    columnar: bool = False,
+    history_path: str = ""
 ):
     """
     Function for running in multiprocessing.pool
@@ -1192,11 +1426,17 @@ def optimize(
         capital=capital,
         end=end,
         mode=mode,
-        inverse=inverse
+        inverse=inverse,
+        columnar=columnar
     )
 
     engine.add_strategy(strategy_class, setting)
-    engine.load_data()
+
+    if history_path:
+        engine.attach_history_file(history_path)
+    else:
+        engine.load_data()
+
     engine.run_backtesting()
     engine.calculate_result()
     statistics = engine.calculate_statistics(output=False)
@@ -1205,33 +1445,33 @@ def optimize(
     return (str(setting), target_value, statistics)
 
 
-@lru_cache(maxsize=1000000)
-def _ga_optimize(parameter_values: tuple):
-    """"""
+def init_ga_worker(context: dict):
+    """
+    Initialize worker process of ga optimization with backtesting context.
+    """
+    global ga_context
+    ga_context = context
+
+
+def ga_optimize(parameter_values: tuple):
+    """
+    Function for evaluating individual in ga worker process.
+    """
     setting = dict(parameter_values)
 
-    result = optimize(
-        ga_target_name,
-        ga_strategy_class,
-        setting,
-        ga_vt_symbol,
-        ga_interval,
-        ga_start,
-        ga_rate,
-        ga_slippage,
-        ga_size,
-        ga_pricetick,
-        ga_capital,
-        ga_end,
-        ga_mode,
-        ga_inverse
-    )
+    result = optimize(setting=setting, **ga_context)
     return (result[1],)
 
 
-def ga_optimize(parameter_values: list):
-    """"""
-    return _ga_optimize(tuple(parameter_values))
+def save_checkpoint(path: str, checkpoint: dict):
+    """
+    Save ga checkpoint into file, replacing the old one only after
+    new data is fully written.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(checkpoint, f)
+    os.replace(temp_path, path)
 
 
 @lru_cache(maxsize=999)
@@ -1261,17 +1501,65 @@ def load_tick_data(
     )
 
 
-# GA related global value
-ga_end = None
-ga_mode = None
-ga_target_name = None
-ga_strategy_class = None
-ga_setting = None
-ga_vt_symbol = None
-ga_interval = None
-ga_start = None
-ga_rate = None
-ga_slippage = None
-ga_size = None
-ga_pricetick = None
-ga_capital = None
+def to_history_array(datas: Iterable, dtype: np.dtype):
+    """
+    Convert bar/tick data into structured numpy array. Data is converted
+    block by block, so that it can be streamed from database iterator
+    without loading all objects into memory.
+    """
+    iterator = iter(datas)
+    arrays = []
+
+    while True:
+        block = list(islice(iterator, REPLAY_BLOCK_SIZE))
+        if not block:
+            break
+
+        array = np.empty(len(block), dtype=dtype)
+        for name in dtype.names:
+            array[name] = [getattr(data, name) for data in block]
+        arrays.append(array)
+
+    if not arrays:
+        return np.empty(0, dtype=dtype)
+    elif len(arrays) == 1:
+        return arrays[0]
+    else:
+        return np.concatenate(arrays)
+
+
+@lru_cache(maxsize=999)
+def load_bar_array(
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    start: datetime,
+    end: datetime
+):
+    """"""
+    bars = database_manager.iter_bar_data(
+        symbol, exchange, interval, start, end
+    )
+    array = to_history_array(bars, BAR_DTYPE)
+    array.flags.writeable = False   # Cached array is shared between engines
+    return array
+
+
+@lru_cache(maxsize=999)
+def load_tick_array(
+    symbol: str,
+    exchange: Exchange,
+    start: datetime,
+    end: datetime
+):
+    """"""
+    ticks = database_manager.iter_tick_data(
+        symbol, exchange, start, end
+    )
+    array = to_history_array(ticks, TICK_DTYPE)
+    array.flags.writeable = False
+    return array
+
+
+# Backtesting context of ga worker process
+ga_context = None
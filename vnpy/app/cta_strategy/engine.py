@@ -310,6 +310,7 @@ class CtaEngine(BaseEngine):
             type=type,
             price=price,
             volume=volume,
+            reference=strategy.strategy_name
         )
 
         # Convert with offset converter
@@ -539,7 +540,7 @@ class CtaEngine(BaseEngine):
             bars = self.query_bar_from_rq(symbol, exchange, interval, start, end)
 
         if not bars:
-            bars = database_manager.load_bar_data(
+            bars = database_manager.iter_bar_data(
                 symbol=symbol,
                 exchange=exchange,
                 interval=interval,
@@ -561,7 +562,7 @@ class CtaEngine(BaseEngine):
         end = datetime.now()
         start = end - timedelta(days)
 
-        ticks = database_manager.load_tick_data(
+        ticks = database_manager.iter_tick_data(
             symbol=symbol,
             exchange=exchange,
             start=start,
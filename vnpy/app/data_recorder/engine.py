@@ -3,6 +3,7 @@
 from threading import Thread
 from queue import Queue, Empty
 from copy import copy
+from time import time
 
 from vnpy.event import Event, EventEngine
 from vnpy.trader.engine import BaseEngine, MainEngine
@@ -29,6 +30,9 @@ class RecorderEngine(BaseEngine):
     """"""
     setting_filename = "data_recorder_setting.json"
 
+    batch_size = 1000       # Max number of data saved in one write
+    flush_interval = 1      # Max seconds before data in queue is saved
+
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
         """"""
         super().__init__(main_engine, event_engine, APP_NAME)
@@ -41,6 +45,13 @@ class RecorderEngine(BaseEngine):
         self.bar_recordings = {}
         self.bar_generators = {}
 
+        self.start_time = 0
+        self.received_count = 0
+        self.tick_count = 0
+        self.bar_count = 0
+        self.write_count = 0
+        self.write_time = 0
+
         self.load_setting()
         self.register_event()
         self.start()
@@ -61,30 +72,110 @@ class RecorderEngine(BaseEngine):
         save_json(self.setting_filename, setting)
 
     def run(self):
-        """"""
+        """
+        Get data from queue and save them into database in batches.
+        """
+        ticks = []
+        bars = []
+        flush_time = time() + self.flush_interval
+
         while self.active:
             try:
-                task = self.queue.get(timeout=1)
-                task_type, data = task
+                timeout = max(flush_time - time(), 0)
+                task = self.queue.get(timeout=timeout)
+
+                while True:
+                    task_type, data = task
+
+                    if task_type == "tick":
+                        ticks.append(data)
+                    elif task_type == "bar":
+                        bars.append(data)
 
-                if task_type == "tick":
-                    database_manager.save_tick_data([data])
-                elif task_type == "bar":
-                    database_manager.save_bar_data([data])
+                    if len(ticks) + len(bars) >= self.batch_size:
+                        break
 
+                    task = self.queue.get_nowait()
             except Empty:
-                continue
+                pass
+
+            if len(ticks) + len(bars) >= self.batch_size or time() >= flush_time:
+                self.save_data(ticks, bars)
+                ticks = []
+                bars = []
+                flush_time = time() + self.flush_interval
+
+        # Save all data left in queue before exit
+        while True:
+            try:
+                task_type, data = self.queue.get_nowait()
+            except Empty:
+                break
+
+            if task_type == "tick":
+                ticks.append(data)
+            elif task_type == "bar":
+                bars.append(data)
+
+        self.save_data(ticks, bars)
+
+    def save_data(self, ticks: list, bars: list):
+        """"""
+        if not ticks and not bars:
+            return
+
+        start = time()
+
+        if ticks:
+            database_manager.save_tick_data(ticks)
+            self.tick_count += len(ticks)
+
+        if bars:
+            database_manager.save_bar_data(bars)
+            self.bar_count += len(bars)
+
+        self.write_count += 1
+        self.write_time += time() - start
+
+    def get_stats(self):
+        """
+        Get statistics of data recording, the write speed
+        should be greater than the receive speed.
+        """
+        saved_count = self.tick_count + self.bar_count
+
+        if self.write_time:
+            write_speed = saved_count / self.write_time
+        else:
+            write_speed = 0
+
+        receive_speed = self.received_count / max(time() - self.start_time, 1)
+
+        return {
+            "backlog": self.queue.qsize(),
+            "received_count": self.received_count,
+            "receive_speed": receive_speed,
+            "tick_count": self.tick_count,
+            "bar_count": self.bar_count,
+            "write_count": self.write_count,
+            "write_time": self.write_time,
+            "write_speed": write_speed,
+        }
 
     def close(self):
         """"""
         self.active = False
 
-        if self.thread.isAlive():
+        # Wake up thread waiting for data till next flush
+        self.queue.put(("", None))
+
+        if self.thread.is_alive():
             self.thread.join()
 
     def start(self):
         """"""
         self.active = True
+        self.start_time = time()
         self.thread.start()
 
     def add_bar_recording(self, vt_symbol: str):
@@ -236,11 +327,13 @@ class RecorderEngine(BaseEngine):
         """"""
         task = ("tick", copy(tick))
         self.queue.put(task)
+        self.received_count += 1
 
     def record_bar(self, bar: BarData):
         """"""
         task = ("bar", copy(bar))
         self.queue.put(task)
+        self.received_count += 1
 
     def get_bar_generator(self, vt_symbol: str):
         """"""
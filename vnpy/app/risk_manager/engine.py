@@ -158,7 +158,7 @@ class RiskManagerEngine(BaseEngine):
             return False
 
         # Check all active orders
-        active_order_count = len(self.main_engine.get_all_active_orders())
+        active_order_count = self.main_engine.get_active_order_count()
         if active_order_count >= self.active_order_limit:
             self.write_log(
                 f"当前活动委托次数{active_order_count}，超过限制{self.active_order_limit}")
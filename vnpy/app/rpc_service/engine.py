@@ -1,18 +1,25 @@
 """"""
 
 import traceback
-from typing import Optional
+from hashlib import md5
+from threading import Lock
+from typing import List, Optional
 
 from vnpy.event import Event, EventEngine
 from vnpy.rpc import RpcServer
+from vnpy.trader import codec
 from vnpy.trader.engine import BaseEngine, MainEngine
+from vnpy.trader.event import EVENT_CONTRACT
+from vnpy.trader.gateway import EVENT_FANOUTS
 from vnpy.trader.utility import load_json, save_json
-from vnpy.trader.object import LogData
+from vnpy.trader.object import ContractData, LogData
 
 APP_NAME = "RpcService"
 
 EVENT_RPC_LOG = "eRpcLog"
 
+SNAPSHOT_CHUNK_SIZE = 5000
+
 
 class RpcEngine(BaseEngine):
     """"""
@@ -27,13 +34,22 @@ class RpcEngine(BaseEngine):
 
         self.server: Optional[RpcServer] = None
 
+        # Contract list sorted by vt_symbol for snapshot in chunks, and
+        # its version, which is updated when contract changed. Contract
+        # events are processed in event thread and snapshot is requested
+        # in server thread, so they are protected by lock.
+        self.contracts: List[ContractData] = []
+        self.contract_version = ""
+        self.contract_changed = True
+        self.contract_lock = Lock()
+
         self.init_server()
         self.load_setting()
         self.register_event()
 
     def init_server(self):
         """"""
-        self.server = RpcServer()
+        self.server = RpcServer(codec)
 
         self.server.register(self.main_engine.subscribe)
         self.server.register(self.main_engine.send_order)
@@ -56,6 +72,8 @@ class RpcEngine(BaseEngine):
         self.server.register(self.main_engine.get_all_contracts)
         self.server.register(self.main_engine.get_all_active_orders)
 
+        self.server.register(self.get_snapshot)
+
     def load_setting(self):
         """"""
         setting = load_json(self.setting_filename)
@@ -108,11 +126,75 @@ class RpcEngine(BaseEngine):
     def register_event(self):
         """"""
         self.event_engine.register_general(self.process_event)
+        self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
 
-    def process_event(self, event: Event):
+    def process_contract_event(self, event: Event):
         """"""
-        if self.server.is_active():
-            self.server.publish("", event)
+        with self.contract_lock:
+            self.contract_changed = True
+
+    def get_snapshot(
+        self,
+        contract_version: str = "",
+        start: int = 0,
+        size: int = SNAPSHOT_CHUNK_SIZE
+    ) -> dict:
+        """
+        Get snapshot of contracts in chunks of size from start index.
+
+        Contracts are not included if contract_version cached by client is
+        still the latest. Accounts, positions, orders and trades are included
+        in the first chunk. Chunk size is returned for requesting the rest.
+        """
+        with self.contract_lock:
+            if self.contract_changed:
+                self.contract_changed = False
+
+                contracts = self.main_engine.get_all_contracts()
+                contracts.sort(key=lambda contract: contract.vt_symbol)
+
+                self.contracts = contracts
+                self.contract_version = md5(codec.dumps(contracts)).hexdigest()
+
+            contracts = self.contracts
+            latest_version = self.contract_version
+
+        snapshot = {
+            "contract_version": latest_version,
+            "contract_count": len(contracts),
+            "chunk_size": size,
+            "contracts": [],
+        }
+
+        if contract_version != latest_version:
+            snapshot["contracts"] = contracts[start:start + size]
+
+        if not start:
+            snapshot["accounts"] = self.main_engine.get_all_accounts()
+            snapshot["positions"] = self.main_engine.get_all_positions()
+            snapshot["orders"] = self.main_engine.get_all_orders()
+            snapshot["trades"] = self.main_engine.get_all_trades()
+
+        return snapshot
+
+    def process_event(self, event: Event):
+        """
+        Publish event with type as topic, and data events are published
+        with type + key (e.g. vt_symbol) as topic, so that clients can
+        subscribe data of specific keys.
+        """
+        if not self.server.is_active():
+            return
+
+        key_func = EVENT_FANOUTS.get(event.type, None)
+        key = key_func(event) if key_func else None
+
+        if key:
+            topic = event.type + key
+        else:
+            topic = event.type
+
+        self.server.publish(topic, event)
 
     def write_log(self, msg: str) -> None:
         """"""
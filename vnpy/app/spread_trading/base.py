@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from datetime import datetime
 from enum import Enum
 from functools import lru_cache
@@ -374,11 +374,12 @@ def load_bar_data(
     for vt_symbol in spread.legs.keys():
         symbol, exchange = extract_vt_symbol(vt_symbol)
 
-        bar_data: List[BarData] = database_manager.load_bar_data(
+        bar_data: Iterator[BarData] = database_manager.iter_bar_data(
             symbol, exchange, interval, start, end
         )
 
-        bars: Dict[datetime, BarData] = {bar.datetime: bar for bar in bar_data}
+        # Only close price is kept, no need to hold all bar objects
+        bars: Dict[datetime, float] = {bar.datetime: bar.close_price for bar in bar_data}
         leg_bars[vt_symbol] = bars
 
     # Calculate spread bar data
@@ -389,11 +390,11 @@ def load_bar_data(
         spread_available = True
 
         for leg in spread.legs.values():
-            leg_bar = leg_bars[leg.vt_symbol].get(dt, None)
+            leg_price = leg_bars[leg.vt_symbol].get(dt, None)
 
-            if leg_bar:
+            if leg_price is not None:
                 price_multiplier = spread.price_multipliers[leg.vt_symbol]
-                spread_price += price_multiplier * leg_bar.close_price
+                spread_price += price_multiplier * leg_price
             else:
                 spread_available = False
 
@@ -1 +1 @@
-from .engine import Event, EventEngine, EVENT_TIMER
+from .engine import Event, EventEngine, BatchEventEngine, ShardedEventEngine, EVENT_TIMER, EVENT_MONITOR
@@ -2,13 +2,16 @@
 Event-driven framework of vn.py framework.
 """
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable
+from threading import Lock, Thread, Event as Signal
+from time import perf_counter, sleep
+from typing import Any, Callable, Dict, Tuple
+
+from vnpy.trader.stats import LatencyHistogram
 
 EVENT_TIMER = "eTimer"
+EVENT_MONITOR = "eMonitor"
 
 
 class Event:
@@ -28,6 +31,14 @@ class Event:
 HandlerType = Callable[[Event], None]
 
 
+def get_vt_symbol(event: Event) -> Any:
+    """
+    Get vt_symbol of event data as partition key, return None if the
+    data is not related to a specific symbol.
+    """
+    return getattr(event.data, "vt_symbol", None)
+
+
 class EventEngine:
     """
     Event engine distributes event object based on its type
@@ -47,8 +58,31 @@ class EventEngine:
         self._active = False
         self._thread = Thread(target=self._run)
         self._timer = Thread(target=self._run_timer)
-        self._handlers = defaultdict(list)
-        self._general_handlers = []
+        # Handlers are kept in tuples which are only replaced when
+        # registering/unregistering, so that no copy or lock is needed
+        # when distributing events.
+        self._handlers: Dict[str, Tuple[HandlerType, ...]] = {}
+        self._general_handlers: Tuple[HandlerType, ...] = ()
+
+        # Key functions of event types which are also distributed to
+        # handlers registered for type + key
+        self._fanouts: Dict[str, Callable[[Event], str]] = {}
+
+        # Latest events waiting to be processed for conflated event types
+        self._conflations: Dict[str, Callable[[Event], Any]] = {}
+        self._conflated_events: Dict[Tuple[str, Any], Event] = {}
+        self._conflated_counts: Dict[str, int] = defaultdict(int)
+        self._conflation_lock = Lock()
+
+        # Latency statistics recorded when monitor is enabled
+        self._monitoring = False
+        self._monitor_interval = 0
+        self._monitor_count = 0
+        self._queue_wait_stats: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._handler_stats: Dict[str, Dict[str, LatencyHistogram]] = defaultdict(
+            lambda: defaultdict(LatencyHistogram)
+        )
+        self._max_queue_size = 0
 
     def _run(self):
         """
@@ -68,12 +102,79 @@ class EventEngine:
 
         Then distrubute event to those general handlers which listens
         to all types.
+
+        Finally distribute event to handlers listening to the specific
+        key of this type, if fan-out is set for the type.
+        """
+        if event.type in self._conflations:
+            event = self._pop_conflated(event)
+
+        if self._monitoring:
+            self._process_monitored(event)
+            return
+
+        handlers = self._handlers.get(event.type, None)
+        if handlers:
+            for handler in handlers:
+                handler(event)
+
+        for handler in self._general_handlers:
+            handler(event)
+
+        key_func = self._fanouts.get(event.type, None)
+        if key_func:
+            key = key_func(event)
+
+            # Data without key is not distributed to key handlers
+            if key:
+                handlers = self._handlers.get(event.type + key, None)
+                if handlers:
+                    for handler in handlers:
+                        handler(event)
+
+    def _process_monitored(self, event: Event):
+        """
+        Distribute event to handlers and record latency statistics.
         """
-        if event.type in self._handlers:
-            [handler(event) for handler in self._handlers[event.type]]
+        queue_size = self.get_queue_size()
+        if queue_size > self._max_queue_size:
+            self._max_queue_size = queue_size
 
-        if self._general_handlers:
-            [handler(event) for handler in self._general_handlers]
+        put_time = getattr(event, "put_time", None)
+        if put_time:
+            self._queue_wait_stats[event.type].add(perf_counter() - put_time)
+
+        handlers = self._handlers.get(event.type, ()) + self._general_handlers
+        self._call_monitored(event.type, handlers, event)
+
+        key_func = self._fanouts.get(event.type, None)
+        if key_func:
+            key = key_func(event)
+
+            if key:
+                type = event.type + key
+                handlers = self._handlers.get(type, None)
+                if handlers:
+                    self._call_monitored(type, handlers, event)
+
+    def _call_monitored(
+        self,
+        type: str,
+        handlers: Tuple[HandlerType, ...],
+        event: Event
+    ):
+        """
+        Call handlers and record execution time under the type.
+        """
+        handler_stats = self._handler_stats[type]
+
+        for handler in handlers:
+            start = perf_counter()
+            handler(event)
+            end = perf_counter()
+
+            name = getattr(handler, "__qualname__", repr(handler))
+            handler_stats[name].add(end - start)
 
     def _run_timer(self):
         """
@@ -104,28 +205,171 @@ class EventEngine:
         """
         Put an event object into event queue.
         """
+        if self._monitoring:
+            event.put_time = perf_counter()
+
+        if event.type in self._conflations and self._conflate(event):
+            return
+
+        self._enqueue(event)
+
+    def _enqueue(self, event: Event):
+        """
+        Put an event object into the queue processed by worker thread.
+        """
         self._queue.put(event)
 
+    def _conflate(self, event: Event):
+        """
+        Replace event with same key which is still waiting in queue.
+        Return True if conflated, otherwise the event should be put
+        into queue, and it will be replaced by latest one when processed.
+        """
+        key = (event.type, self._conflations[event.type](event))
+
+        with self._conflation_lock:
+            conflated = key in self._conflated_events
+            self._conflated_events[key] = event
+
+            if conflated:
+                self._conflated_counts[event.type] += 1
+
+        return conflated
+
+    def _pop_conflated(self, event: Event):
+        """
+        Get the latest event with same key as the event got from queue.
+        """
+        key = (event.type, self._conflations[event.type](event))
+
+        with self._conflation_lock:
+            return self._conflated_events.pop(key, event)
+
+    def set_conflation(
+        self,
+        type: str,
+        key_func: Callable[[Event], Any] = get_vt_symbol
+    ):
+        """
+        Conflate events of a specific type by key. When handlers cannot
+        keep up with new events, only the latest event of each key is
+        kept in queue, e.g. latest tick of each vt_symbol.
+        """
+        self._conflations[type] = key_func
+
+    def set_fanout(self, type: str, key_func: Callable[[Event], str]):
+        """
+        Distribute events of a specific type also to handlers registered
+        for type + key, with key returned by key_func, e.g. tick event
+        to handlers registered for EVENT_TICK + vt_symbol. Events with
+        empty key (None or "") are not distributed by key.
+
+        Compared with putting an extra event of the key type, no queue
+        traffic is added and only keys with handlers are dispatched.
+        """
+        self._fanouts[type] = key_func
+
+    def get_conflated_counts(self) -> Dict[str, int]:
+        """
+        Get number of events dropped by conflation for each event type.
+        """
+        return dict(self._conflated_counts)
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queue.
+        """
+        return self._queue.qsize()
+
+    def enable_monitor(self, snapshot_interval: int = 60):
+        """
+        Start recording queue wait time of each event type, and execution
+        time of each handler.
+
+        Monitor snapshot is put as EVENT_MONITOR event every
+        snapshot_interval timer events, 0 for not putting snapshot.
+        """
+        self._monitoring = True
+        self._monitor_interval = snapshot_interval
+        self._monitor_count = 0
+        self.register(EVENT_TIMER, self._process_monitor_timer)
+
+    def disable_monitor(self):
+        """
+        Stop recording latency statistics.
+        """
+        self._monitoring = False
+        self.unregister(EVENT_TIMER, self._process_monitor_timer)
+
+    def reset_monitor(self):
+        """
+        Clear all latency statistics recorded.
+        """
+        self._queue_wait_stats.clear()
+        self._handler_stats.clear()
+        self._max_queue_size = 0
+
+    def get_monitor_snapshot(self) -> dict:
+        """
+        Get statistics of queue size, queue wait time and handler
+        execution time recorded by monitor.
+        """
+        queue_wait = {
+            type: histogram.get_stats()
+            for type, histogram in list(self._queue_wait_stats.items())
+        }
+
+        handlers = {}
+        for type, handler_stats in list(self._handler_stats.items()):
+            handlers[type] = {
+                name: histogram.get_stats()
+                for name, histogram in list(handler_stats.items())
+            }
+
+        return {
+            "queue_size": self.get_queue_size(),
+            "max_queue_size": self._max_queue_size,
+            "queue_wait": queue_wait,
+            "handlers": handlers,
+        }
+
+    def _process_monitor_timer(self, event: Event):
+        """
+        Put monitor snapshot event periodically.
+        """
+        if not self._monitor_interval:
+            return
+
+        self._monitor_count += 1
+        if self._monitor_count < self._monitor_interval:
+            return
+        self._monitor_count = 0
+
+        snapshot = self.get_monitor_snapshot()
+        self.put(Event(EVENT_MONITOR, snapshot))
+
     def register(self, type: str, handler: HandlerType):
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
         """
-        handler_list = self._handlers[type]
-        if handler not in handler_list:
-            handler_list.append(handler)
+        handlers = self._handlers.get(type, ())
+        if handler not in handlers:
+            self._handlers[type] = handlers + (handler,)
 
     def unregister(self, type: str, handler: HandlerType):
         """
         Unregister an existing handler function from event engine.
         """
-        handler_list = self._handlers[type]
+        handlers = self._handlers.get(type, ())
 
-        if handler in handler_list:
-            handler_list.remove(handler)
+        if handler in handlers:
+            handlers = tuple(h for h in handlers if h != handler)
 
-        if not handler_list:
-            self._handlers.pop(type)
+        if handlers:
+            self._handlers[type] = handlers
+        else:
+            self._handlers.pop(type, None)
 
     def register_general(self, handler: HandlerType):
         """
@@ -133,11 +377,140 @@ class EventEngine:
         function can only be registered once for each event type.
         """
         if handler not in self._general_handlers:
-            self._general_handlers.append(handler)
+            self._general_handlers = self._general_handlers + (handler,)
 
     def unregister_general(self, handler: HandlerType):
         """
         Unregister an existing general handler function.
         """
         if handler in self._general_handlers:
-            self._general_handlers.remove(handler)
+            self._general_handlers = tuple(
+                h for h in self._general_handlers if h != handler
+            )
+
+
+class BatchEventEngine(EventEngine):
+    """
+    Event engine for high throughput scenario.
+
+    Events are stored in a deque instead of a lock protected queue,
+    and the worker thread drains all pending events in one batch
+    every time it is woken up.
+    """
+
+    def __init__(self, interval: int = 1):
+        """"""
+        super().__init__(interval)
+
+        self._queue = deque()
+        self._signal = Signal()
+
+    def _run(self):
+        """
+        Wait for new events and then process all of them.
+        """
+        queue = self._queue
+        signal = self._signal
+        process = self._process
+
+        while self._active:
+            if not signal.wait(timeout=1):
+                continue
+
+            # Clear the signal before draining, so that any event put
+            # after draining finished will set it again.
+            signal.clear()
+
+            for _ in range(len(queue)):
+                process(queue.popleft())
+
+    def _enqueue(self, event: Event):
+        """"""
+        self._queue.append(event)
+
+        if not self._signal.is_set():
+            self._signal.set()
+
+    def get_queue_size(self) -> int:
+        """"""
+        return len(self._queue)
+
+
+class ShardedEventEngine(EventEngine):
+    """
+    Event engine with multiple worker threads.
+
+    Events are distributed to workers by partition key returned from
+    key_func, so that events with the same key are always processed in
+    order by the same worker. Events without key are processed by the
+    first worker.
+
+    Handlers registered may be called from different worker threads
+    at the same time, so they must be thread safe.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        shard_count: int = 4,
+        key_func: Callable[[Event], Any] = get_vt_symbol
+    ):
+        """"""
+        super().__init__(interval)
+
+        self._shard_count = shard_count
+        self._key_func = key_func
+
+        self._queues = [Queue() for _ in range(shard_count)]
+        self._threads = [
+            Thread(target=self._run_shard, args=(queue,))
+            for queue in self._queues
+        ]
+
+    def _run_shard(self, queue: Queue):
+        """
+        Get event from queue of the shard and then process it.
+        """
+        while self._active:
+            try:
+                event = queue.get(block=True, timeout=1)
+                self._process(event)
+            except Empty:
+                pass
+
+    def start(self):
+        """
+        Start all worker threads and timer thread.
+        """
+        self._active = True
+        for thread in self._threads:
+            thread.start()
+        self._timer.start()
+
+    def stop(self):
+        """
+        Stop event engine.
+        """
+        self._active = False
+        self._timer.join()
+        for thread in self._threads:
+            thread.join()
+
+    def _enqueue(self, event: Event):
+        """
+        Put an event object into queue of the shard its key belongs to.
+        """
+        key = self._key_func(event)
+
+        if key is None:
+            queue = self._queues[0]
+        else:
+            queue = self._queues[hash(key) % self._shard_count]
+
+        queue.put(event)
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting in queues of all shards.
+        """
+        return sum(queue.qsize() for queue in self._queues)
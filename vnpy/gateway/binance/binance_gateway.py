@@ -11,8 +11,8 @@ from datetime import datetime, timedelta
 from enum import Enum
 from threading import Lock
 
-from vnpy.api.rest import RestClient, Request
-from vnpy.api.websocket import WebsocketClient
+from vnpy.api.rest import AsyncRestClient, Request, RestClient
+from vnpy.api.websocket import AsyncWebsocketClient, WebsocketClient
 from vnpy.trader.constant import (
     Direction,
     Exchange,
@@ -95,6 +95,7 @@ class BinanceGateway(BaseGateway):
         "session_number": 3,
         "proxy_host": "",
         "proxy_port": 0,
+        "engine": ["THREAD", "ASYNC"],
     }
 
     exchanges = [Exchange.BINANCE]
@@ -114,6 +115,14 @@ class BinanceGateway(BaseGateway):
         session_number = setting["session_number"]
         proxy_host = setting["proxy_host"]
         proxy_port = setting["proxy_port"]
+        engine = setting["engine"]
+
+        # Requests and websocket data are processed by asyncio event loop
+        # if enabled, with rest api created after websocket apis it uses.
+        if engine == "ASYNC":
+            self.trade_ws_api = BinanceAsyncTradeWebsocketApi(self)
+            self.market_ws_api = BinanceAsyncDataWebsocketApi(self)
+            self.rest_api = BinanceAsyncRestApi(self)
 
         self.rest_api.connect(key, secret, session_number,
                               proxy_host, proxy_port)
@@ -182,6 +191,11 @@ class BinanceRestApi(RestClient):
         self.order_count_lock = Lock()
         self.connect_time = 0
 
+        # Request weight limit is 1200 per minute
+        self.set_rate_limit(rate=20, capacity=100)
+        self.set_endpoint("/api/v3/account", cost=5)
+        self.set_endpoint("/api/v3/openOrders", cost=40)
+
     def sign(self, request):
         """
         Generate BINANCE signature.
@@ -606,6 +620,13 @@ class BinanceRestApi(RestClient):
         return history
 
 
+class BinanceAsyncRestApi(BinanceRestApi, AsyncRestClient):
+    """
+    BINANCE REST API with requests sent by asyncio event loop.
+    """
+    pass
+
+
 class BinanceTradeWebsocketApi(WebsocketClient):
     """"""
 
@@ -775,3 +796,17 @@ class BinanceDataWebsocketApi(WebsocketClient):
 
         if tick.last_price:
             self.gateway.on_tick(copy(tick))
+
+
+class BinanceAsyncTradeWebsocketApi(BinanceTradeWebsocketApi, AsyncWebsocketClient):
+    """
+    BINANCE trade websocket API running in shared asyncio event loop.
+    """
+    pass
+
+
+class BinanceAsyncDataWebsocketApi(BinanceDataWebsocketApi, AsyncWebsocketClient):
+    """
+    BINANCE market data websocket API running in shared asyncio event loop.
+    """
+    pass
@@ -23,6 +23,7 @@ from vnpy.trader.constant import (
     Interval
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.orderbook import OrderBook
 from vnpy.trader.object import (
     TickData,
     OrderData,
@@ -42,6 +43,9 @@ BASE_URL = "https://api.bitfinex.com/"
 REST_HOST = "https://api.bitfinex.com/"
 WEBSOCKET_HOST = "wss://api-pub.bitfinex.com/ws/2"
 
+# Configuration flag for receiving checksum of order book
+OB_CHECKSUM = 131072
+
 STATUS_BITFINEX2VT = {
     "ACTIVE": Status.NOTTRADED,
     "PARTIALLY FILLED": Status.PARTTRADED,
@@ -389,8 +393,7 @@ class BitfinexWebsocketApi(WebsocketClient):
         self.orders = {}
         self.trades = set()
         self.ticks = {}
-        self.bids = {}
-        self.asks = {}
+        self.orderbooks = {}
         self.channels = {}       # channel_id : (Channel, Symbol)
 
         self.subscribed = {}
@@ -492,6 +495,7 @@ class BitfinexWebsocketApi(WebsocketClient):
     def on_connected(self):
         """"""
         self.gateway.write_log("Websocket API连接成功")
+        self.send_packet({"event": "conf", "flags": OB_CHECKSUM})
         self.authenticate()
 
     def on_disconnected(self):
@@ -529,9 +533,18 @@ class BitfinexWebsocketApi(WebsocketClient):
     def on_data_update(self, data):
         """"""
         channel_id = data[0]
+
+        # Channel unsubscribed after checksum failed
+        if channel_id not in self.channels:
+            return
+
         channel, symbol = self.channels[channel_id]
         symbol = str(symbol.replace("t", ""))
 
+        if data[1] == "cs":
+            self.on_checksum(channel_id, symbol, data[2])
+            return
+
         # Get the Tick object
         if symbol in self.ticks:
             tick = self.ticks[symbol]
@@ -558,19 +571,25 @@ class BitfinexWebsocketApi(WebsocketClient):
 
         # Update deep quote
         elif channel == "book":
-            bid = self.bids.setdefault(symbol, {})
-            ask = self.asks.setdefault(symbol, {})
+            book = self.orderbooks.get(symbol, None)
+            if not book:
+                book = OrderBook()
+                self.orderbooks[symbol] = book
 
             if len(l_data1) > 3:
+                bids = []
+                asks = []
+
                 for price, count, amount in l_data1:
                     price = float(price)
-                    count = int(count)
                     amount = float(amount)
 
                     if amount > 0:
-                        bid[price] = amount
+                        bids.append((price, amount))
                     else:
-                        ask[price] = -amount
+                        asks.append((price, -amount))
+
+                book.apply_snapshot(bids, asks)
             else:
                 price, count, amount = l_data1
                 price = float(price)
@@ -578,51 +597,22 @@ class BitfinexWebsocketApi(WebsocketClient):
                 amount = float(amount)
 
                 if not count:
-                    if price in bid:
-                        del bid[price]
-                    elif price in ask:
-                        del ask[price]
+                    if price in book.bids:
+                        book.update_bid(price, 0)
+                    elif price in book.asks:
+                        book.update_ask(price, 0)
                 else:
                     if amount > 0:
-                        bid[price] = amount
+                        book.update_bid(price, amount)
                     else:
-                        ask[price] = -amount
-
-            try:
-                # BID
-                bid_keys = bid.keys()
-                bidPriceList = sorted(bid_keys, reverse=True)
-
-                tick.bid_price_1 = bidPriceList[0]
-                tick.bid_price_2 = bidPriceList[1]
-                tick.bid_price_3 = bidPriceList[2]
-                tick.bid_price_4 = bidPriceList[3]
-                tick.bid_price_5 = bidPriceList[4]
-
-                tick.bid_volume_1 = bid[tick.bid_price_1]
-                tick.bid_volume_2 = bid[tick.bid_price_2]
-                tick.bid_volume_3 = bid[tick.bid_price_3]
-                tick.bid_volume_4 = bid[tick.bid_price_4]
-                tick.bid_volume_5 = bid[tick.bid_price_5]
-
-                # ASK
-                ask_keys = ask.keys()
-                askPriceList = sorted(ask_keys)
-
-                tick.ask_price_1 = askPriceList[0]
-                tick.ask_price_2 = askPriceList[1]
-                tick.ask_price_3 = askPriceList[2]
-                tick.ask_price_4 = askPriceList[3]
-                tick.ask_price_5 = askPriceList[4]
-
-                tick.ask_volume_1 = ask[tick.ask_price_1]
-                tick.ask_volume_2 = ask[tick.ask_price_2]
-                tick.ask_volume_3 = ask[tick.ask_price_3]
-                tick.ask_volume_4 = ask[tick.ask_price_4]
-                tick.ask_volume_5 = ask[tick.ask_price_5]
-            except IndexError:
+                        book.update_ask(price, -amount)
+
+            # Wait until both sides have enough depth levels
+            if len(book.bid_prices) < 5 or len(book.ask_prices) < 5:
                 return
 
+            book.update_tick(tick)
+
         dt = datetime.now()
         tick.date = dt.strftime("%Y%m%d")
         tick.time = dt.strftime("%H:%M:%S.%f")
@@ -630,6 +620,26 @@ class BitfinexWebsocketApi(WebsocketClient):
 
         self.gateway.on_tick(copy(tick))
 
+    def on_checksum(self, channel_id: int, symbol: str, checksum: int):
+        """
+        Resubscribe order book if checksum does not match local one.
+        """
+        book = self.orderbooks.get(symbol, None)
+        if not book or book.calculate_checksum(ask_sign=-1) == checksum:
+            return
+
+        self.gateway.write_log(f"{symbol}深度数据校验失败，重新订阅")
+
+        self.orderbooks.pop(symbol)
+        self.channels.pop(channel_id)
+
+        self.send_packet({"event": "unsubscribe", "chanId": channel_id})
+        self.send_packet({
+            "event": "subscribe",
+            "channel": "book",
+            "symbol": symbol,
+        })
+
     def on_wallet(self, data):
         """"""
         print(data)
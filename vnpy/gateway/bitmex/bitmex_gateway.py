@@ -12,7 +12,7 @@ from urllib.parse import urlencode
 from requests import ConnectionError
 
 from vnpy.event import Event
-from vnpy.api.rest import Request, RestClient
+from vnpy.api.rest import AsyncRestClient, Request, RestClient
 from vnpy.api.websocket import WebsocketClient
 from vnpy.trader.event import EVENT_TIMER
 from vnpy.trader.constant import (
@@ -88,6 +88,7 @@ class BitmexGateway(BaseGateway):
         "服务器": ["REAL", "TESTNET"],
         "代理地址": "",
         "代理端口": "",
+        "网络引擎": ["THREAD", "ASYNC"],
     }
 
     exchanges = [Exchange.BITMEX]
@@ -109,12 +110,17 @@ class BitmexGateway(BaseGateway):
         server = setting["服务器"]
         proxy_host = setting["代理地址"]
         proxy_port = setting["代理端口"]
+        engine = setting["网络引擎"]
 
         if proxy_port.isdigit():
             proxy_port = int(proxy_port)
         else:
             proxy_port = 0
 
+        # Requests are sent by asyncio event loop if enabled
+        if engine == "ASYNC":
+            self.rest_api = BitmexAsyncRestApi(self)
+
         self.rest_api.connect(key, secret, session_number,
                               server, proxy_host, proxy_port)
 
@@ -507,6 +513,13 @@ class BitmexRestApi(RestClient):
             return True
 
 
+class BitmexAsyncRestApi(BitmexRestApi, AsyncRestClient):
+    """
+    BITMEX REST API with requests sent by asyncio event loop.
+    """
+    pass
+
+
 class BitmexWebsocketApi(WebsocketClient):
     """"""
 
@@ -467,6 +467,8 @@ class BitstampRestApi(RestClient):
         cancel_request = request.extra
         local_orderid = cancel_request.orderid
         order = self.order_manager.get_order_with_local_orderid(local_orderid)
+        if not order:
+            return
 
         if order.is_active:
             order.status = Status.CANCELLED
@@ -36,6 +36,7 @@ from vnpy.trader.object import (
 )
 from vnpy.trader.event import EVENT_TIMER
 from vnpy.trader.gateway import BaseGateway, LocalOrderManager
+from vnpy.trader.orderbook import OrderBook
 
 
 STATUS_BYBIT2VT = {
@@ -596,8 +597,7 @@ class BybitWebsocketApi(WebsocketClient):
         self.ticks: Dict[str, TickData] = {}
         self.subscribed: Dict[str, SubscribeRequest] = {}
 
-        self.symbol_bids: Dict[str, dict] = {}
-        self.symbol_asks: Dict[str, dict] = {}
+        self.orderbooks: Dict[str, OrderBook] = {}
 
     def connect(
         self, key: str, secret: str, server: str, proxy_host: str, proxy_port: int
@@ -736,54 +736,43 @@ class BybitWebsocketApi(WebsocketClient):
         data = packet["data"]
         timestamp = packet["timestamp_e6"]
 
-        # Update depth data into dict buf
+        # Update depth data into order book
         symbol = topic.replace("orderBookL2_25.", "")
         tick = self.ticks[symbol]
-        bids = self.symbol_bids.setdefault(symbol, {})
-        asks = self.symbol_asks.setdefault(symbol, {})
+
+        book = self.orderbooks.get(symbol, None)
+        if not book:
+            book = OrderBook()
+            self.orderbooks[symbol] = book
 
         if type_ == "snapshot":
-            for d in data:
-                price = float(d["price"])
+            bids = []
+            asks = []
 
+            for d in data:
                 if d["side"] == "Buy":
-                    bids[price] = d
+                    bids.append((float(d["price"]), d["size"]))
                 else:
-                    asks[price] = d
+                    asks.append((float(d["price"]), d["size"]))
+
+            book.apply_snapshot(bids, asks)
         else:
             for d in data["delete"]:
                 price = float(d["price"])
                 if d["side"] == "Buy":
-                    bids.pop(price)
+                    book.update_bid(price, 0)
                 else:
-                    asks.pop(price)
+                    book.update_ask(price, 0)
 
             for d in (data["update"] + data["insert"]):
                 price = float(d["price"])
                 if d["side"] == "Buy":
-                    bids[price] = d
+                    book.update_bid(price, d["size"])
                 else:
-                    asks[price] = d
+                    book.update_ask(price, d["size"])
 
         # Calculate 1-5 bid/ask depth
-        bid_keys = list(bids.keys())
-        bid_keys.sort(reverse=True)
-
-        ask_keys = list(asks.keys())
-        ask_keys.sort()
-
-        for i in range(5):
-            n = i + 1
-
-            bid_price = bid_keys[i]
-            bid_data = bids[bid_price]
-            ask_price = ask_keys[i]
-            ask_data = asks[ask_price]
-
-            setattr(tick, f"bid_price_{n}", bid_price)
-            setattr(tick, f"bid_volume_{n}", bid_data["size"])
-            setattr(tick, f"ask_price_{n}", ask_price)
-            setattr(tick, f"ask_volume_{n}", ask_data["size"])
+        book.update_tick(tick)
 
         local_dt = datetime.fromtimestamp(timestamp / 1_000_000)
         tick.datetime = local_dt.astimezone(UTC_TZ)
@@ -6,7 +6,6 @@ import re
 import urllib
 import base64
 import json
-import zlib
 import hashlib
 import hmac
 import sys
@@ -17,7 +16,7 @@ from typing import Sequence
 
 from vnpy.event import Event
 from vnpy.api.rest import RestClient, Request
-from vnpy.api.websocket import WebsocketClient
+from vnpy.api.websocket import WebsocketClient, ZlibJsonDecoder, WBITS_GZIP
 from vnpy.trader.constant import (
     Direction,
     Offset,
@@ -699,6 +698,7 @@ class HbdmWebsocketApiBase(WebsocketClient):
     def __init__(self, gateway):
         """"""
         super(HbdmWebsocketApiBase, self).__init__()
+        self.decoder = ZlibJsonDecoder(WBITS_GZIP)
 
         self.gateway = gateway
         self.gateway_name = gateway.gateway_name
@@ -744,11 +744,6 @@ class HbdmWebsocketApiBase(WebsocketClient):
         """"""
         pass
 
-    @staticmethod
-    def unpack_data(data):
-        """"""
-        return json.loads(zlib.decompress(data, 31))
-
     def on_packet(self, packet):
         """"""
         if "ping" in packet:
@@ -6,7 +6,6 @@ import re
 import urllib
 import base64
 import json
-import zlib
 import hashlib
 import hmac
 import sys
@@ -15,7 +14,7 @@ from datetime import datetime
 
 from vnpy.event import Event
 from vnpy.api.rest import RestClient, Request
-from vnpy.api.websocket import WebsocketClient
+from vnpy.api.websocket import WebsocketClient, ZlibJsonDecoder, WBITS_GZIP
 from vnpy.trader.constant import (
     Direction,
     Exchange,
@@ -433,6 +432,8 @@ class HuobiRestApi(RestClient):
         cancel_request = request.extra
         local_orderid = cancel_request.orderid
         order = self.order_manager.get_order_with_local_orderid(local_orderid)
+        if not order:
+            return
 
         if self.check_error(data, "撤单"):
             order.status = Status.REJECTED
@@ -473,6 +474,7 @@ class HuobiWebsocketApiBase(WebsocketClient):
     def __init__(self, gateway):
         """"""
         super().__init__()
+        self.decoder = ZlibJsonDecoder(WBITS_GZIP)
 
         self.gateway = gateway
         self.gateway_name = gateway.gateway_name
@@ -511,11 +513,6 @@ class HuobiWebsocketApiBase(WebsocketClient):
         """"""
         pass
 
-    @staticmethod
-    def unpack_data(data):
-        """"""
-        return json.loads(zlib.decompress(data, 31))
-
     def on_packet(self, packet):
         """"""
         if "ping" in packet:
@@ -7,7 +7,6 @@ import sys
 import time
 import json
 import base64
-import zlib
 from copy import copy
 from datetime import datetime, timedelta
 from threading import Lock
@@ -15,8 +14,13 @@ from urllib.parse import urlencode
 
 from requests import ConnectionError
 
-from vnpy.api.rest import Request, RestClient
-from vnpy.api.websocket import WebsocketClient
+from vnpy.api.rest import AsyncRestClient, Request, RestClient
+from vnpy.api.websocket import (
+    AsyncWebsocketClient,
+    WebsocketClient,
+    ZlibJsonDecoder,
+    WBITS_DEFLATE
+)
 from vnpy.trader.constant import (
     Direction,
     Exchange,
@@ -90,6 +94,7 @@ class OkexGateway(BaseGateway):
         "会话数": 3,
         "代理地址": "",
         "代理端口": "",
+        "网络引擎": ["THREAD", "ASYNC"],
     }
 
     exchanges = [Exchange.OKEX]
@@ -111,12 +116,19 @@ class OkexGateway(BaseGateway):
         session_number = setting["会话数"]
         proxy_host = setting["代理地址"]
         proxy_port = setting["代理端口"]
+        engine = setting["网络引擎"]
 
         if proxy_port.isdigit():
             proxy_port = int(proxy_port)
         else:
             proxy_port = 0
 
+        # Requests and websocket data are processed by asyncio event loop
+        # if enabled.
+        if engine == "ASYNC":
+            self.rest_api = OkexAsyncRestApi(self)
+            self.ws_api = OkexAsyncWebsocketApi(self)
+
         self.rest_api.connect(key, secret, passphrase,
                               session_number, proxy_host, proxy_port)
         self.ws_api.connect(key, secret, passphrase, proxy_host, proxy_port)
@@ -539,12 +551,20 @@ class OkexRestApi(RestClient):
         return history
 
 
+class OkexAsyncRestApi(OkexRestApi, AsyncRestClient):
+    """
+    OKEX REST API with requests sent by asyncio event loop.
+    """
+    pass
+
+
 class OkexWebsocketApi(WebsocketClient):
     """"""
 
     def __init__(self, gateway):
         """"""
         super(OkexWebsocketApi, self).__init__()
+        self.decoder = ZlibJsonDecoder(WBITS_DEFLATE)
         self.ping_interval = 20     # OKEX use 30 seconds for ping
 
         self.gateway = gateway
@@ -578,10 +598,6 @@ class OkexWebsocketApi(WebsocketClient):
         self.init(WEBSOCKET_HOST, proxy_host, proxy_port)
         # self.start()
 
-    def unpack_data(self, data):
-        """"""
-        return json.loads(zlib.decompress(data, -zlib.MAX_WBITS))
-
     def subscribe(self, req: SubscribeRequest):
         """
         Subscribe to tick data upate.
@@ -803,6 +819,13 @@ class OkexWebsocketApi(WebsocketClient):
         self.gateway.on_account(copy(account))
 
 
+class OkexAsyncWebsocketApi(OkexWebsocketApi, AsyncWebsocketClient):
+    """
+    OKEX websocket API running in shared asyncio event loop.
+    """
+    pass
+
+
 def generate_signature(msg: str, secret_key: str):
     """OKEX V3 signature"""
     return base64.b64encode(hmac.new(secret_key, msg.encode(), hashlib.sha256).digest())
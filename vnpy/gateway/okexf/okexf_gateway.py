@@ -8,7 +8,6 @@ import sys
 import time
 import json
 import base64
-import zlib
 from copy import copy
 from datetime import datetime, timedelta
 from threading import Lock
@@ -17,7 +16,7 @@ from urllib.parse import urlencode
 from requests import ConnectionError
 
 from vnpy.api.rest import Request, RestClient
-from vnpy.api.websocket import WebsocketClient
+from vnpy.api.websocket import WebsocketClient, ZlibJsonDecoder, WBITS_DEFLATE
 from vnpy.trader.constant import (
     Direction,
     Exchange,
@@ -597,6 +596,7 @@ class OkexfWebsocketApi(WebsocketClient):
     def __init__(self, gateway):
         """"""
         super(OkexfWebsocketApi, self).__init__()
+        self.decoder = ZlibJsonDecoder(WBITS_DEFLATE)
         self.ping_interval = 20     # OKEX use 30 seconds for ping
 
         self.gateway = gateway
@@ -629,10 +629,6 @@ class OkexfWebsocketApi(WebsocketClient):
 
         self.init(WEBSOCKET_HOST, proxy_host, proxy_port)
 
-    def unpack_data(self, data):
-        """"""
-        return json.loads(zlib.decompress(data, -zlib.MAX_WBITS))
-
     def subscribe(self, req: SubscribeRequest):
         """
         Subscribe to tick data upate.
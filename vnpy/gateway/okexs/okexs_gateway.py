@@ -8,7 +8,6 @@ import hmac
 import json
 import sys
 import time
-import zlib
 from copy import copy
 from datetime import datetime, timezone
 from threading import Lock
@@ -17,7 +16,7 @@ from urllib.parse import urlencode
 from requests import ConnectionError
 
 from vnpy.api.rest import Request, RestClient
-from vnpy.api.websocket import WebsocketClient
+from vnpy.api.websocket import WebsocketClient, ZlibJsonDecoder, WBITS_DEFLATE
 from vnpy.trader.constant import (Direction, Exchange, Interval, Offset, OrderType, Product, Status)
 from vnpy.trader.gateway import BaseGateway
 from vnpy.trader.object import (AccountData, BarData, CancelRequest, ContractData, HistoryRequest,
@@ -536,6 +535,7 @@ class OkexsWebsocketApi(WebsocketClient):
     def __init__(self, gateway):
         """"""
         super(OkexsWebsocketApi, self).__init__()
+        self.decoder = ZlibJsonDecoder(WBITS_DEFLATE)
         self.ping_interval = 20  # OKEX use 30 seconds for ping
 
         self.gateway = gateway
@@ -568,10 +568,6 @@ class OkexsWebsocketApi(WebsocketClient):
 
         self.init(WEBSOCKET_HOST, proxy_host, proxy_port)
 
-    def unpack_data(self, data):
-        """"""
-        return json.loads(zlib.decompress(data, -zlib.MAX_WBITS))
-
     def subscribe(self, req: SubscribeRequest):
         """
         Subscribe to tick data upate.
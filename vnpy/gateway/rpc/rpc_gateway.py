@@ -1,6 +1,17 @@
 from vnpy.event import Event
-from vnpy.rpc import RpcClient
+from vnpy.rpc import RemoteException, RpcClient
+from vnpy.trader import codec
+from vnpy.trader.event import (
+    EVENT_TICK,
+    EVENT_ORDER,
+    EVENT_TRADE,
+    EVENT_POSITION,
+    EVENT_ACCOUNT,
+    EVENT_CONTRACT,
+    EVENT_LOG
+)
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.utility import get_file_path
 from vnpy.trader.object import (
     SubscribeRequest,
     CancelRequest,
@@ -9,6 +20,10 @@ from vnpy.trader.object import (
 from vnpy.trader.constant import Exchange
 
 
+SNAPSHOT_TIMEOUT = 10000    # Timeout of snapshot chunk request in milliseconds
+CONTRACT_CACHE_FILENAME = "rpc_contract_cache.dat"
+
+
 class RpcGateway(BaseGateway):
     """
     VN Trader Gateway for RPC service.
@@ -26,16 +41,28 @@ class RpcGateway(BaseGateway):
         super().__init__(event_engine, "RPC")
 
         self.symbol_gateway_map = {}
+        self.req_address = ""
 
-        self.client = RpcClient()
+        self.client = RpcClient(codec)
         self.client.callback = self.client_callback
 
     def connect(self, setting: dict):
         """"""
         req_address = setting["主动请求地址"]
         pub_address = setting["推送订阅地址"]
+        self.req_address = req_address
+
+        # Tick data is only subscribed when requested by subscribe
+        for topic in [
+            EVENT_ORDER,
+            EVENT_TRADE,
+            EVENT_POSITION,
+            EVENT_ACCOUNT,
+            EVENT_CONTRACT,
+            EVENT_LOG
+        ]:
+            self.client.subscribe_topic(topic)
 
-        self.client.subscribe_topic("")
         self.client.start(req_address, pub_address)
 
         self.write_log("服务器连接成功，开始初始化查询")
@@ -44,6 +71,8 @@ class RpcGateway(BaseGateway):
 
     def subscribe(self, req: SubscribeRequest):
         """"""
+        self.client.subscribe_topic(EVENT_TICK + req.vt_symbol)
+
         gateway_name = self.symbol_gateway_map.get(req.vt_symbol, "")
         self.client.subscribe(req, gateway_name)
 
@@ -66,38 +95,133 @@ class RpcGateway(BaseGateway):
         pass
 
     def query_all(self):
-        """"""
-        contracts = self.client.get_all_contracts()
+        """
+        Query snapshot of all data, with contracts downloaded in chunks
+        only if contract version of server is different from local cache.
+        """
+        cache = self.load_contract_cache()
+        cache_version = cache.get("contract_version", "")
+
+        for _ in range(3):
+            # First chunk is requested with default chunk size of server
+            snapshot = self.client.get_snapshot(cache_version, 0)
+            contract_version = snapshot["contract_version"]
+
+            if contract_version == cache_version:
+                contracts = cache["contracts"]
+                break
+
+            contracts = self.query_contract_chunks(snapshot, cache_version)
+            if contracts is not None:
+                self.save_contract_cache(contract_version, contracts)
+                break
+        else:
+            self.write_log("合约信息查询失败，请检查服务器连接")
+            return
+
         for contract in contracts:
             self.symbol_gateway_map[contract.vt_symbol] = contract.gateway_name
             contract.gateway_name = self.gateway_name
             self.on_contract(contract)
         self.write_log("合约信息查询成功")
 
-        accounts = self.client.get_all_accounts()
-        for account in accounts:
+        for account in snapshot["accounts"]:
             account.gateway_name = self.gateway_name
             self.on_account(account)
         self.write_log("资金信息查询成功")
 
-        positions = self.client.get_all_positions()
-        for position in positions:
+        for position in snapshot["positions"]:
             position.gateway_name = self.gateway_name
             self.on_position(position)
         self.write_log("持仓信息查询成功")
 
-        orders = self.client.get_all_orders()
-        for order in orders:
+        for order in snapshot["orders"]:
             order.gateway_name = self.gateway_name
             self.on_order(order)
         self.write_log("委托信息查询成功")
 
-        trades = self.client.get_all_trades()
-        for trade in trades:
+        for trade in snapshot["trades"]:
             trade.gateway_name = self.gateway_name
             self.on_trade(trade)
         self.write_log("成交信息查询成功")
 
+    def query_contract_chunks(self, snapshot: dict, cache_version: str):
+        """
+        Request all remaining chunks of contracts at once after the first
+        one. Chunk not received in time is requested again alone. Return
+        None if contracts changed or chunk failed during download.
+        """
+        contract_version = snapshot["contract_version"]
+        contracts = snapshot["contracts"]
+        size = snapshot["chunk_size"]
+
+        starts = range(size, snapshot["contract_count"], size)
+        futures = [
+            self.client.submit(
+                "get_snapshot",
+                cache_version,
+                start,
+                size,
+                timeout=SNAPSHOT_TIMEOUT
+            )
+            for start in starts
+        ]
+
+        for start, future in zip(starts, futures):
+            try:
+                chunk = future.result()
+            except RemoteException:
+                try:
+                    chunk = self.client.get_snapshot(
+                        cache_version,
+                        start,
+                        size,
+                        timeout=SNAPSHOT_TIMEOUT
+                    )
+                except RemoteException:
+                    self.write_log(f"合约信息分块查询失败，起始位置：{start}")
+                    return None
+
+            if chunk["contract_version"] != contract_version:
+                return None
+
+            contracts.extend(chunk["contracts"])
+
+        return contracts
+
+    def load_contract_cache(self) -> dict:
+        """
+        Load contracts cached from the same server last time.
+        """
+        path = get_file_path(CONTRACT_CACHE_FILENAME)
+        if not path.exists():
+            return {}
+
+        try:
+            with open(path, "rb") as f:
+                cache = codec.loads(f.read())
+        except Exception:  # noqa
+            return {}
+
+        if cache.get("req_address", "") != self.req_address:
+            return {}
+
+        return cache
+
+    def save_contract_cache(self, contract_version: str, contracts: list):
+        """
+        Save contracts with version into cache file.
+        """
+        cache = {
+            "req_address": self.req_address,
+            "contract_version": contract_version,
+            "contracts": contracts
+        }
+
+        path = get_file_path(CONTRACT_CACHE_FILENAME)
+        with open(path, "wb") as f:
+            f.write(codec.dumps(cache))
+
     def close(self):
         """"""
         self.client.stop()
@@ -111,6 +235,10 @@ class RpcGateway(BaseGateway):
 
         data = event.data
 
+        # New contract pushed after snapshot
+        if event.type == EVENT_CONTRACT:
+            self.symbol_gateway_map[data.vt_symbol] = data.gateway_name
+
         if hasattr(data, "gateway_name"):
             data.gateway_name = self.gateway_name
 
@@ -1,10 +1,16 @@
-from zmq.backend.cython.constants import NOBLOCK
+import asyncio
+import heapq
+import pickle
 import signal
 import threading
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Any, Callable
+from itertools import count
+from time import monotonic
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Set, Tuple
 
 import zmq
 
@@ -20,6 +26,12 @@ KEEP_ALIVE_TOPIC = '_keep_alive'
 KEEP_ALIVE_INTERVAL = timedelta(seconds=1)
 KEEP_ALIVE_TOLERANCE = timedelta(seconds=3)
 
+# Timeout of polling sockets in server and client threads, in milliseconds
+POLL_INTERVAL = 1000
+
+# Default timeout of waiting for response of remote call, in milliseconds
+CALL_TIMEOUT = 30000
+
 
 class RemoteException(Exception):
     """
@@ -40,28 +52,50 @@ class RemoteException(Exception):
 
 
 class RpcServer:
-    """"""
+    """
+    Requests are received with a ROUTER socket and replied with the client
+    identity and request id frames received, so that multiple requests can
+    be in flight at the same time. Functions are executed in server thread
+    by default, or in a pool of worker_count threads if specified.
+
+    Data is published with topic in a separate frame, so that clients
+    only receive topics subscribed, and serialized with the dumps
+    function of serializer, pickle by default.
+    """
 
-    def __init__(self):
+    def __init__(self, serializer: ModuleType = pickle, worker_count: int = 0):
         """
         Constructor
         """
+        self.__serializer = serializer
+
         # Save functions dict: key is fuction name, value is fuction object
         self.__functions = {}
 
-        # Zmq port related
+        # Zmq port related, sockets are created when server started and
+        # closed after server thread exited.
         self.__context = zmq.Context()
 
-        # Reply socket (Request–reply pattern)
-        self.__socket_rep = self.__context.socket(zmq.REP)
+        # Router socket (Request–reply pattern)
+        self.__socket_router = None
 
         # Publish socket (Publish–subscribe pattern)
-        self.__socket_pub = self.__context.socket(zmq.PUB)
+        self.__socket_pub = None
+
+        # Pull socket for receiving replies from worker threads
+        self.__reply_address = f"inproc://rpc_server_reply_{id(self)}"
+        self.__socket_reply = None
 
         # Worker thread related
         self.__active = False                               # RpcServer status
         self.__thread = None                                # RpcServer thread
 
+        self.__worker_count = worker_count
+        self.__executor = None
+        self.__local = threading.local()
+        self.__worker_sockets: List[zmq.Socket] = []
+        self.__lock = threading.Lock()
+
         self._register(KEEP_ALIVE_TOPIC, lambda n: n)
 
     def is_active(self):
@@ -75,10 +109,20 @@ class RpcServer:
         if self.__active:
             return
 
-        # Bind socket address
-        self.__socket_rep.bind(rep_address)
+        # Create sockets and bind socket address
+        self.__socket_router = self.__context.socket(zmq.ROUTER)
+        self.__socket_router.bind(rep_address)
+
+        self.__socket_pub = self.__context.socket(zmq.PUB)
         self.__socket_pub.bind(pub_address)
 
+        self.__socket_reply = self.__context.socket(zmq.PULL)
+        self.__socket_reply.bind(self.__reply_address)
+
+        # Start worker threads
+        if self.__worker_count:
+            self.__executor = ThreadPoolExecutor(self.__worker_count)
+
         # Start RpcServer status
         self.__active = True
 
@@ -93,57 +137,130 @@ class RpcServer:
         if not self.__active:
             return
 
-        # Stop RpcServer status
+        # Stop RpcServer status, socket address is unbound by server
+        # thread when exit, since zmq socket is not thread safe.
         self.__active = False
 
-        # Unbind socket address
-        self.__socket_pub.unbind(self.__socket_pub.LAST_ENDPOINT)
-        self.__socket_rep.unbind(self.__socket_rep.LAST_ENDPOINT)
-
     def join(self):
         # Wait for RpcServer thread to exit
         if self.__thread and self.__thread.is_alive():
             self.__thread.join()
         self.__thread = None
 
+        if self.__executor:
+            self.__executor.shutdown()
+            self.__executor = None
+
+        # Close push sockets of worker threads, which have all exited
+        with self.__lock:
+            for socket in self.__worker_sockets:
+                socket.close()
+            self.__worker_sockets.clear()
+
+        # Close sockets of server thread
+        if self.__socket_router:
+            self.__socket_router.close()
+            self.__socket_pub.close()
+            self.__socket_reply.close()
+
+            self.__socket_router = None
+            self.__socket_pub = None
+            self.__socket_reply = None
+
     def run(self):
         """
         Run RpcServer functions
         """
+        poller = zmq.Poller()
+        poller.register(self.__socket_router, zmq.POLLIN)
+
+        # Replies are only sent back from worker threads if enabled
+        if self.__executor:
+            poller.register(self.__socket_reply, zmq.POLLIN)
+
         start = datetime.utcnow()
         while self.__active:
-            # Use poll to wait event arrival, waiting time is 1 second (1000 milliseconds)
             cur = datetime.utcnow()
             delta = cur - start
 
             if delta >= KEEP_ALIVE_INTERVAL:
                 self.publish(KEEP_ALIVE_TOPIC, cur)
+                start = cur
 
-            if not self.__socket_rep.poll(1000):
-                continue
+            # Use poll to wait event arrival, waiting time is 1 second (1000 milliseconds)
+            events = dict(poller.poll(POLL_INTERVAL))
+
+            # Receive request from Router socket, which starts with client
+            # identity and ends with request data, with optional request
+            # id frame in the middle.
+            if self.__socket_router in events:
+                msg = self.__socket_router.recv_multipart()
+
+                if self.__executor:
+                    self.__executor.submit(self.process_request_in_worker, msg)
+                else:
+                    msg[-1] = self.process_request(msg[-1])
+                    self.__socket_router.send_multipart(msg)
+
+            # Send replies of requests processed by worker threads
+            if self.__socket_reply in events:
+                while True:
+                    try:
+                        msg = self.__socket_reply.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self.__socket_router.send_multipart(msg)
 
-            # Receive request data from Reply socket
-            req = self.__socket_rep.recv_pyobj()
+        # Unbind socket address
+        self.__socket_pub.unbind(self.__socket_pub.LAST_ENDPOINT)
+        self.__socket_router.unbind(self.__socket_router.LAST_ENDPOINT)
 
-            # Get function name and parameters
-            name, args, kwargs = req
+    def process_request(self, buf: bytes) -> bytes:
+        """
+        Execute function of request and return serialized response.
+        """
+        # Get function name and parameters
+        name, args, kwargs = pickle.loads(buf)
 
-            # Try to get and execute callable function object; capture exception information if it fails
-            try:
-                func = self.__functions[name]
-                r = func(*args, **kwargs)
-                rep = [True, r]
-            except Exception as e:  # noqa
-                rep = [False, traceback.format_exc()]
+        # Try to get and execute callable function object; capture exception information if it fails
+        try:
+            func = self.__functions[name]
+            r = func(*args, **kwargs)
+            rep = [True, r]
+        except Exception as e:  # noqa
+            rep = [False, traceback.format_exc()]
 
-            # send callable response by Reply socket
-            self.__socket_rep.send_pyobj(rep)
+        return pickle.dumps(rep)
+
+    def process_request_in_worker(self, msg: List[bytes]):
+        """
+        Execute request in worker thread, and send response back to
+        server thread with the push socket of the worker thread.
+        """
+        msg[-1] = self.process_request(msg[-1])
+
+        socket = getattr(self.__local, "socket", None)
+        if not socket or socket.closed:
+            socket = self.__context.socket(zmq.PUSH)
+            socket.connect(self.__reply_address)
+            self.__local.socket = socket
+
+            with self.__lock:
+                self.__worker_sockets.append(socket)
+
+        socket.send_multipart(msg)
 
     def publish(self, topic: str, data: Any):
         """
         Publish data
         """
-        self.__socket_pub.send_pyobj([topic, data])
+        socket = self.__socket_pub
+        if not socket:
+            return
+
+        socket.send_multipart(
+            [topic.encode(), self.__serializer.dumps(data)]
+        )
 
     def register(self, func: Callable):
         """
@@ -159,24 +276,63 @@ class RpcServer:
 
 
 class RpcClient:
-    """"""
+    """
+    Remote functions called directly as methods of client are sent with
+    a DEALER socket of the calling thread, so that calls from different
+    threads can be in flight at the same time without waiting for each
+    other.
+
+    Functions can also be called with submit/call_async to get a future
+    of the result, with requests sent by client thread and matched with
+    responses by request id, so that any number of calls can be in flight.
+
+    Both kinds of call accept a timeout keyword argument in milliseconds
+    (CALL_TIMEOUT by default), and RemoteException is raised if response
+    is not received in time.
+
+    Data published by server is deserialized with the loads function of
+    serializer, which should be the same as the one used by server.
+    """
 
-    def __init__(self):
+    def __init__(self, serializer: ModuleType = pickle):
         """Constructor"""
+        self.__serializer = serializer
+
         # zmq port related
         self.__context = zmq.Context()
 
-        # Request socket (Request–reply pattern)
-        self.__socket_req = self.__context.socket(zmq.REQ)
+        # Dealer socket (Request–reply pattern)
+        self.__socket_dealer = self.__context.socket(zmq.DEALER)
 
         # Subscribe socket (Publish–subscribe pattern)
         self.__socket_sub = self.__context.socket(zmq.SUB)
 
+        # Push/pull socket pair for passing requests from caller threads
+        # to client thread, since zmq socket is not thread safe.
+        request_address = f"inproc://rpc_client_request_{id(self)}"
+        self.__socket_request = self.__context.socket(zmq.PULL)
+        self.__socket_request.bind(request_address)
+        self.__socket_push = self.__context.socket(zmq.PUSH)
+        self.__socket_push.connect(request_address)
+
         # Worker thread relate, used to process data pushed from server
         self.__active = False  # RpcClient status
         self.__thread = None  # RpcClient thread
         self.__lock = threading.Lock()
 
+        # Dealer sockets of caller threads for synchronous call, sockets
+        # in use are closed by caller threads after client stopped.
+        self.__req_address = ""
+        self.__local = threading.local()
+        self.__thread_sockets: Set[zmq.Socket] = set()
+        self.__busy_sockets: Set[zmq.Socket] = set()
+
+        # Futures of requests waiting for response, and heap of their
+        # deadlines for checking timeout in client thread.
+        self.__req_count = count()
+        self.__futures: Dict[bytes, Future] = {}
+        self.__deadlines: List[Tuple[float, bytes]] = []
+
         self._last_received_ping: datetime = datetime.utcnow()
 
     @lru_cache(100)
@@ -187,13 +343,33 @@ class RpcClient:
 
         # Perform remote call task
         def dorpc(*args, **kwargs):
+            timeout = kwargs.pop("timeout", CALL_TIMEOUT)
+
             # Generate request
             req = [name, args, kwargs]
+            req_id = str(next(self.__req_count)).encode()
 
-            # Send request and wait for response
-            with self.__lock:
-                self.__socket_req.send_pyobj(req)
-                rep = self.__socket_req.recv_pyobj()
+            # Send request with dealer socket of current thread, and wait
+            # for response with the same request id.
+            socket = self._get_thread_socket()
+            deadline = monotonic() + timeout / 1000
+
+            try:
+                socket.send_multipart([req_id, pickle.dumps(req)])
+
+                while True:
+                    remaining = int((deadline - monotonic()) * 1000)
+                    if not socket.poll(max(remaining, 0)):
+                        raise RemoteException(f"Timeout of {timeout}ms reached for {req}")
+
+                    # Late response of expired call is discarded
+                    rep_id, buf = socket.recv_multipart()
+                    if rep_id == req_id:
+                        break
+            finally:
+                self._release_thread_socket(socket)
+
+            rep = pickle.loads(buf)
 
             # Return response if successed; Trigger exception if failed
             if rep[0]:
@@ -203,6 +379,73 @@ class RpcClient:
 
         return dorpc
 
+    def _get_thread_socket(self) -> zmq.Socket:
+        """
+        Get dealer socket of current thread for synchronous call.
+        """
+        with self.__lock:
+            if not self.__active:
+                raise RemoteException("RpcClient is not started")
+
+            socket = getattr(self.__local, "socket", None)
+
+            if not socket or socket.closed:
+                socket = self.__context.socket(zmq.DEALER)
+                socket.setsockopt(zmq.LINGER, 0)
+                socket.connect(self.__req_address)
+                self.__local.socket = socket
+                self.__thread_sockets.add(socket)
+
+            self.__busy_sockets.add(socket)
+
+        return socket
+
+    def _release_thread_socket(self, socket: zmq.Socket):
+        """
+        Release dealer socket after synchronous call, and close it if
+        client is stopped.
+        """
+        with self.__lock:
+            self.__busy_sockets.discard(socket)
+
+            if not self.__active:
+                self.__thread_sockets.discard(socket)
+                socket.close()
+
+    def submit(self, name: str, *args, **kwargs) -> Future:
+        """
+        Send request of calling remote function, and return a future
+        which will be set with result when response received.
+        """
+        timeout = kwargs.pop("timeout", CALL_TIMEOUT)
+
+        future = Future()
+
+        # Generate request
+        req = [name, args, kwargs]
+        buf = pickle.dumps(req)
+        deadline = monotonic() + timeout / 1000
+
+        # Push socket is closed by client thread after stopped
+        with self.__lock:
+            if not self.__active:
+                future.set_exception(RemoteException("RpcClient is not started"))
+                return future
+
+            req_id = str(next(self.__req_count)).encode()
+            self.__futures[req_id] = future
+            heapq.heappush(self.__deadlines, (deadline, req_id))
+            self.__socket_push.send_multipart([req_id, buf])
+
+        return future
+
+    def call_async(self, name: str, *args, **kwargs) -> asyncio.Future:
+        """
+        Call remote function in asyncio, the future returned should be
+        awaited in running event loop.
+        """
+        return asyncio.wrap_future(self.submit(name, *args, **kwargs))
+
     def start(self, req_address: str, sub_address: str):
         """
         Start RpcClient
@@ -211,8 +454,10 @@ class RpcClient:
             return
 
         # Connect zmq port
-        self.__socket_req.connect(req_address)
+        self.__req_address = req_address
+        self.__socket_dealer.connect(req_address)
         self.__socket_sub.connect(sub_address)
+        self.subscribe_topic(KEEP_ALIVE_TOPIC)
 
         # Start RpcClient status
         self.__active = True
@@ -225,17 +470,16 @@ class RpcClient:
 
     def stop(self):
         """
-        Stop RpcClient
+        Stop RpcClient, sockets are closed by client thread when exit,
+        except dealer sockets still waiting for response, which are
+        closed by caller threads when call returns.
         """
         if not self.__active:
             return
 
         # Stop RpcClient status
-        self.__active = False
-
-        # Close socket
-        self.__socket_req.close()
-        self.__socket_sub.close()
+        with self.__lock:
+            self.__active = False
 
     def join(self):
         # Wait for RpcClient thread to exit
@@ -247,20 +491,126 @@ class RpcClient:
         """
         Run RpcClient function
         """
-        pull_tolerance = int(KEEP_ALIVE_TOLERANCE.total_seconds() * 1000)
+        poller = zmq.Poller()
+        poller.register(self.__socket_sub, zmq.POLLIN)
+        poller.register(self.__socket_dealer, zmq.POLLIN)
+        poller.register(self.__socket_request, zmq.POLLIN)
+
+        pull_tolerance = KEEP_ALIVE_TOLERANCE.total_seconds()
+        last_received = monotonic()
+
         while self.__active:
-            if not self.__socket_sub.poll(pull_tolerance):
-                self._on_unexpected_disconnected()
-                continue
+            events = dict(poller.poll(self.get_poll_timeout()))
+
+            # Forward requests from caller threads to server, and set
+            # subscription options sent with empty request id.
+            if self.__socket_request in events:
+                while True:
+                    try:
+                        msg = self.__socket_request.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+
+                    if msg[0]:
+                        self.__socket_dealer.send_multipart(msg)
+                    else:
+                        _, option, topic = msg
+                        self.__socket_sub.setsockopt(int(option), topic)
+
+            # Receive response from dealer socket
+            if self.__socket_dealer in events:
+                while True:
+                    try:
+                        req_id, buf = self.__socket_dealer.recv_multipart(zmq.NOBLOCK)
+                    except zmq.Again:
+                        break
+                    self.on_response(req_id, buf)
 
             # Receive data from subscribe socket
-            topic, data = self.__socket_sub.recv_pyobj(flags=NOBLOCK)
+            if self.__socket_sub in events:
+                topic, buf = self.__socket_sub.recv_multipart()
+                topic = topic.decode()
+                data = self.__serializer.loads(buf)
+                last_received = monotonic()
+
+                if topic == KEEP_ALIVE_TOPIC:
+                    self._last_received_ping = data
+                else:
+                    # Process data by callable function
+                    self.callback(topic, data)
+            elif monotonic() - last_received > pull_tolerance:
+                self._on_unexpected_disconnected()
+                last_received = monotonic()
 
-            if topic == KEEP_ALIVE_TOPIC:
-                self._last_received_ping = data
-            else:
-                # Process data by callable function
-                self.callback(topic, data)
+            self.check_timeout()
+
+        # Requests still waiting will never get response
+        with self.__lock:
+            futures = list(self.__futures.values())
+            self.__futures.clear()
+            self.__deadlines.clear()
+
+            # Dealer sockets in use are closed by caller threads
+            for socket in self.__thread_sockets - self.__busy_sockets:
+                socket.close()
+            self.__thread_sockets &= self.__busy_sockets
+
+            # Push socket is used by caller threads with lock held
+            self.__socket_push.close()
+
+        for future in futures:
+            future.set_exception(RemoteException("RpcClient is stopped"))
+
+        # Close socket
+        self.__socket_dealer.close()
+        self.__socket_sub.close()
+        self.__socket_request.close()
+
+    def get_poll_timeout(self) -> int:
+        """
+        Get timeout of polling sockets, which ends before the deadline
+        of the earliest request.
+        """
+        with self.__lock:
+            if not self.__deadlines:
+                return POLL_INTERVAL
+            deadline = self.__deadlines[0][0]
+
+        timeout = int((deadline - monotonic()) * 1000) + 1
+        return min(max(timeout, 0), POLL_INTERVAL)
+
+    def check_timeout(self):
+        """
+        Set exception of requests which have not got response in time.
+        """
+        now = monotonic()
+        expired = []
+
+        with self.__lock:
+            while self.__deadlines and self.__deadlines[0][0] <= now:
+                _, req_id = heapq.heappop(self.__deadlines)
+                future = self.__futures.pop(req_id, None)
+                if future:
+                    expired.append(future)
+
+        for future in expired:
+            future.set_exception(RemoteException("Timeout reached for request"))
+
+    def on_response(self, req_id: bytes, buf: bytes):
+        """
+        Set result of request future with response.
+        """
+        with self.__lock:
+            future = self.__futures.pop(req_id, None)
+
+        if not future:
+            return
+
+        rep = pickle.loads(buf)
+        if rep[0]:
+            future.set_result(rep[1])
+        else:
+            future.set_exception(RemoteException(rep[1]))
 
     @staticmethod
     def _on_unexpected_disconnected():
@@ -277,4 +627,24 @@ class RpcClient:
         """
         Subscribe data
         """
-        self.__socket_sub.setsockopt_string(zmq.SUBSCRIBE, topic)
+        self._set_sub_option(zmq.SUBSCRIBE, topic)
+
+    def unsubscribe_topic(self, topic: str):
+        """
+        Unsubscribe data
+        """
+        self._set_sub_option(zmq.UNSUBSCRIBE, topic)
+
+    def _set_sub_option(self, option: int, topic: str):
+        """
+        Set option of subscribe socket, which is passed to client thread
+        if started, since zmq socket is not thread safe.
+        """
+        with self.__lock:
+            if self.__active and threading.current_thread() is not self.__thread:
+                self.__socket_push.send_multipart(
+                    [b"", str(option).encode(), topic.encode()]
+                )
+                return
+
+        self.__socket_sub.setsockopt_string(option, topic)
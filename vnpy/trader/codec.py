@@ -0,0 +1,142 @@
+"""
+Compact serialization of events and data objects based on msgpack, used
+for transferring data between processes.
+
+Events and data objects are packed as maps of attributes with class name
+under the CLASS_KEY, and enums as class name with value, so that they can
+be decoded by any version with the same class names. Objects not supported
+are packed with pickle.
+"""
+
+import pickle
+from dataclasses import MISSING, fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict
+
+import msgpack
+
+from vnpy.event import Event
+from . import constant, object as object_module
+
+
+CODE_PICKLE = 0
+CODE_ENUM = 1
+CODE_DATETIME = 2
+
+CLASS_KEY = "__class__"
+
+
+# Registered dataclasses by name and name by class
+OBJECT_CLASSES: Dict[str, type] = {}
+OBJECT_NAMES: Dict[type, str] = {}
+OBJECT_DEFAULTS: Dict[type, Dict[str, Any]] = {}
+
+# Packed ext data of registered enum members, and the reverse map
+ENUM_EXTS: Dict[Enum, msgpack.ExtType] = {}
+ENUM_MEMBERS: Dict[bytes, Enum] = {}
+
+
+def register_class(cls: type):
+    """
+    Register a dataclass or enum class with string values, to be packed
+    by its attributes or value instead of pickle.
+    """
+    if issubclass(cls, Enum):
+        for member in cls:
+            if not isinstance(member.value, str):
+                return
+
+        for member in cls:
+            buf = f"{cls.__name__}:{member.value}".encode()
+            ENUM_EXTS[member] = msgpack.ExtType(CODE_ENUM, buf)
+            ENUM_MEMBERS[buf] = member
+    elif is_dataclass(cls):
+        OBJECT_CLASSES[cls.__name__] = cls
+        OBJECT_NAMES[cls] = cls.__name__
+
+        # Defaults used for filling fields missing in packed data
+        OBJECT_DEFAULTS[cls] = {
+            f.name: f.default for f in fields(cls) if f.default is not MISSING
+        }
+
+
+def default(obj: Any) -> Any:
+    """
+    Convert objects not supported by msgpack into map or ext type.
+    """
+    cls = type(obj)
+
+    if cls in OBJECT_NAMES:
+        d = obj.__dict__.copy()
+        d[CLASS_KEY] = OBJECT_NAMES[cls]
+        return d
+    elif cls is datetime:
+        return msgpack.ExtType(CODE_DATETIME, obj.isoformat().encode())
+    elif isinstance(obj, Enum) and obj in ENUM_EXTS:
+        return ENUM_EXTS[obj]
+    elif cls is Event:
+        return {CLASS_KEY: "Event", "type": obj.type, "data": obj.data}
+
+    return msgpack.ExtType(CODE_PICKLE, pickle.dumps(obj))
+
+
+def object_hook(d: dict) -> Any:
+    """
+    Convert map with class name back into original object.
+    """
+    name = d.pop(CLASS_KEY, None)
+    if not name:
+        return d
+    elif name == "Event":
+        return Event(d["type"], d["data"])
+
+    cls = OBJECT_CLASSES[name]
+
+    obj = cls.__new__(cls)
+    obj.__dict__.update(OBJECT_DEFAULTS[cls])
+    obj.__dict__.update(d)
+    return obj
+
+
+def ext_hook(code: int, data: bytes) -> Any:
+    """
+    Convert ext type back into original object.
+    """
+    if code == CODE_ENUM:
+        return ENUM_MEMBERS[data]
+    elif code == CODE_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    elif code == CODE_PICKLE:
+        return pickle.loads(data)
+
+    return msgpack.ExtType(code, data)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Pack object into bytes.
+    """
+    return msgpack.packb(obj, default=default, use_bin_type=True)
+
+
+def loads(data: bytes) -> Any:
+    """
+    Unpack object from bytes.
+    """
+    return msgpack.unpackb(
+        data,
+        object_hook=object_hook,
+        ext_hook=ext_hook,
+        raw=False,
+        strict_map_key=False
+    )
+
+
+for _module in [constant, object_module]:
+    for _cls in list(vars(_module).values()):
+        if (
+            isinstance(_cls, type)
+            and _cls.__module__ == _module.__name__
+        ):
+            register_class(_cls)
@@ -1,5 +1,7 @@
 """"""
+from collections import defaultdict
 from copy import copy
+from typing import Dict, Optional, Tuple
 
 from vnpy.trader.engine import MainEngine
 from vnpy.trader.object import (
@@ -12,6 +14,9 @@ from vnpy.trader.object import (
 from vnpy.trader.constant import (Direction, Offset, Exchange)
 
 
+CLOSE_OFFSETS = {Offset.CLOSE, Offset.CLOSETODAY, Offset.CLOSEYESTERDAY}
+
+
 class OffsetConverter:
     """"""
 
@@ -91,14 +96,25 @@ class OffsetConverter:
 
 
 class PositionHolding:
-    """"""
+    """
+    Frozen volumes are updated incrementally with change of active close
+    orders, instead of walking through all active orders every time.
+    """
 
     def __init__(self, contract: ContractData):
         """"""
         self.vt_symbol = contract.vt_symbol
         self.exchange = contract.exchange
 
-        self.active_orders = {}
+        # Direction, offset and frozen volume of active close orders
+        self.frozen_orders: Dict[str, Tuple[Direction, Offset, float]] = {}
+
+        # Sum and count of frozen volume by direction and offset
+        self.frozen_totals: Dict[Tuple[Direction, Offset], float] = defaultdict(float)
+        self.frozen_counts: Dict[Tuple[Direction, Offset], int] = defaultdict(int)
+
+        # Count of orders with negative frozen volume by direction
+        self.negative_counts: Dict[Direction, int] = defaultdict(int)
 
         self.long_pos = 0
         self.long_yd = 0
@@ -130,19 +146,58 @@ class PositionHolding:
     def update_order(self, order: OrderData):
         """"""
         if order.is_active():
-            self.active_orders[order.vt_orderid] = order
+            frozen = order.volume - order.traded
         else:
-            if order.vt_orderid in self.active_orders:
-                self.active_orders.pop(order.vt_orderid)
+            frozen = None
 
+        self.update_order_frozen(
+            order.vt_orderid, order.direction, order.offset, frozen
+        )
         self.calculate_frozen()
 
     def update_order_request(self, req: OrderRequest, vt_orderid: str):
         """"""
-        gateway_name, orderid = vt_orderid.split(".")
+        self.update_order_frozen(vt_orderid, req.direction, req.offset, req.volume)
+        self.calculate_frozen()
+
+    def update_order_frozen(
+        self,
+        vt_orderid: str,
+        direction: Direction,
+        offset: Offset,
+        frozen: Optional[float]
+    ):
+        """
+        Update frozen volume of order, None for inactive order.
+        """
+        old = self.frozen_orders.get(vt_orderid, None)
+        if old:
+            self.add_frozen(*old, -1)
+
+        # Position open orders are ignored
+        if frozen is None or offset not in CLOSE_OFFSETS:
+            if old:
+                self.frozen_orders.pop(vt_orderid)
+            return
+
+        self.frozen_orders[vt_orderid] = (direction, offset, frozen)
+        self.add_frozen(direction, offset, frozen, 1)
 
-        order = req.create_order_data(orderid, gateway_name)
-        self.update_order(order)
+    def add_frozen(self, direction: Direction, offset: Offset, frozen: float, sign: int):
+        """
+        Add frozen volume of order into totals, or remove it if sign is -1.
+        """
+        key = (direction, offset)
+        self.frozen_counts[key] += sign
+
+        # Reset total to avoid rounding error left when no order
+        if self.frozen_counts[key]:
+            self.frozen_totals[key] += frozen * sign
+        else:
+            self.frozen_totals[key] = 0
+
+        if frozen < 0:
+            self.negative_counts[direction] += sign
 
     def update_trade(self, trade: TradeData):
         """"""
@@ -184,48 +239,67 @@ class PositionHolding:
 
     def calculate_frozen(self):
         """"""
-        self.long_pos_frozen = 0
-        self.long_yd_frozen = 0
-        self.long_td_frozen = 0
+        self.short_td_frozen, self.short_yd_frozen = self.calculate_direction_frozen(
+            Direction.LONG, self.short_td
+        )
+        self.long_td_frozen, self.long_yd_frozen = self.calculate_direction_frozen(
+            Direction.SHORT, self.long_td
+        )
 
-        self.short_pos_frozen = 0
-        self.short_yd_frozen = 0
-        self.short_td_frozen = 0
+        self.long_pos_frozen = self.long_td_frozen + self.long_yd_frozen
+        self.short_pos_frozen = self.short_td_frozen + self.short_yd_frozen
+
+    def calculate_direction_frozen(self, direction: Direction, td: float):
+        """
+        Calculate frozen td and yd volume of opposite position, which is
+        closed by active orders of the direction.
+
+        Volume of close orders is frozen from td position first, and the
+        part exceeding td position is frozen from yd position. The result
+        depends on sequence of orders only if both close and close today
+        orders are active, then orders are walked through in sequence.
+        """
+        td_frozen = self.frozen_totals[(direction, Offset.CLOSETODAY)]
+        yd_frozen = self.frozen_totals[(direction, Offset.CLOSEYESTERDAY)]
 
-        for order in self.active_orders.values():
-            # Ignore position open orders
-            if order.offset == Offset.OPEN:
+        if not self.frozen_counts[(direction, Offset.CLOSE)]:
+            return td_frozen, yd_frozen
+
+        if (
+            self.frozen_counts[(direction, Offset.CLOSETODAY)]
+            or self.negative_counts[direction]
+        ):
+            return self.walk_direction_frozen(direction, td)
+
+        close_frozen = self.frozen_totals[(direction, Offset.CLOSE)]
+        if close_frozen > td:
+            return td, yd_frozen + close_frozen - td
+        else:
+            return close_frozen, yd_frozen
+
+    def walk_direction_frozen(self, direction: Direction, td: float):
+        """
+        Calculate frozen volume by walking through active orders.
+        """
+        td_frozen = 0
+        yd_frozen = 0
+
+        for order_direction, offset, frozen in self.frozen_orders.values():
+            if order_direction != direction:
                 continue
 
-            frozen = order.volume - order.traded
+            if offset == Offset.CLOSETODAY:
+                td_frozen += frozen
+            elif offset == Offset.CLOSEYESTERDAY:
+                yd_frozen += frozen
+            elif offset == Offset.CLOSE:
+                td_frozen += frozen
+
+                if td_frozen > td:
+                    yd_frozen += td_frozen - td
+                    td_frozen = td
 
-            if order.direction == Direction.LONG:
-                if order.offset == Offset.CLOSETODAY:
-                    self.short_td_frozen += frozen
-                elif order.offset == Offset.CLOSEYESTERDAY:
-                    self.short_yd_frozen += frozen
-                elif order.offset == Offset.CLOSE:
-                    self.short_td_frozen += frozen
-
-                    if self.short_td_frozen > self.short_td:
-                        self.short_yd_frozen += (self.short_td_frozen
-                                                 - self.short_td)
-                        self.short_td_frozen = self.short_td
-            elif order.direction == Direction.SHORT:
-                if order.offset == Offset.CLOSETODAY:
-                    self.long_td_frozen += frozen
-                elif order.offset == Offset.CLOSEYESTERDAY:
-                    self.long_yd_frozen += frozen
-                elif order.offset == Offset.CLOSE:
-                    self.long_td_frozen += frozen
-
-                    if self.long_td_frozen > self.long_td:
-                        self.long_yd_frozen += (self.long_td_frozen
-                                                - self.long_td)
-                        self.long_td_frozen = self.long_td
-
-            self.long_pos_frozen = self.long_td_frozen + self.long_yd_frozen
-            self.short_pos_frozen = self.short_td_frozen + self.short_yd_frozen
+        return td_frozen, yd_frozen
 
     def convert_order_request_shfe(self, req: OrderRequest):
         """"""
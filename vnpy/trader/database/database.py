@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Sequence, TYPE_CHECKING
+from typing import Iterator, Optional, Sequence, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from vnpy.trader.constant import Interval, Exchange  # noqa
@@ -38,6 +38,33 @@ class BaseDatabaseManager(ABC):
     ) -> Sequence["TickData"]:
         pass
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval",
+        start: datetime,
+        end: datetime
+    ) -> Iterator["BarData"]:
+        """
+        Iterate bar data in datetime order. Database manager should
+        override it to fetch data in chunks, instead of loading all
+        data into memory at once.
+        """
+        return iter(self.load_bar_data(symbol, exchange, interval, start, end))
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        start: datetime,
+        end: datetime
+    ) -> Iterator["TickData"]:
+        """
+        Iterate tick data in datetime order.
+        """
+        return iter(self.load_tick_data(symbol, exchange, start, end))
+
     @abstractmethod
     def save_bar_data(
         self,
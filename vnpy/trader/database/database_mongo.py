@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
 from mongoengine import DateTimeField, Document, FloatField, StringField, connect
 
@@ -9,6 +9,40 @@ from vnpy.trader.object import BarData, TickData
 from .database import BaseDatabaseManager, Driver
 
 
+# Number of documents fetched by each batch of cursor when iterating data
+FETCH_BATCH_SIZE = 10_000
+
+BAR_FIELD_NAMES = [
+    "datetime",
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+TICK_FIELD_NAMES = [
+    "datetime",
+    "name",
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+] + [
+    f"{side}_{field}_{level}"
+    for field in ("price", "volume")
+    for side in ("bid", "ask")
+    for level in range(1, 6)
+]
+
+
 def init(_: Driver, settings: dict):
     database = settings["database"]
     host = settings["host"]
@@ -270,27 +304,71 @@ class MongoManager(BaseDatabaseManager):
         start: datetime,
         end: datetime,
     ) -> Sequence[BarData]:
-        s = DbBarData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            interval=interval.value,
-            datetime__gte=start,
-            datetime__lte=end,
-        )
-        data = [db_bar.to_bar() for db_bar in s]
-        return data
+        return list(self.iter_bar_data(symbol, exchange, interval, start, end))
 
     def load_tick_data(
         self, symbol: str, exchange: Exchange, start: datetime, end: datetime
     ) -> Sequence[TickData]:
-        s = DbTickData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            datetime__gte=start,
-            datetime__lte=end,
+        return list(self.iter_tick_data(symbol, exchange, start, end))
+
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Iterator[BarData]:
+        s = (
+            DbBarData.objects(
+                symbol=symbol,
+                exchange=exchange.value,
+                interval=interval.value,
+                datetime__gte=start,
+                datetime__lte=end,
+            )
+            .order_by("+datetime")
+            .only(*BAR_FIELD_NAMES)
+            .no_cache()
+            .batch_size(FETCH_BATCH_SIZE)
+            .as_pymongo()
         )
-        data = [db_tick.to_tick() for db_tick in s]
-        return data
+
+        for d in s:
+            yield BarData(
+                symbol=symbol,
+                exchange=exchange,
+                interval=interval,
+                gateway_name="DB",
+                **{name: d.get(name, 0) for name in BAR_FIELD_NAMES}
+            )
+
+    def iter_tick_data(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> Iterator[TickData]:
+        s = (
+            DbTickData.objects(
+                symbol=symbol,
+                exchange=exchange.value,
+                datetime__gte=start,
+                datetime__lte=end,
+            )
+            .order_by("+datetime")
+            .only(*TICK_FIELD_NAMES)
+            .no_cache()
+            .batch_size(FETCH_BATCH_SIZE)
+            .as_pymongo()
+        )
+
+        for d in s:
+            params = {name: d[name] for name in TICK_FIELD_NAMES if d.get(name)}
+
+            yield TickData(
+                symbol=symbol,
+                exchange=exchange,
+                gateway_name="DB",
+                **params
+            )
 
     @staticmethod
     def to_update_param(d):
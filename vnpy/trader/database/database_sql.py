@@ -1,6 +1,7 @@
 """"""
+import sqlite3
 from datetime import datetime
-from typing import List, Optional, Sequence, Type
+from typing import Iterator, Optional, Sequence, Type
 
 from peewee import (
     AutoField,
@@ -55,6 +56,59 @@ def init_postgresql(settings: dict):
     return db
 
 
+# Number of rows fetched by each query when iterating data
+FETCH_CHUNK_SIZE = 10_000
+
+BAR_FIELD_NAMES = [
+    "datetime",
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+TICK_FIELD_NAMES = [
+    "datetime",
+    "name",
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+    "bid_price_1",
+    "ask_price_1",
+    "bid_volume_1",
+    "ask_volume_1",
+]
+
+TICK_DEPTH_FIELD_NAMES = [
+    f"{side}_{field}_{level}"
+    for field in ("price", "volume")
+    for side in ("bid", "ask")
+    for level in range(2, 6)
+]
+
+
+def get_max_variable_number(driver: Driver) -> int:
+    """
+    Get max number of parameters in one SQL statement supported by database.
+    """
+    if driver is Driver.SQLITE:
+        if sqlite3.sqlite_version_info >= (3, 32, 0):
+            return 32766
+        else:
+            return 999
+    else:
+        return 65535
+
+
 class ModelBase(Model):
 
     def to_dict(self):
@@ -62,6 +116,8 @@ class ModelBase(Model):
 
 
 def init_models(db: Database, driver: Driver):
+    max_variable_number = get_max_variable_number(driver)
+
     class DbBarData(ModelBase):
         """
         Candlestick bar data for database storage.
@@ -126,27 +182,43 @@ def init_models(db: Database, driver: Driver):
             return bar
 
         @staticmethod
-        def save_all(objs: List["DbBarData"]):
+        def save_all(bars: Sequence[BarData]):
             """
-            save a list of objects, update if exists.
+            save a list of bar data, update if exists.
             """
-            dicts = [i.to_dict() for i in objs]
-            with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for bar in dicts:
-                        DbBarData.insert(bar).on_conflict(
-                            update=bar,
-                            conflict_target=(
-                                DbBarData.symbol,
-                                DbBarData.exchange,
-                                DbBarData.interval,
-                                DbBarData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbBarData.insert_many(
-                            c).on_conflict_replace().execute()
+            key_fields = [
+                DbBarData.symbol,
+                DbBarData.exchange,
+                DbBarData.interval,
+                DbBarData.datetime,
+            ]
+            value_fields = [
+                DbBarData.volume,
+                DbBarData.open_interest,
+                DbBarData.open_price,
+                DbBarData.high_price,
+                DbBarData.low_price,
+                DbBarData.close_price,
+            ]
+            fields = key_fields + value_fields
+
+            rows = [
+                (
+                    bar.symbol,
+                    bar.exchange.value,
+                    bar.interval.value,
+                    bar.datetime,
+                    bar.volume,
+                    bar.open_interest,
+                    bar.open_price,
+                    bar.high_price,
+                    bar.low_price,
+                    bar.close_price,
+                )
+                for bar in bars
+            ]
+
+            save_rows(DbBarData, rows, fields, key_fields, value_fields)
 
     class DbTickData(ModelBase):
         """
@@ -302,22 +374,131 @@ def init_models(db: Database, driver: Driver):
             return tick
 
         @staticmethod
-        def save_all(objs: List["DbTickData"]):
-            dicts = [i.to_dict() for i in objs]
-            with db.atomic():
+        def save_all(ticks: Sequence[TickData]):
+            """
+            save a list of tick data, update if exists.
+            """
+            key_fields = [
+                DbTickData.symbol,
+                DbTickData.exchange,
+                DbTickData.datetime,
+            ]
+            value_fields = [
+                DbTickData.name,
+                DbTickData.volume,
+                DbTickData.open_interest,
+                DbTickData.last_price,
+                DbTickData.last_volume,
+                DbTickData.limit_up,
+                DbTickData.limit_down,
+                DbTickData.open_price,
+                DbTickData.high_price,
+                DbTickData.low_price,
+                DbTickData.pre_close,
+                DbTickData.bid_price_1,
+                DbTickData.ask_price_1,
+                DbTickData.bid_volume_1,
+                DbTickData.ask_volume_1,
+                DbTickData.bid_price_2,
+                DbTickData.bid_price_3,
+                DbTickData.bid_price_4,
+                DbTickData.bid_price_5,
+                DbTickData.ask_price_2,
+                DbTickData.ask_price_3,
+                DbTickData.ask_price_4,
+                DbTickData.ask_price_5,
+                DbTickData.bid_volume_2,
+                DbTickData.bid_volume_3,
+                DbTickData.bid_volume_4,
+                DbTickData.bid_volume_5,
+                DbTickData.ask_volume_2,
+                DbTickData.ask_volume_3,
+                DbTickData.ask_volume_4,
+                DbTickData.ask_volume_5,
+            ]
+            fields = key_fields + value_fields
+
+            # Depth data after level 1 is saved only if provided
+            empty_depth = (None,) * 16
+
+            rows = []
+            for tick in ticks:
+                if tick.bid_price_2:
+                    depth = (
+                        tick.bid_price_2,
+                        tick.bid_price_3,
+                        tick.bid_price_4,
+                        tick.bid_price_5,
+                        tick.ask_price_2,
+                        tick.ask_price_3,
+                        tick.ask_price_4,
+                        tick.ask_price_5,
+                        tick.bid_volume_2,
+                        tick.bid_volume_3,
+                        tick.bid_volume_4,
+                        tick.bid_volume_5,
+                        tick.ask_volume_2,
+                        tick.ask_volume_3,
+                        tick.ask_volume_4,
+                        tick.ask_volume_5,
+                    )
+                else:
+                    depth = empty_depth
+
+                row = (
+                    tick.symbol,
+                    tick.exchange.value,
+                    tick.datetime,
+                    tick.name,
+                    tick.volume,
+                    tick.open_interest,
+                    tick.last_price,
+                    tick.last_volume,
+                    tick.limit_up,
+                    tick.limit_down,
+                    tick.open_price,
+                    tick.high_price,
+                    tick.low_price,
+                    tick.pre_close,
+                    tick.bid_price_1,
+                    tick.ask_price_1,
+                    tick.bid_volume_1,
+                    tick.ask_volume_1,
+                ) + depth
+                rows.append(row)
+
+            save_rows(DbTickData, rows, fields, key_fields, value_fields)
+
+    def save_rows(
+        model: Type[Model],
+        rows: list,
+        fields: list,
+        key_fields: list,
+        value_fields: list
+    ):
+        """
+        Insert rows with multi-row statements, update if exists.
+        """
+        # Rows with the same key cannot be updated twice in one statement
+        if driver is Driver.POSTGRESQL:
+            key_count = len(key_fields)
+            rows = list({row[:key_count]: row for row in rows}.values())
+
+        batch_size = max_variable_number // len(fields)
+
+        with db.atomic():
+            for c in chunked(rows, batch_size):
+                query = model.insert_many(c, fields=fields)
+
                 if driver is Driver.POSTGRESQL:
-                    for tick in dicts:
-                        DbTickData.insert(tick).on_conflict(
-                            update=tick,
-                            conflict_target=(
-                                DbTickData.symbol,
-                                DbTickData.exchange,
-                                DbTickData.datetime,
-                            ),
-                        ).execute()
+                    query = query.on_conflict(
+                        conflict_target=key_fields,
+                        preserve=value_fields,
+                    )
                 else:
-                    for c in chunked(dicts, 50):
-                        DbTickData.insert_many(c).on_conflict_replace().execute()
+                    query = query.on_conflict_replace()
+
+                query.execute()
 
     db.connect()
     db.create_tables([DbBarData, DbTickData])
@@ -338,44 +519,100 @@ class SqlManager(BaseDatabaseManager):
         start: datetime,
         end: datetime,
     ) -> Sequence[BarData]:
-        s = (
-            self.class_bar.select()
-                .where(
-                (self.class_bar.symbol == symbol)
-                & (self.class_bar.exchange == exchange.value)
-                & (self.class_bar.interval == interval.value)
-                & (self.class_bar.datetime >= start)
-                & (self.class_bar.datetime <= end)
-            )
-            .order_by(self.class_bar.datetime)
-        )
-        data = [db_bar.to_bar() for db_bar in s]
-        return data
+        return list(self.iter_bar_data(symbol, exchange, interval, start, end))
 
     def load_tick_data(
         self, symbol: str, exchange: Exchange, start: datetime, end: datetime
     ) -> Sequence[TickData]:
-        s = (
-            self.class_tick.select()
-                .where(
-                (self.class_tick.symbol == symbol)
-                & (self.class_tick.exchange == exchange.value)
-                & (self.class_tick.datetime >= start)
-                & (self.class_tick.datetime <= end)
+        return list(self.iter_tick_data(symbol, exchange, start, end))
+
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Iterator[BarData]:
+        fields = [getattr(self.class_bar, name) for name in BAR_FIELD_NAMES]
+        condition = (
+            (self.class_bar.symbol == symbol)
+            & (self.class_bar.exchange == exchange.value)
+            & (self.class_bar.interval == interval.value)
+        )
+
+        for row in self.iter_rows(self.class_bar, fields, condition, start, end):
+            yield BarData(
+                symbol=symbol,
+                exchange=exchange,
+                interval=interval,
+                gateway_name="DB",
+                **dict(zip(BAR_FIELD_NAMES, row))
             )
-            .order_by(self.class_tick.datetime)
+
+    def iter_tick_data(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> Iterator[TickData]:
+        names = TICK_FIELD_NAMES + TICK_DEPTH_FIELD_NAMES
+        fields = [getattr(self.class_tick, name) for name in names]
+        condition = (
+            (self.class_tick.symbol == symbol)
+            & (self.class_tick.exchange == exchange.value)
         )
 
-        data = [db_tick.to_tick() for db_tick in s]
-        return data
+        # Depth data after level 1 is null if not provided
+        depth_ix = len(TICK_FIELD_NAMES)
+
+        for row in self.iter_rows(self.class_tick, fields, condition, start, end):
+            if row[depth_ix]:
+                params = dict(zip(names, row))
+            else:
+                params = dict(zip(TICK_FIELD_NAMES, row))
+
+            yield TickData(
+                symbol=symbol,
+                exchange=exchange,
+                gateway_name="DB",
+                **params
+            )
+
+    def iter_rows(
+        self,
+        model: Type[Model],
+        fields: list,
+        condition,
+        start: datetime,
+        end: datetime
+    ):
+        """
+        Fetch rows in datetime order chunk by chunk, each chunk starts
+        after the last datetime of previous one.
+        """
+        range_condition = (model.datetime >= start) & (model.datetime <= end)
+
+        while True:
+            s = (
+                model.select(*fields)
+                .where(condition & range_condition)
+                .order_by(model.datetime)
+                .limit(FETCH_CHUNK_SIZE)
+                .tuples()
+            )
+            rows = list(s)
+
+            yield from rows
+
+            if len(rows) < FETCH_CHUNK_SIZE:
+                break
+
+            last_datetime = rows[-1][0]
+            range_condition = (model.datetime > last_datetime) & (model.datetime <= end)
 
     def save_bar_data(self, datas: Sequence[BarData]):
-        ds = [self.class_bar.from_bar(i) for i in datas]
-        self.class_bar.save_all(ds)
+        self.class_bar.save_all(datas)
 
     def save_tick_data(self, datas: Sequence[TickData]):
-        ds = [self.class_tick.from_tick(i) for i in datas]
-        self.class_tick.save_all(ds)
+        self.class_tick.save_all(datas)
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
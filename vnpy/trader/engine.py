@@ -5,10 +5,12 @@ import logging
 import smtplib
 import os
 from abc import ABC
+from collections import OrderedDict
 from datetime import datetime
 from email.message import EmailMessage
 from queue import Empty, Queue
-from threading import Thread
+from threading import Lock, Thread
+from time import monotonic
 from typing import Any, Sequence, Type
 
 from vnpy.event import Event, EventEngine
@@ -26,6 +28,7 @@ from .gateway import BaseGateway
 from .object import (
     CancelRequest,
     LogData,
+    OrderData,
     OrderRequest,
     SubscribeRequest,
     HistoryRequest
@@ -169,11 +172,14 @@ class MainEngine:
         Send new order request to a specific gateway.
         """
         gateway = self.get_gateway(gateway_name)
-        if gateway:
-            return gateway.send_order(req)
-        else:
+        if not gateway:
             return ""
 
+        vt_orderid = gateway.send_order(req)
+        if vt_orderid and req.reference:
+            self.update_order_reference(vt_orderid, req.reference)
+        return vt_orderid
+
     def cancel_order(self, req: CancelRequest, gateway_name: str):
         """
         Send cancel order request to a specific gateway.
@@ -186,11 +192,15 @@ class MainEngine:
         """
         """
         gateway = self.get_gateway(gateway_name)
-        if gateway:
-            return gateway.send_orders(reqs)
-        else:
+        if not gateway:
             return ["" for req in reqs]
 
+        vt_orderids = gateway.send_orders(reqs)
+        for req, vt_orderid in zip(reqs, vt_orderids):
+            if vt_orderid and req.reference:
+                self.update_order_reference(vt_orderid, req.reference)
+        return vt_orderids
+
     def cancel_orders(self, reqs: Sequence[CancelRequest], gateway_name: str):
         """
         """
@@ -324,6 +334,9 @@ class OmsEngine(BaseEngine):
     Provides order management system function for VN Trader.
     """
 
+    # Seconds before reference of order without any order event expires
+    reference_ttl = 60
+
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
         """"""
         super(OmsEngine, self).__init__(main_engine, event_engine, "oms")
@@ -337,6 +350,20 @@ class OmsEngine(BaseEngine):
 
         self.active_orders = {}
 
+        # Indexes of active orders: key -> {vt_orderid: order}
+        self.symbol_active_orders = {}
+        self.gateway_active_orders = {}
+        self.reference_active_orders = {}
+
+        self.order_references = {}      # vt_orderid: reference
+
+        # References saved before the first order event, in the order
+        # of save time, since the event may never come if order rejected.
+        self.pending_references = OrderedDict()     # vt_orderid: time
+
+        # Order events and references may be updated from different threads
+        self.order_lock = Lock()
+
         self.add_function()
         self.register_event()
 
@@ -355,6 +382,10 @@ class OmsEngine(BaseEngine):
         self.main_engine.get_all_accounts = self.get_all_accounts
         self.main_engine.get_all_contracts = self.get_all_contracts
         self.main_engine.get_all_active_orders = self.get_all_active_orders
+        self.main_engine.get_gateway_active_orders = self.get_gateway_active_orders
+        self.main_engine.get_reference_active_orders = self.get_reference_active_orders
+        self.main_engine.get_active_order_count = self.get_active_order_count
+        self.main_engine.update_order_reference = self.update_order_reference
 
     def register_event(self):
         """"""
@@ -373,14 +404,81 @@ class OmsEngine(BaseEngine):
     def process_order_event(self, event: Event):
         """"""
         order = event.data
-        self.orders[order.vt_orderid] = order
 
-        # If order is active, then update data in dict.
-        if order.is_active():
-            self.active_orders[order.vt_orderid] = order
-        # Otherwise, pop inactive order from in dict
-        elif order.vt_orderid in self.active_orders:
-            self.active_orders.pop(order.vt_orderid)
+        with self.order_lock:
+            self.orders[order.vt_orderid] = order
+            self.pending_references.pop(order.vt_orderid, None)
+
+            # If order is active, then update data in dict.
+            if order.is_active():
+                self.active_orders[order.vt_orderid] = order
+                self.update_active_indexes(order, True)
+            # Otherwise, pop inactive order from in dict
+            else:
+                if self.active_orders.pop(order.vt_orderid, None):
+                    self.update_active_indexes(order, False)
+
+                # Reference may be saved before the first order event
+                self.order_references.pop(order.vt_orderid, None)
+
+    def update_active_indexes(self, order: OrderData, active: bool):
+        """
+        Add active order into indexes, or remove it if not active.
+        """
+        reference = self.order_references.get(order.vt_orderid, "")
+
+        for index, key in [
+            (self.symbol_active_orders, order.vt_symbol),
+            (self.gateway_active_orders, order.gateway_name),
+            (self.reference_active_orders, reference),
+        ]:
+            if not key:
+                continue
+
+            if active:
+                index.setdefault(key, {})[order.vt_orderid] = order
+            else:
+                orders = index.get(key, None)
+                if orders:
+                    orders.pop(order.vt_orderid, None)
+                    # Remove empty dict so that index does not keep growing
+                    if not orders:
+                        index.pop(key)
+
+    def update_order_reference(self, vt_orderid: str, reference: str):
+        """
+        Save reference of order, which is the name of strategy/algo sending
+        the order, for querying active orders by reference.
+        """
+        with self.order_lock:
+            # Order already finished before reference updated
+            if vt_orderid in self.orders and vt_orderid not in self.active_orders:
+                return
+
+            self.order_references[vt_orderid] = reference
+
+            order = self.active_orders.get(vt_orderid, None)
+            if order:
+                self.reference_active_orders.setdefault(reference, {})[vt_orderid] = order
+            elif vt_orderid not in self.orders:
+                now = monotonic()
+                self.pending_references.pop(vt_orderid, None)
+                self.pending_references[vt_orderid] = now
+                self.expire_pending_references(now)
+
+    def expire_pending_references(self, now: float):
+        """
+        Remove references of orders without any order event for more
+        than ttl.
+        """
+        references = self.pending_references
+        while references:
+            vt_orderid = next(iter(references))
+            if now - references[vt_orderid] <= self.reference_ttl:
+                break
+
+            del references[vt_orderid]
+            self.order_references.pop(vt_orderid, None)
 
     def process_trade_event(self, event: Event):
         """"""
@@ -483,12 +581,43 @@ class OmsEngine(BaseEngine):
         if not vt_symbol:
             return list(self.active_orders.values())
         else:
-            active_orders = [
-                order
-                for order in self.active_orders.values()
-                if order.vt_symbol == vt_symbol
-            ]
-            return active_orders
+            active_orders = self.symbol_active_orders.get(vt_symbol, {})
+            return list(active_orders.values())
+
+    def get_gateway_active_orders(self, gateway_name: str):
+        """
+        Get all active orders of a gateway.
+        """
+        active_orders = self.gateway_active_orders.get(gateway_name, {})
+        return list(active_orders.values())
+
+    def get_reference_active_orders(self, reference: str):
+        """
+        Get all active orders sent with the reference.
+        """
+        active_orders = self.reference_active_orders.get(reference, {})
+        return list(active_orders.values())
+
+    def get_active_order_count(
+        self,
+        vt_symbol: str = "",
+        gateway_name: str = "",
+        reference: str = ""
+    ):
+        """
+        Get count of active orders by vt_symbol, gateway_name or reference.
+
+        If none of them is given, return count of all active orders.
+        """
+        if vt_symbol:
+            active_orders = self.symbol_active_orders.get(vt_symbol, {})
+        elif gateway_name:
+            active_orders = self.gateway_active_orders.get(gateway_name, {})
+        elif reference:
+            active_orders = self.reference_active_orders.get(reference, {})
+        else:
+            active_orders = self.active_orders
+        return len(active_orders)
 
 
 class EmailEngine(BaseEngine):
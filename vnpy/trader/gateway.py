@@ -3,10 +3,13 @@
 """
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
 from typing import Any, Sequence
 from copy import copy
 
 from vnpy.event import Event, EventEngine
+from vnpy.event.engine import get_vt_symbol
 from .event import (
     EVENT_TICK,
     EVENT_ORDER,
@@ -31,6 +34,26 @@ from .object import (
 )
 
 
+def get_vt_orderid(event: Event) -> str:
+    """"""
+    return event.data.vt_orderid
+
+
+def get_vt_accountid(event: Event) -> str:
+    """"""
+    return event.data.vt_accountid
+
+
+# Key functions for distributing data events to handlers of a specific key
+EVENT_FANOUTS = {
+    EVENT_TICK: get_vt_symbol,
+    EVENT_TRADE: get_vt_symbol,
+    EVENT_ORDER: get_vt_orderid,
+    EVENT_POSITION: get_vt_symbol,
+    EVENT_ACCOUNT: get_vt_accountid,
+}
+
+
 class BaseGateway(ABC):
     """
     Abstract gateway class for creating gateways connection
@@ -81,6 +104,11 @@ class BaseGateway(ABC):
         self.event_engine = event_engine
         self.gateway_name = gateway_name
 
+        # Events of a specific key are distributed by event engine to
+        # handlers registered for type + key, without extra event put.
+        for type, key_func in EVENT_FANOUTS.items():
+            event_engine.set_fanout(type, key_func)
+
     def on_event(self, type: str, data: Any = None):
         """
         General event push.
@@ -91,42 +119,37 @@ class BaseGateway(ABC):
     def on_tick(self, tick: TickData):
         """
         Tick event push.
-        Tick event of a specific vt_symbol is also pushed.
+        Tick event of a specific vt_symbol is also distributed by event engine.
         """
         self.on_event(EVENT_TICK, tick)
-        self.on_event(EVENT_TICK + tick.vt_symbol, tick)
 
     def on_trade(self, trade: TradeData):
         """
         Trade event push.
-        Trade event of a specific vt_symbol is also pushed.
+        Trade event of a specific vt_symbol is also distributed by event engine.
         """
         self.on_event(EVENT_TRADE, trade)
-        self.on_event(EVENT_TRADE + trade.vt_symbol, trade)
 
     def on_order(self, order: OrderData):
         """
         Order event push.
-        Order event of a specific vt_orderid is also pushed.
+        Order event of a specific vt_orderid is also distributed by event engine.
         """
         self.on_event(EVENT_ORDER, order)
-        self.on_event(EVENT_ORDER + order.vt_orderid, order)
 
     def on_position(self, position: PositionData):
         """
         Position event push.
-        Position event of a specific vt_symbol is also pushed.
+        Position event of a specific vt_symbol is also distributed by event engine.
         """
         self.on_event(EVENT_POSITION, position)
-        self.on_event(EVENT_POSITION + position.vt_symbol, position)
 
     def on_account(self, account: AccountData):
         """
         Account event push.
-        Account event of a specific vt_accountid is also pushed.
+        Account event of a specific vt_accountid is also distributed by event engine.
         """
         self.on_event(EVENT_ACCOUNT, account)
-        self.on_event(EVENT_ACCOUNT + account.vt_accountid, account)
 
     def on_log(self, log: LogData):
         """
@@ -263,10 +286,24 @@ class BaseGateway(ABC):
 class LocalOrderManager:
     """
     Management tool to support use local order id for trading.
+
+    Finished orders are kept for a limited count and time before being
+    evicted together with their orderid map, and push data waiting for
+    orderid map expires after push_data_ttl seconds.
     """
 
-    def __init__(self, gateway: BaseGateway, order_prefix: str = ""):
-        """"""
+    def __init__(
+        self,
+        gateway: BaseGateway,
+        order_prefix: str = "",
+        max_finished_orders: int = 10000,
+        finished_order_ttl: int = 0,
+        push_data_ttl: int = 60
+    ):
+        """
+        finished_order_ttl and push_data_ttl are in seconds, 0 for no
+        time based eviction.
+        """
         self.gateway = gateway
 
         # For generating local orderid
@@ -279,7 +316,7 @@ class LocalOrderManager:
         self.sys_local_orderid_map = {}
 
         # Push order data buf
-        self.push_data_buf = {}  # sys_orderid:data
+        self.push_data_buf = {}  # sys_orderid:(time, data)
 
         # Callback for processing push order data
         self.push_data_callback = None
@@ -287,6 +324,16 @@ class LocalOrderManager:
         # Cancel request buf
         self.cancel_request_buf = {}    # local_orderid:req
 
+        # Finished orders in the order of finish time
+        self.finished_orders = OrderedDict()    # local_orderid:time
+
+        self.max_finished_orders = max_finished_orders
+        self.finished_order_ttl = finished_order_ttl
+        self.push_data_ttl = push_data_ttl
+
+        self.evicted_count = 0
+        self.expired_count = 0
+
         # Hook cancel order function
         self._cancel_order = gateway.cancel_order
         gateway.cancel_order = self.cancel_order
@@ -335,7 +382,7 @@ class LocalOrderManager:
         if sys_orderid not in self.push_data_buf:
             return
 
-        data = self.push_data_buf.pop(sys_orderid)
+        _, data = self.push_data_buf.pop(sys_orderid)
         if self.push_data_callback:
             self.push_data_callback(data)
 
@@ -343,7 +390,31 @@ class LocalOrderManager:
         """
         Add push data into buf.
         """
-        self.push_data_buf[sys_orderid] = data
+        now = monotonic()
+
+        # Keep buf in the order of add time
+        self.push_data_buf.pop(sys_orderid, None)
+        self.push_data_buf[sys_orderid] = (now, data)
+
+        self.expire_push_data(now)
+
+    def expire_push_data(self, now: float):
+        """
+        Remove push data which has been waiting for more than ttl.
+        """
+        if not self.push_data_ttl:
+            return
+
+        buf = self.push_data_buf
+        while buf:
+            sys_orderid = next(iter(buf))
+            add_time, _ = buf[sys_orderid]
+
+            if now - add_time <= self.push_data_ttl:
+                break
+
+            del buf[sys_orderid]
+            self.expired_count += 1
 
     def get_order_with_sys_orderid(self, sys_orderid: str):
         """"""
@@ -354,23 +425,93 @@ class LocalOrderManager:
             return self.get_order_with_local_orderid(local_orderid)
 
     def get_order_with_local_orderid(self, local_orderid: str):
-        """"""
-        order = self.orders[local_orderid]
+        """
+        Return None if order not found or already evicted.
+        """
+        order = self.orders.get(local_orderid, None)
+        if not order:
+            return None
         return copy(order)
 
     def on_order(self, order: OrderData):
         """
         Keep an order buf before pushing it to gateway.
         """
-        self.orders[order.orderid] = copy(order)
+        local_orderid = order.orderid
+        self.orders[local_orderid] = copy(order)
+
+        if not order.is_active():
+            if local_orderid not in self.finished_orders:
+                self.finished_orders[local_orderid] = monotonic()
+
+            # Order finished before sys orderid received
+            self.cancel_request_buf.pop(local_orderid, None)
+
+            self.evict_finished_orders()
+        elif local_orderid in self.finished_orders:
+            del self.finished_orders[local_orderid]
+
         self.gateway.on_order(order)
 
+    def evict_finished_orders(self):
+        """
+        Remove finished orders out of retention count or time, together
+        with their orderid map and cancel request.
+        """
+        finished_orders = self.finished_orders
+        now = monotonic()
+
+        while finished_orders:
+            local_orderid, finish_time = next(iter(finished_orders.items()))
+
+            if (
+                len(finished_orders) <= self.max_finished_orders
+                and (
+                    not self.finished_order_ttl
+                    or now - finish_time <= self.finished_order_ttl
+                )
+            ):
+                break
+
+            finished_orders.popitem(last=False)
+            self.orders.pop(local_orderid, None)
+            self.cancel_request_buf.pop(local_orderid, None)
+
+            sys_orderid = self.local_sys_orderid_map.pop(local_orderid, None)
+            if sys_orderid:
+                self.sys_local_orderid_map.pop(sys_orderid, None)
+
+            self.evicted_count += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get size of order buf and maps, and count of data removed.
+        """
+        return {
+            "orders": len(self.orders),
+            "finished_orders": len(self.finished_orders),
+            "local_sys_orderid_map": len(self.local_sys_orderid_map),
+            "sys_local_orderid_map": len(self.sys_local_orderid_map),
+            "push_data_buf": len(self.push_data_buf),
+            "cancel_request_buf": len(self.cancel_request_buf),
+            "evicted_count": self.evicted_count,
+            "expired_count": self.expired_count,
+        }
+
     def cancel_order(self, req: CancelRequest):
         """
+        Cancel request is kept in buf if sys orderid of active order is
+        not received yet, and dropped if order is unknown, evicted or
+        already finished.
         """
         sys_orderid = self.get_sys_orderid(req.orderid)
         if not sys_orderid:
-            self.cancel_request_buf[req.orderid] = req
+            order = self.orders.get(req.orderid, None)
+
+            if order and order.is_active():
+                self.cancel_request_buf[req.orderid] = req
+            else:
+                self.gateway.write_log(f"撤单失败，找不到活动委托：{req.orderid}")
             return
 
         self._cancel_order(req)
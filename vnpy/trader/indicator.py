@@ -0,0 +1,417 @@
+"""
+Streaming technical indicators updated incrementally with each bar.
+
+Each indicator reproduces the arithmetic of its TA-Lib function step by
+step (except where noted for numerical stability), so that the latest
+value is the same as the last value of TA-Lib calculated over all bars
+updated, and NaN before enough bars updated.
+
+Indicators with recursive smoothing (atr, rsi, macd, adx) are not
+included, since TA-Lib over all history differs from TA-Lib over a
+sliding window of recent bars, and ArrayManager keeps calculating them
+by TA-Lib.
+"""
+
+from collections import deque
+from math import fabs, nan, sqrt
+from typing import Any, Deque, Tuple
+
+
+def is_zero(value: float) -> bool:
+    """
+    Same as TA_IS_ZERO of TA-Lib.
+    """
+    return -0.00000001 < value < 0.00000001
+
+
+def true_range(high: float, low: float, prev_close: float) -> float:
+    """
+    Same as TRUE_RANGE of TA-Lib.
+    """
+    greatest = high - low
+
+    value = fabs(prev_close - high)
+    if value > greatest:
+        greatest = value
+
+    value = fabs(prev_close - low)
+    if value > greatest:
+        greatest = value
+
+    return greatest
+
+
+class Indicator:
+    """
+    Base class of streaming indicator.
+    """
+
+    def __init__(self):
+        """"""
+        self.count: int = 0
+        self.value: Any = nan
+
+    def update(self, high: float, low: float, close: float, volume: float) -> Any:
+        """
+        Update with data of new bar and return latest value.
+        """
+        raise NotImplementedError
+
+
+class SmaIndicator(Indicator):
+    """
+    Simple moving average of close, same as talib.SMA.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n = n
+        self.values: Deque[float] = deque()
+        self.total = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """"""
+        self.count += 1
+
+        self.total += close
+        self.values.append(close)
+
+        if self.count >= self.n:
+            self.value = self.total / self.n
+            self.total -= self.values.popleft()
+
+        return self.value
+
+
+class StdIndicator(Indicator):
+    """
+    Standard deviation of close, same as talib.STDDEV.
+
+    Running totals are calculated with closes shifted by a recent close,
+    and are recalculated from the window every n bars, so that rounding
+    error neither grows with price level nor accumulates over history.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n = n
+        self.values: Deque[float] = deque()
+        self.total = 0.0
+        self.square_total = 0.0
+        self.shift = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """"""
+        self.count += 1
+        self.values.append(close)
+
+        if not self.count % self.n:
+            self.shift = close
+            self.total = 0.0
+            self.square_total = 0.0
+            for value in self.values:
+                value -= self.shift
+                self.total += value
+                self.square_total += value * value
+        else:
+            value = close - self.shift
+            self.total += value
+            self.square_total += value * value
+
+        if self.count >= self.n:
+            mean = self.total / self.n
+            square_mean = self.square_total / self.n
+
+            old = self.values.popleft() - self.shift
+            self.total -= old
+            self.square_total -= old * old
+
+            variance = square_mean - mean * mean
+            if variance < 0.00000001:
+                self.value = 0.0
+            else:
+                self.value = sqrt(variance)
+
+        return self.value
+
+
+class CciIndicator(Indicator):
+    """
+    Commodity Channel Index, same as talib.CCI.
+
+    Mean deviation is calculated over the whole window for every bar as
+    TA-Lib does, so each update costs O(n).
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n = n
+        self.buffer = [0.0] * n
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """"""
+        # Buffer is summed in physical order as circular buffer of TA-Lib
+        last = (high + low + close) / 3
+        self.buffer[self.count % self.n] = last
+        self.count += 1
+
+        if self.count < self.n:
+            return self.value
+
+        average = 0.0
+        for value in self.buffer:
+            average += value
+        average /= self.n
+
+        deviation = 0.0
+        for value in self.buffer:
+            deviation += fabs(value - average)
+
+        diff = last - average
+        if diff != 0.0 and deviation != 0.0:
+            self.value = diff / (0.015 * (deviation / self.n))
+        else:
+            self.value = 0.0
+
+        return self.value
+
+
+class DonchianIndicator(Indicator):
+    """
+    Highest high and lowest low, same as talib.MAX and talib.MIN.
+
+    Value is tuple of up and down.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n = n
+
+        # Deques of (index, value) with monotonic values
+        self.highs: Deque[Tuple[int, float]] = deque()
+        self.lows: Deque[Tuple[int, float]] = deque()
+
+        self.value: Tuple[float, float] = (nan, nan)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> tuple:
+        """"""
+        ix = self.count
+        self.count += 1
+
+        update_extremes(self.highs, self.lows, ix, high, low, ix - self.n + 1)
+
+        if self.count >= self.n:
+            self.value = (self.highs[0][1], self.lows[0][1])
+
+        return self.value
+
+
+class AroonIndicator(Indicator):
+    """
+    Aroon, same as talib.AROON.
+
+    Value is tuple of aroon down and aroon up, in the order of TA-Lib.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n = n
+        self.factor = 100.0 / n
+
+        self.highs: Deque[Tuple[int, float]] = deque()
+        self.lows: Deque[Tuple[int, float]] = deque()
+
+        self.value: Tuple[float, float] = (nan, nan)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> tuple:
+        """"""
+        ix = self.count
+        self.count += 1
+
+        # Window of aroon includes n + 1 bars
+        update_extremes(self.highs, self.lows, ix, high, low, ix - self.n)
+
+        if self.count > self.n:
+            high_ix = self.highs[0][0]
+            low_ix = self.lows[0][0]
+
+            self.value = (
+                self.factor * (self.n - (ix - low_ix)),
+                self.factor * (self.n - (ix - high_ix))
+            )
+
+        return self.value
+
+
+class AroonOscIndicator(AroonIndicator):
+    """
+    Aroon Oscillator, same as talib.AROONOSC.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__(n)
+
+        self.value = nan
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """"""
+        ix = self.count
+        self.count += 1
+
+        update_extremes(self.highs, self.lows, ix, high, low, ix - self.n)
+
+        if self.count > self.n:
+            self.value = self.factor * (self.highs[0][0] - self.lows[0][0])
+
+        return self.value
+
+
+class UltoscIndicator(Indicator):
+    """
+    Ultimate Oscillator, same as talib.ULTOSC.
+    """
+
+    def __init__(self, period1: int = 7, period2: int = 14, period3: int = 28):
+        """"""
+        super().__init__()
+
+        # Shortest period has the largest weight
+        self.periods = sorted([period1, period2, period3])
+        self.max_period = self.periods[-1]
+
+        self.prev_close = nan
+        self.terms: Deque[Tuple[float, float]] = deque()
+
+        self.a_totals = [0.0, 0.0, 0.0]
+        self.b_totals = [0.0, 0.0, 0.0]
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """"""
+        ix = self.count
+        self.count += 1
+
+        prev_close = self.prev_close
+        self.prev_close = close
+        if ix == 0:
+            return self.value
+
+        true_low = low if low < prev_close else prev_close
+        close_minus_true_low = close - true_low
+        tr = true_range(high, low, prev_close)
+
+        self.terms.append((close_minus_true_low, tr))
+
+        # Totals of each period starts from the bar with enough bars
+        # for the longest period, same as TA-Lib.
+        for i, period in enumerate(self.periods):
+            if ix >= self.max_period - period + 1:
+                self.a_totals[i] += close_minus_true_low
+                self.b_totals[i] += tr
+
+        if ix < self.max_period:
+            return self.value
+
+        output = 0.0
+        for weight, a_total, b_total in zip((4.0, 2.0, 1.0), self.a_totals, self.b_totals):
+            if not is_zero(b_total):
+                output += weight * (a_total / b_total)
+
+        for i, period in enumerate(self.periods):
+            a, b = self.terms[-period]
+            self.a_totals[i] -= a
+            self.b_totals[i] -= b
+
+        if len(self.terms) >= self.max_period:
+            self.terms.popleft()
+
+        self.value = 100.0 * (output / 7.0)
+        return self.value
+
+
+class MfiIndicator(Indicator):
+    """
+    Money Flow Index, same as talib.MFI.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n = n
+        self.prev_price = nan
+        self.flows: Deque[Tuple[float, float]] = deque()
+
+        self.positive_total = 0.0
+        self.negative_total = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """"""
+        self.count += 1
+
+        price = (high + low + close) / 3.0
+        diff = price - self.prev_price
+        self.prev_price = price
+        if self.count == 1:
+            return self.value
+
+        if len(self.flows) == self.n:
+            positive, negative = self.flows.popleft()
+            self.positive_total -= positive
+            self.negative_total -= negative
+
+        flow = price * volume
+        if diff < 0:
+            self.flows.append((0.0, flow))
+            self.negative_total += flow
+        elif diff > 0:
+            self.flows.append((flow, 0.0))
+            self.positive_total += flow
+        else:
+            self.flows.append((0.0, 0.0))
+
+        if self.count <= self.n:
+            return self.value
+
+        total = self.positive_total + self.negative_total
+        if total < 1.0:
+            self.value = 0.0
+        else:
+            self.value = 100.0 * (self.positive_total / total)
+
+        return self.value
+
+
+def update_extremes(
+    highs: Deque[Tuple[int, float]],
+    lows: Deque[Tuple[int, float]],
+    ix: int,
+    high: float,
+    low: float,
+    start: int
+):
+    """
+    Update monotonic deques of highest and lowest within window starting
+    from start index. The latest one is kept if values are equal.
+    """
+    while highs and highs[-1][1] <= high:
+        highs.pop()
+    highs.append((ix, high))
+    while highs[0][0] < start:
+        highs.popleft()
+
+    while lows and lows[-1][1] >= low:
+        lows.pop()
+    lows.append((ix, low))
+    while lows[0][0] < start:
+        lows.popleft()
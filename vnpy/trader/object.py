@@ -277,6 +277,7 @@ class OrderRequest:
     volume: float
     price: float = 0
     offset: Offset = Offset.NONE
+    reference: str = ""     # name of strategy/algo sending the order
 
     def __post_init__(self):
         """"""
@@ -0,0 +1,193 @@
+"""
+Incremental order book used by gateways for generating depth tick data.
+"""
+
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Tuple
+from zlib import crc32
+
+import numpy as np
+
+from .object import TickData
+
+
+TICK_DEPTH = 5
+
+BID_PRICE_NAMES = [f"bid_price_{n}" for n in range(1, TICK_DEPTH + 1)]
+BID_VOLUME_NAMES = [f"bid_volume_{n}" for n in range(1, TICK_DEPTH + 1)]
+ASK_PRICE_NAMES = [f"ask_price_{n}" for n in range(1, TICK_DEPTH + 1)]
+ASK_VOLUME_NAMES = [f"ask_volume_{n}" for n in range(1, TICK_DEPTH + 1)]
+
+
+class OrderBook:
+    """
+    Order book of a single symbol.
+
+    Prices of each side are kept in an ascending list, which is updated
+    with binary search when a price level is added or removed, so best
+    price levels can be read from list end without sorting.
+    """
+
+    def __init__(self):
+        """"""
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+
+        self.bid_prices: List[float] = []
+        self.ask_prices: List[float] = []
+
+    def update_bid(self, price: float, volume: float):
+        """
+        Update volume of a bid price level, remove it if volume is 0.
+        """
+        update_level(self.bid_prices, self.bids, price, volume)
+
+    def update_ask(self, price: float, volume: float):
+        """
+        Update volume of an ask price level, remove it if volume is 0.
+        """
+        update_level(self.ask_prices, self.asks, price, volume)
+
+    def clear(self):
+        """
+        Remove all price levels.
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self.bid_prices.clear()
+        self.ask_prices.clear()
+
+    def apply_snapshot(
+        self,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]]
+    ):
+        """
+        Replace all price levels with (price, volume) of snapshot data.
+        """
+        self.bids = {price: volume for price, volume in bids if volume}
+        self.asks = {price: volume for price, volume in asks if volume}
+
+        self.bid_prices = sorted(self.bids)
+        self.ask_prices = sorted(self.asks)
+
+    def get_bids(self, depth: int) -> List[Tuple[float, float]]:
+        """
+        Get (price, volume) of best bid price levels, from high to low.
+        """
+        prices = self.bid_prices[:-depth - 1:-1]
+        return [(price, self.bids[price]) for price in prices]
+
+    def get_asks(self, depth: int) -> List[Tuple[float, float]]:
+        """
+        Get (price, volume) of best ask price levels, from low to high.
+        """
+        prices = self.ask_prices[:depth]
+        return [(price, self.asks[price]) for price in prices]
+
+    def update_tick(self, tick: TickData):
+        """
+        Update 1-5 level depth data of tick. Levels not available are
+        filled with 0.
+        """
+        bid_prices = self.bid_prices
+        bid_count = len(bid_prices)
+
+        for i in range(TICK_DEPTH):
+            if i < bid_count:
+                price = bid_prices[-i - 1]
+                volume = self.bids[price]
+            else:
+                price = volume = 0
+
+            setattr(tick, BID_PRICE_NAMES[i], price)
+            setattr(tick, BID_VOLUME_NAMES[i], volume)
+
+        ask_prices = self.ask_prices
+        ask_count = len(ask_prices)
+
+        for i in range(TICK_DEPTH):
+            if i < ask_count:
+                price = ask_prices[i]
+                volume = self.asks[price]
+            else:
+                price = volume = 0
+
+            setattr(tick, ASK_PRICE_NAMES[i], price)
+            setattr(tick, ASK_VOLUME_NAMES[i], volume)
+
+    def calculate_checksum(
+        self,
+        depth: int = 25,
+        ask_sign: int = 1,
+        format_value: Callable[[float], str] = None
+    ) -> int:
+        """
+        Calculate signed CRC32 checksum of best price levels, in the format
+        of "bid_price:bid_volume:ask_price:ask_volume:..." with levels of
+        both sides interleaved, which is used by Bitfinex and OKEx.
+
+        Values are formatted with format_value, format_number by default,
+        which should give the same text as exchange data. Ask volumes are
+        multiplied by ask_sign, e.g. -1 for Bitfinex which signs ask
+        amounts negative.
+
+        If the checksum does not match the one provided by exchange,
+        order book should be resynced with a new snapshot.
+        """
+        if not format_value:
+            format_value = format_number
+
+        bids = self.get_bids(depth)
+        asks = self.get_asks(depth)
+
+        buf = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                price, volume = bids[i]
+                buf.append(format_value(price))
+                buf.append(format_value(volume))
+            if i < len(asks):
+                price, volume = asks[i]
+                buf.append(format_value(price))
+                buf.append(format_value(volume * ask_sign))
+
+        checksum = crc32(":".join(buf).encode())
+
+        # Exchanges provide checksum as signed 32-bit integer
+        if checksum >= 2 ** 31:
+            checksum -= 2 ** 32
+        return checksum
+
+
+def format_number(value: float) -> str:
+    """
+    Format number in the same way as JSON number of exchange data: the
+    shortest text which is parsed back to the same value, without trailing
+    ".0" and in exponent form only when less than 1e-6.
+    """
+    if value and abs(value) < 1e-6:
+        mantissa, exponent = repr(value).split("e")
+        return f"{mantissa}e{int(exponent)}"
+
+    return np.format_float_positional(value, trim="-")
+
+
+def update_level(
+    prices: List[float],
+    volumes: Dict[float, float],
+    price: float,
+    volume: float
+):
+    """
+    Update volume of a price level in sorted price list and volume dict.
+    """
+    if volume:
+        if price not in volumes:
+            insort(prices, price)
+        volumes[price] = volume
+    elif price in volumes:
+        del volumes[price]
+
+        ix = bisect_left(prices, price)
+        del prices[ix]
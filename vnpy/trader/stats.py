@@ -0,0 +1,62 @@
+"""
+Statistics shared by event engine and api clients.
+"""
+
+# Latency histogram buckets are powers of 2 in microseconds
+HISTOGRAM_BUCKET_COUNT = 32
+
+
+class LatencyHistogram:
+    """
+    Histogram of latency values, with bucket i counting values
+    less than 2 ** i microseconds.
+    """
+
+    def __init__(self):
+        """"""
+        self.buckets = [0] * HISTOGRAM_BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, latency: float):
+        """
+        Add a latency value in seconds.
+        """
+        microseconds = int(latency * 1_000_000)
+        ix = min(microseconds.bit_length(), HISTOGRAM_BUCKET_COUNT - 1)
+        self.buckets[ix] += 1
+
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    def get_percentile(self, percent: float) -> float:
+        """
+        Get upper bound of latency percentile in seconds.
+        """
+        target = self.count * percent / 100
+        accumulated = 0
+
+        for ix, count in enumerate(self.buckets):
+            accumulated += count
+            if accumulated >= target:
+                return min(2 ** ix / 1_000_000, self.max)
+
+        return self.max
+
+    def get_stats(self) -> dict:
+        """"""
+        if self.count:
+            mean = self.total / self.count
+        else:
+            mean = 0
+
+        return {
+            "count": self.count,
+            "mean": mean,
+            "p50": self.get_percentile(50),
+            "p99": self.get_percentile(99),
+            "max": self.max,
+        }
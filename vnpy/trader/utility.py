@@ -2,11 +2,13 @@
 General utility functions.
 """
 
+import inspect
 import json
 import logging
 import sys
+from functools import wraps
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Any, Callable, Dict
 from decimal import Decimal
 from math import floor, ceil
 
@@ -15,10 +17,59 @@ import talib
 
 from .object import BarData, TickData
 from .constant import Exchange, Interval
+from .indicator import (
+    Indicator,
+    SmaIndicator,
+    StdIndicator,
+    CciIndicator,
+    DonchianIndicator,
+    AroonIndicator,
+    AroonOscIndicator,
+    UltoscIndicator,
+    MfiIndicator
+)
 
 
 log_formatter = logging.Formatter('[%(asctime)s] %(message)s')
 
+# Structured numpy dtypes for columnar history data
+BAR_FIELDS = (
+    "datetime",
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+)
+BAR_DTYPE = np.dtype(
+    [("datetime", "datetime64[us]")]
+    + [(name, "f8") for name in BAR_FIELDS[1:]]
+)
+
+TICK_FIELDS = (
+    "datetime",
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+) + tuple(
+    f"{side}_{field}_{level}"
+    for side in ("bid", "ask")
+    for field in ("price", "volume")
+    for level in range(1, 6)
+)
+TICK_DTYPE = np.dtype(
+    [("datetime", "datetime64[us]")]
+    + [(name, "f8") for name in TICK_FIELDS[1:]]
+)
+
 
 def extract_vt_symbol(vt_symbol: str):
     """
@@ -296,24 +347,183 @@ class BarGenerator:
         self.bar = None
 
 
+def _get_group_bounds(finished: np.ndarray):
+    """
+    Get start and end index of groups ended with finished flag set,
+    data after the last finished one is not included.
+    """
+    ends = np.flatnonzero(finished)
+    starts = np.empty_like(ends)
+    if len(ends):
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+    return starts, ends
+
+
+def resample_ticks(ticks: np.ndarray) -> np.ndarray:
+    """
+    Generate 1 minute bars from structured array of tick data in one pass,
+    with the same result as BarGenerator.update_tick, except that volume
+    may differ in rounding since changes are not summed one by one.
+
+    Bar is generated when tick of next minute arrives, so the bar of last
+    minute is not included.
+    """
+    ticks = ticks[ticks["last_price"] != 0]
+
+    # Bar finished by tick of next minute
+    minutes = ticks["datetime"].astype("datetime64[m]").astype(np.int64) % 60
+    finished = np.zeros(len(ticks), dtype=bool)
+    finished[:-1] = minutes[1:] != minutes[:-1]
+
+    starts, ends = _get_group_bounds(finished)
+    bars = np.zeros(len(ends), dtype=BAR_DTYPE)
+    if not len(ends):
+        return bars
+
+    prices = ticks["last_price"][:ends[-1] + 1]
+    bars["datetime"] = ticks["datetime"][ends].astype("datetime64[m]")
+    bars["open_price"] = prices[starts]
+    bars["high_price"] = np.maximum.reduceat(prices, starts)
+    bars["low_price"] = np.minimum.reduceat(prices, starts)
+    bars["close_price"] = prices[ends]
+    bars["open_interest"] = ticks["open_interest"][ends]
+
+    # Volume change from previous tick is added into bar of current tick
+    changes = np.zeros(ends[-1] + 1)
+    changes[1:] = np.maximum(np.diff(ticks["volume"][:ends[-1] + 1]), 0)
+
+    bars["volume"] = np.add.reduceat(changes, starts)
+
+    return bars
+
+
+def resample_bars(
+    bars: np.ndarray,
+    window: int,
+    interval: Interval = Interval.MINUTE
+) -> np.ndarray:
+    """
+    Generate x minute/x hour bars from structured array of 1 minute bars
+    in one pass, with the same result as BarGenerator.update_bar.
+
+    Window bar not finished by the last bar is not included.
+    """
+    finished = np.zeros(len(bars), dtype=bool)
+
+    if interval == Interval.MINUTE:
+        minutes = bars["datetime"].astype("datetime64[m]").astype(np.int64) % 60
+        finished[:] = (minutes + 1) % window == 0
+        dt_unit = "datetime64[m]"
+    else:
+        dt_unit = "datetime64[h]"
+
+        if interval == Interval.HOUR:
+            hours = bars["datetime"].astype("datetime64[h]").astype(np.int64) % 24
+            changed = np.zeros(len(bars), dtype=bool)
+            changed[1:] = hours[1:] != hours[:-1]
+
+            # Window bar finished by every window-th hour change
+            finished[:] = changed & (np.cumsum(changed) % window == 0)
+
+    starts, ends = _get_group_bounds(finished)
+    window_bars = np.zeros(len(ends), dtype=BAR_DTYPE)
+    if not len(ends):
+        return window_bars
+
+    bars = bars[:ends[-1] + 1]
+    window_bars["datetime"] = bars["datetime"][starts].astype(dt_unit)
+    window_bars["open_price"] = bars["open_price"][starts]
+    window_bars["high_price"] = np.maximum.reduceat(bars["high_price"], starts)
+    window_bars["low_price"] = np.minimum.reduceat(bars["low_price"], starts)
+    window_bars["close_price"] = bars["close_price"][ends]
+    window_bars["open_interest"] = bars["open_interest"][ends]
+
+    # Volume of each bar is truncated into integer before added
+    window_bars["volume"] = np.add.reduceat(np.trunc(bars["volume"]), starts)
+
+    return window_bars
+
+
+def memoize_indicator(func: Callable):
+    """
+    Cache result of ArrayManager indicator function for current bar.
+
+    Cache key is function name and arguments with defaults applied, so
+    that sma(10) and sma(10, False) share the same result.
+    """
+    signature = inspect.signature(func)
+    name = func.__name__
+    arg_count = len(signature.parameters) - 1
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not self.memoize:
+            return func(self, *args, **kwargs)
+
+        if kwargs or len(args) != arg_count:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            args = bound.args[1:]
+
+        key = (name, args)
+        if key in self.cache:
+            self.cache_hits += 1
+            return self.cache[key]
+
+        self.cache_misses += 1
+        result = func(self, *args)
+        self.cache[key] = result
+        return result
+
+    return wrapper
+
+
 class ArrayManager(object):
     """
     For:
     1. time series container of bar data
     2. calculating technical indicator value
+
+    Bar data is saved in ring buffers twice of size, so that update_bar
+    costs O(1) amortized, and time series returned are contiguous views
+    of the latest size bars, which are valid till next update_bar.
+
+    If streaming is True, indicator values (array=False) are updated
+    incrementally with each bar instead of calculated by TA-Lib over the
+    whole time series every time. Each indicator is registered when used
+    for the first time, with bars in time series replayed.
+
+    Results of streaming indicators are the same as TA-Lib over time
+    series after inited. Indicators with recursive smoothing (atr, rsi,
+    macd, adx) are always calculated by TA-Lib, since their results over
+    time series depend on the first bar of time series, and cannot be
+    updated incrementally.
+
+    If memoize is True, indicator results are cached till next update_bar,
+    so that same indicator called several times for one bar, directly or
+    by boll and keltner, is calculated only once. Arrays returned are then
+    shared by callers and should not be modified in place, so it is only
+    enabled if specified.
     """
 
-    def __init__(self, size=100):
+    def __init__(self, size=100, streaming=False, memoize=False):
         """Constructor"""
         self.count = 0
         self.size = size
         self.inited = False
+        self.streaming = streaming
+
+        self.memoize = memoize
+        self.cache: Dict[tuple, Any] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
 
-        self.open_array = np.zeros(size)
-        self.high_array = np.zeros(size)
-        self.low_array = np.zeros(size)
-        self.close_array = np.zeros(size)
-        self.volume_array = np.zeros(size)
+        # Rows of open, high, low, close and volume
+        self._buffer = np.zeros((5, size * 2))
+        self._index = size
+
+        self.indicators: Dict[tuple, Indicator] = {}
 
     def update_bar(self, bar):
         """
@@ -323,17 +533,95 @@ class ArrayManager(object):
         if not self.inited and self.count >= self.size:
             self.inited = True
 
-        self.open_array[:-1] = self.open_array[1:]
-        self.high_array[:-1] = self.high_array[1:]
-        self.low_array[:-1] = self.low_array[1:]
-        self.close_array[:-1] = self.close_array[1:]
-        self.volume_array[:-1] = self.volume_array[1:]
+        if self.cache:
+            self.cache.clear()
+
+        # Move latest bars to the front when buffer is full
+        if self._index == self.size * 2:
+            self._buffer[:, :self.size] = self._buffer[:, self.size:]
+            self._index = self.size
+
+        self._buffer[:, self._index] = (
+            bar.open_price,
+            bar.high_price,
+            bar.low_price,
+            bar.close_price,
+            bar.volume
+        )
+        self._index += 1
+
+        for indicator in self.indicators.values():
+            indicator.update(
+                bar.high_price,
+                bar.low_price,
+                bar.close_price,
+                bar.volume
+            )
+
+    def get_indicator(self, indicator_class: type, *args) -> Indicator:
+        """
+        Get streaming indicator, which is created and updated with bars in
+        time series if not registered yet.
+        """
+        key = (indicator_class, args)
+        indicator = self.indicators.get(key, None)
+
+        if not indicator:
+            indicator = indicator_class(*args)
+
+            start = self._index - min(self.count, self.size)
+            for ix in range(start, self._index):
+                indicator.update(
+                    self._buffer[1, ix],
+                    self._buffer[2, ix],
+                    self._buffer[3, ix],
+                    self._buffer[4, ix]
+                )
+
+            self.indicators[key] = indicator
+
+        return indicator
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get count of indicator calculations saved by memoization.
+        """
+        total = self.cache_hits + self.cache_misses
+        if total:
+            hit_rate = self.cache_hits / total
+        else:
+            hit_rate = 0
 
-        self.open_array[-1] = bar.open_price
-        self.high_array[-1] = bar.high_price
-        self.low_array[-1] = bar.low_price
-        self.close_array[-1] = bar.close_price
-        self.volume_array[-1] = bar.volume
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": hit_rate,
+        }
+
+    @property
+    def open_array(self):
+        """"""
+        return self._buffer[0, self._index - self.size:self._index]
+
+    @property
+    def high_array(self):
+        """"""
+        return self._buffer[1, self._index - self.size:self._index]
+
+    @property
+    def low_array(self):
+        """"""
+        return self._buffer[2, self._index - self.size:self._index]
+
+    @property
+    def close_array(self):
+        """"""
+        return self._buffer[3, self._index - self.size:self._index]
+
+    @property
+    def volume_array(self):
+        """"""
+        return self._buffer[4, self._index - self.size:self._index]
 
     @property
     def open(self):
@@ -370,33 +658,46 @@ class ArrayManager(object):
         """
         return self.volume_array
 
+    @memoize_indicator
     def sma(self, n, array=False):
         """
         Simple moving average.
         """
+        if self.streaming and not array:
+            return self.get_indicator(SmaIndicator, n).value
+
         result = talib.SMA(self.close, n)
         if array:
             return result
         return result[-1]
 
+    @memoize_indicator
     def std(self, n, array=False):
         """
         Standard deviation
         """
+        if self.streaming and not array:
+            return self.get_indicator(StdIndicator, n).value
+
         result = talib.STDDEV(self.close, n)
         if array:
             return result
         return result[-1]
 
+    @memoize_indicator
     def cci(self, n, array=False):
         """
         Commodity Channel Index (CCI).
         """
+        if self.streaming and not array:
+            return self.get_indicator(CciIndicator, n).value
+
         result = talib.CCI(self.high, self.low, self.close, n)
         if array:
             return result
         return result[-1]
 
+    @memoize_indicator
     def atr(self, n, array=False):
         """
         Average True Range (ATR).
@@ -406,6 +707,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @memoize_indicator
     def rsi(self, n, array=False):
         """
         Relative Strenght Index (RSI).
@@ -415,6 +717,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @memoize_indicator
     def macd(self, fast_period, slow_period, signal_period, array=False):
         """
         MACD.
@@ -426,6 +729,7 @@ class ArrayManager(object):
             return macd, signal, hist
         return macd[-1], signal[-1], hist[-1]
 
+    @memoize_indicator
     def adx(self, n, array=False):
         """
         ADX.
@@ -435,6 +739,7 @@ class ArrayManager(object):
             return result
         return result[-1]
 
+    @memoize_indicator
     def boll(self, n, dev, array=False):
         """
         Bollinger Channel.
@@ -447,6 +752,7 @@ class ArrayManager(object):
 
         return up, down
 
+    @memoize_indicator
     def keltner(self, n, dev, array=False):
         """
         Keltner Channel.
@@ -459,10 +765,14 @@ class ArrayManager(object):
 
         return up, down
 
+    @memoize_indicator
     def donchian(self, n, array=False):
         """
         Donchian Channel.
         """
+        if self.streaming and not array:
+            return self.get_indicator(DonchianIndicator, n).value
+
         up = talib.MAX(self.high, n)
         down = talib.MIN(self.low, n)
 
@@ -470,39 +780,55 @@ class ArrayManager(object):
             return up, down
         return up[-1], down[-1]
 
+    @memoize_indicator
     def aroon(self, n, array=False):
         """
         Aroon indicator.
         """
+        if self.streaming and not array:
+            return self.get_indicator(AroonIndicator, n).value
+
         aroon_up, aroon_down = talib.AROON(self.high, self.low, n)
 
         if array:
             return aroon_up, aroon_down
         return aroon_up[-1], aroon_down[-1]
 
+    @memoize_indicator
     def aroonosc(self, n, array=False):
         """
         Aroon Oscillator.
         """
+        if self.streaming and not array:
+            return self.get_indicator(AroonOscIndicator, n).value
+
         result = talib.AROONOSC(self.high, self.low, n)
 
         if array:
             return result
         return result[-1]
 
+    @memoize_indicator
     def ultosc(self, array=False):
         """
         Ultimate Oscillator.
         """
+        if self.streaming and not array:
+            return self.get_indicator(UltoscIndicator).value
+
         result = talib.ULTOSC(self.high, self.low, self.close)
         if array:
             return result
         return result[-1]
 
+    @memoize_indicator
     def mfi(self, n, array=False):
         """
         Money Flow Index.
         """
+        if self.streaming and not array:
+            return self.get_indicator(MfiIndicator, n).value
+
         result = talib.MFI(self.high, self.low, self.close, self.volume, n)
         if array:
             return result